@@ -5,6 +5,7 @@ Simplified - Public YouTube Browser (No Authentication)
 
 import os
 import socket
+import tempfile
 from pathlib import Path
 from decouple import config, Csv
 
@@ -52,12 +53,14 @@ AUTHENTICATION_BACKENDS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Session / auth / messages only under SESSION_PATH_PREFIXES (sonyApp/middleware.py)
+    'sonyApp.middleware.AdminOnlySessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'sonyApp.middleware.AdminOnlyAuthenticationMiddleware',
+    'sonyApp.middleware.AdminOnlyMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'sonyApp.db_router.replica_routing_middleware',   # replica for safe public reads
     # REMOVED: 'social_django.middleware.SocialAuthExceptionMiddleware',
     # REMOVED: 'sonyApp.middleware.SonySubscriptionMiddleware',
 ]
@@ -99,6 +102,13 @@ if DEBUG:
             'NAME':   BASE_DIR / 'db.sqlite3',
         }
     }
+    # Local replica testing — a copy of db.sqlite3 (see sonyApp/db_router.py)
+    if config('DB_REPLICA_SQLITE', default=''):
+        DATABASES['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME':   BASE_DIR / config('DB_REPLICA_SQLITE'),
+            'TEST':   {'MIRROR': 'default'},
+        }
 else:
     DATABASES = {
         'default': {
@@ -115,6 +125,50 @@ else:
         }
     }
 
+    # ── Connection reuse (metrics: sonyApp/db_pool.py, /api/db-pool/) ──
+    # requirements.txt installs psycopg 3 with psycopg_pool → Django's native
+    # pool, sized PER gunicorn worker process and health-checked on checkout.
+    # A local env still on psycopg2 (which rejects OPTIONS['pool']) falls
+    # back to persistent per-thread connections with health checks.
+    try:
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        is_psycopg3, ConnectionPool = False, None
+
+    # Every thread of ONE process that can hold a connection at once: request
+    # threads (a threaded server: up to min(32, cpu + 4)), plus headroom for SWR
+    # rebuild and cron threads. Too small → PoolTimeout under load, not queueing.
+    DB_POOL_THREADS = min(32, (os.cpu_count() or 1) + 4) + 4
+
+    if is_psycopg3 and ConnectionPool is not None:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size':     config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size':     config('DB_POOL_MAX_SIZE', default=DB_POOL_THREADS, cast=int),
+            'timeout':      config('DB_POOL_TIMEOUT', default=10, cast=float),   # max wait for a free connection
+            'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+            'max_idle':     config('DB_POOL_MAX_IDLE', default=300, cast=float),
+            'check':        ConnectionPool.check_connection,
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE']       = config('DB_CONN_MAX_AGE', default=600, cast=int)
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+    # ── Read replica (sonyApp/db_router.py) — same credentials, other host ──
+    if config('DB_REPLICA_HOST', default=''):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST':    config('DB_REPLICA_HOST'),
+            'PORT':    config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+            'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+            'TEST':    {'MIRROR': 'default'},
+        }
+
+# Reads go to 'replica' only for safe public requests; without that alias
+# the router sends everything to 'default'
+DATABASE_ROUTERS = ['sonyApp.db_router.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=15, cast=int)   # reads stay on the primary after a write
+
 # ============================================
 # PASSWORD VALIDATION
 # ============================================
@@ -160,9 +214,29 @@ STORAGES = {
 # ============================================
 
 YOUTUBE_API_KEY = config('YOUTUBE_API_KEY')
+YOUTUBE_API_TIMEOUT = 30      # seconds per HTTP call (see sonyApp/youtube_client.py)
+YOUTUBE_API_MAX_RETRIES = 5   # jittered exponential backoff on 5xx / rate limits
+TOMBSTONE_AFTER_MISSES = 3    # consecutive stats runs a video may be missing before is_active=False
+SYNC_RUN_LOG_LINES = 200      # ring-buffer size of SyncRun.log
+SEARCH_CACHE_TTL = 60         # seconds a /api/search/videos/ result is reused (see sonyApp/search.py)
+SEARCH_RECENT_CACHE_TTL = 900 # ... and the empty-query ("recent content") payload
+THUMB_CACHE_DIR    = config('THUMB_CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'sonyapp-thumbs'))
+THUMB_CACHE_MAX_MB = config('THUMB_CACHE_MAX_MB', default=512, cast=int)   # LRU-evicted above this (see sonyApp/thumbs.py)
+READ_MODEL_PATH    = config('READ_MODEL_PATH', default=os.path.join(tempfile.gettempdir(), 'sonyapp-read-model.sqlite3'))   # local snapshot (see sonyApp/read_model.py)
+READ_MODEL_PUSH_DELAY = 60    # seconds a WebSub push waits for others before one snapshot rebuild covers them all
 MAX_VIDEOS_PER_CHANNEL = 50
 VIDEOS_PER_PAGE = 20
 
+# ============================================
+# WEBSUB (PubSubHubbub push notifications)
+# ============================================
+
+WEBSUB_HUB_URL       = config('WEBSUB_HUB_URL', default='https://pubsubhubbub.appspot.com/subscribe')
+WEBSUB_CALLBACK_URL  = config('WEBSUB_CALLBACK_URL', default='')   # e.g. https://example.com/api/websub/callback/
+WEBSUB_SECRET        = config('WEBSUB_SECRET', default='')         # HMAC key for signed notifications
+WEBSUB_LEASE_SECONDS = config('WEBSUB_LEASE_SECONDS', default=432000, cast=int)  # 5 days
+WEBSUB_VERIFY_SECONDS = 86400   # how long a (un)subscribe we sent can still be verified by the hub
+
 # Fix for IPv6 timeout issues
 socket.setdefaulttimeout(60)
 
@@ -188,6 +262,7 @@ except ImportError:
 # ============================================
 
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_PATH_PREFIXES = ('/admin/', '/logout/')   # the only paths that load a session (sonyApp/middleware.py)
 SESSION_COOKIE_AGE = 1209600  # 2 weeks
 
 # ============================================
@@ -211,13 +286,30 @@ if not DEBUG:
 # CACHING
 # ============================================
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'sonyapp-cache',
-        'TIMEOUT': 3600,
+# One cache shared by every gunicorn worker (LocMemCache was per process, so
+# invalidations only reached the worker that ran them). Redis when REDIS_URL
+# is set (needs the `redis` package); otherwise a file cache on local disk,
+# shared by all workers on the host (sonyApp/file_cache.py — atomic add() for
+# the single-flight locks). Invalidation is tag-based — see sonyApp/caching.py.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND':  'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT':  3600,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND':  'sonyApp.file_cache.FileCache',
+            'LOCATION': config('CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'sonyapp-cache')),
+            'TIMEOUT':  3600,
+            'OPTIONS':  {'MAX_ENTRIES': 20000, 'CULL_EVERY': 100},
+        }
     }
-}
 
 # ============================================
 # LOGGING
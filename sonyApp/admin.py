@@ -1,6 +1,6 @@
 # sonyApp/admin.py
 from django.contrib import admin
-from .models import Channel, Video  # Removed Subscription import
+from .models import Artist, Channel, Video  # Removed Subscription import
 
 @admin.register(Channel)
 class ChannelAdmin(admin.ModelAdmin):
@@ -16,3 +16,11 @@ class VideoAdmin(admin.ModelAdmin):
     search_fields = ['title', 'youtube_video_id']
     readonly_fields = ['published_at']
 
+
+@admin.register(Artist)
+class ArtistAdmin(admin.ModelAdmin):
+    """Run `manage.py tag_artists` after adding an artist or alias to tag existing videos."""
+    list_display = ['name', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    search_fields = ['name']
+    readonly_fields = ['created_at', 'updated_at']
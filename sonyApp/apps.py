@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class SonyappConfig(AppConfig):
     name = 'sonyApp'
+
+    def ready(self):
+        from . import db_pool
+        db_pool.install()
+
+        from . import search
+        post_migrate.connect(search.ensure_index, sender=self, dispatch_uid='sonyapp_search_index')
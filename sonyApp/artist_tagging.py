@@ -0,0 +1,121 @@
+"""
+sonyApp/artist_tagging.py
+
+Ingest-time artist tagging: an Aho-Corasick Matcher finds every artist name
+and alias in a video's text in one pass; tag_videos() stores the links.
+"""
+
+import threading
+from collections import deque
+
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .models import Artist, VideoArtist
+
+# Keeps `video_id IN (...)` under SQLite's bound-variable limit
+DELETE_CHUNK = 500
+
+
+class Matcher:
+    """
+    Aho-Corasick automaton. patterns: iterable of (text, value);
+    find(text) returns the set of values whose text occurs in it
+    (case-insensitive substring — same rule as icontains).
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out  = [frozenset()]
+
+        for text, value in patterns:
+            text = (text or '').lower()
+            if not text:
+                continue
+            node = 0
+            for ch in text:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                    self._goto[node][ch] = nxt
+                node = nxt
+            self._out[node] = self._out[node] | {value}
+
+        # Breadth-first: each node's failure link points at its longest proper
+        # suffix that is also a trie path, and inherits that node's outputs.
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child]  = self._out[child] | self._out[self._fail[child]]
+
+    def find(self, text):
+        found = set()
+        node  = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for ch in (text or '').lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found |= out[node]
+        return found
+
+
+_matcher_lock  = threading.Lock()
+_matcher       = None
+_matcher_stamp = None
+
+
+def get_matcher():
+    """
+    Process-wide Matcher over active artists (value = artist pk). Rebuilt
+    when an artist is added, edited or removed — one cheap aggregate per call.
+    """
+    global _matcher, _matcher_stamp
+    stamp = tuple(Artist.objects.filter(is_active=True).aggregate(
+        n=Count('id'), changed=Max('updated_at'),
+    ).values())
+    if _matcher is None or stamp != _matcher_stamp:
+        with _matcher_lock:
+            if _matcher is None or stamp != _matcher_stamp:
+                _matcher = Matcher(
+                    (pattern, artist.pk)
+                    for artist in Artist.objects.filter(is_active=True)
+                    for pattern in artist.patterns()
+                )
+                _matcher_stamp = stamp
+    return _matcher
+
+
+def tag_videos(videos, matcher=None):
+    """
+    Replace the VideoArtist links of `videos` (saved Video instances with
+    title, description and published_at loaded). Returns links written.
+    """
+    matcher = matcher or get_matcher()
+    pks     = []
+    links   = []
+    for video in videos:
+        pks.append(video.pk)
+        # '\n' between fields: no pattern can match across title/description
+        for artist_pk in matcher.find(f"{video.title}\n{video.description}"):
+            links.append(VideoArtist(
+                video_id=video.pk, artist_id=artist_pk, published_at=video.published_at,
+            ))
+
+    with transaction.atomic():
+        for i in range(0, len(pks), DELETE_CHUNK):
+            VideoArtist.objects.filter(video_id__in=pks[i:i + DELETE_CHUNK]).delete()
+        VideoArtist.objects.bulk_create(links, batch_size=500)
+    return len(links)
@@ -0,0 +1,176 @@
+"""
+sonyApp/caching.py
+
+Tag-versioned keys on the shared cache — bump(tag) retires every key built
+under it, in every worker — plus stale-while-revalidate for expensive builders.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Tags: search, artists, channels, growth, stats, channel:<pk> (one
+# channel's videos). Versions are ms timestamps — an evicted tag comes back
+# NEWER, so it can't resurrect stale keys.
+
+# Derived from which videos exist and what they show — bumped when
+# ingestion actually adds or changes videos
+INGEST_TAGS = ('search', 'artists', 'channels')
+
+# ...plus the growth sections, which only stats runs change
+CATALOGUE_TAGS = INGEST_TAGS + ('growth',)
+
+SWR_LOCK_SECONDS  = 60     # a crashed rebuild can't block a key for longer
+SWR_WAIT_SECONDS  = 5      # cold miss: how long to wait for another builder
+SWR_POLL_SECONDS  = 0.05
+
+
+def _tag_key(tag):
+    return f'tag:{tag}'
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def tag_versions(tags):
+    """{tag: version} — one get_many; unseen tags are initialised."""
+    keys     = {_tag_key(t): t for t in tags}
+    found    = cache.get_many(keys)
+    versions = {keys[k]: v for k, v in found.items()}
+    for key, tag in keys.items():
+        if tag not in versions:
+            cache.add(key, _now_ms(), None)
+            versions[tag] = cache.get(key)
+    return versions
+
+
+def tag_version(tag):
+    return tag_versions([tag])[tag]
+
+
+def bump(*tags):
+    """Invalidate everything cached under any of `tags`."""
+    now = _now_ms()
+    current = cache.get_many([_tag_key(t) for t in tags])
+    cache.set_many({
+        _tag_key(t): max(now, current.get(_tag_key(t), 0) + 1)
+        for t in tags
+    }, None)
+
+
+def make_key(base, tags):
+    versions = tag_versions(tags)
+    return base + ''.join(f':{t}={versions[t]}' for t in sorted(tags))
+
+
+def get(base, tags, default=None):
+    value = cache.get(make_key(base, tags), _MISSING)
+    return default if value is _MISSING else value
+
+
+def set(base, value, tags, timeout):
+    cache.set(make_key(base, tags), value, timeout)
+
+
+def get_or_set(base, tags, compute, timeout):
+    key   = make_key(base, tags)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# STALE-WHILE-REVALIDATE
+# ───────────────────────────────────────────────────────────────────────────
+
+def stamp(tags):
+    """The versions of `tags` as a comparable tuple (sorted by tag)."""
+    versions = tag_versions(tags)
+    return tuple(versions[t] for t in sorted(tags))
+
+
+def _store(key, compute, tags, soft_ttl, hard_ttl):
+    built_from = stamp(tags)   # read BEFORE computing: a bump mid-build leaves it stale
+    value = compute()
+    cache.set(key, (value, built_from, time.time() + soft_ttl), hard_ttl)
+    return value, built_from
+
+
+def _revalidate(key, compute, tags, soft_ttl, hard_ttl):
+    """Rebuild in a background thread — only if nobody else already is."""
+    lock = f'{key}:lock'
+    if not cache.add(lock, 1, SWR_LOCK_SECONDS):
+        return
+
+    def run():
+        try:
+            _store(key, compute, tags, soft_ttl, hard_ttl)
+        except Exception:
+            logger.exception(f"SWR rebuild failed for {key}")
+        finally:
+            cache.delete(lock)
+            connections.close_all()   # the thread ends — return its connection
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def swr_entry(base, compute, tags=(), soft_ttl=300, hard_ttl=3600):
+    """
+    (value, built_from) — built_from is the stamp() the value was computed
+    under, which is OLDER than the current one while a stale value is served.
+    """
+    key   = f'swr:{base}'
+    entry = cache.get(key)
+
+    if entry is not None:
+        value, built_from, fresh_until = entry
+        if time.time() >= fresh_until or built_from != stamp(tags):
+            _revalidate(key, compute, tags, soft_ttl, hard_ttl)
+        return value, built_from
+
+    # Cold miss — single-flight
+    lock = f'{key}:lock'
+    if cache.add(lock, 1, SWR_LOCK_SECONDS):
+        try:
+            return _store(key, compute, tags, soft_ttl, hard_ttl)
+        finally:
+            cache.delete(lock)
+
+    deadline = time.monotonic() + SWR_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(SWR_POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0], entry[1]
+    built_from = stamp(tags)
+    return compute(), built_from
+
+
+def swr_get(base, compute, tags=(), soft_ttl=300, hard_ttl=3600):
+    return swr_entry(base, compute, tags, soft_ttl, hard_ttl)[0]
+
+
+def swr(base, tags=(), soft_ttl=300, hard_ttl=3600):
+    """Decorator form of swr_get(); call arguments become part of the key."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = base
+            if args or kwargs:
+                key += ':' + hashlib.md5(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+            return swr_get(key, lambda: func(*args, **kwargs), tags, soft_ttl, hard_ttl)
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+"""
+sonyApp/cards.py
+
+Compact, picklable VideoCards (slotted, pickled as tuples) for cached
+listings and the read model, bounded to the top K.
+"""
+
+GROWTH_TOP_K = 50   # cards kept per growth section
+
+
+class ChannelRef:
+    """The channel fields a video card links to."""
+
+    __slots__ = ('pk', 'channel_id', 'name')
+
+    def __init__(self, pk, channel_id, name):
+        self.pk         = pk
+        self.channel_id = channel_id
+        self.name       = name
+
+    def __reduce__(self):
+        return (ChannelRef, (self.pk, self.channel_id, self.name))
+
+    @property
+    def id(self):
+        return self.pk
+
+    def __repr__(self):
+        return f'<ChannelRef {self.channel_id}>'
+
+
+class VideoCard:
+    """One video as a listing renders it."""
+
+    __slots__ = (
+        'pk', 'youtube_video_id', 'channel', 'title', 'thumbnail_url', 'lqip',
+        'duration', 'view_count', 'like_count', 'published_at', 'is_short',
+        'growth_value', 'growth_label',
+    )
+
+    def __init__(self, pk, youtube_video_id, channel, title, thumbnail_url='', lqip='',
+                 duration='', view_count=0, like_count=0, published_at=None, is_short=False,
+                 growth_value=None, growth_label=''):
+        self.pk               = pk
+        self.youtube_video_id = youtube_video_id
+        self.channel          = channel
+        self.title            = title
+        self.thumbnail_url    = thumbnail_url
+        self.lqip             = lqip
+        self.duration         = duration
+        self.view_count       = view_count
+        self.like_count       = like_count
+        self.published_at     = published_at
+        self.is_short         = is_short
+        self.growth_value     = growth_value
+        self.growth_label     = growth_label
+
+    def __reduce__(self):
+        return (VideoCard, tuple(getattr(self, name) for name in self.__slots__))
+
+    @property
+    def id(self):
+        return self.pk
+
+    def __repr__(self):
+        return f'<VideoCard {self.youtube_video_id}>'
+
+
+def to_cards(videos, limit=None):
+    """
+    Video instances (channel select_related) → VideoCards, at most `limit`.
+    growth_value / growth_label annotations are carried over when present.
+    """
+    refs  = {}
+    cards = []
+    for video in videos:
+        if limit is not None and len(cards) >= limit:
+            break
+        ref = refs.get(video.channel_id)
+        if ref is None:
+            ch  = video.channel
+            ref = refs[video.channel_id] = ChannelRef(ch.pk, ch.channel_id, ch.name)
+        cards.append(VideoCard(
+            video.pk, video.youtube_video_id, ref, video.title, video.thumbnail_url, video.lqip,
+            video.duration, video.view_count, video.like_count, video.published_at, video.is_short,
+            getattr(video, 'growth_value', None), getattr(video, 'growth_label', ''),
+        ))
+    return cards
@@ -0,0 +1,127 @@
+"""
+sonyApp/catalogue.py
+
+Growth sections and artist counts, shared by the views (ORM fallback) and
+read_model.build().
+"""
+
+from datetime import timedelta
+
+from django.db.models import Count, F
+from django.utils import timezone
+
+from . import caching, cards
+from .models import Video, VideoArtist
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# ARTISTS  — one GROUP BY over ingest-time artist tags
+# ───────────────────────────────────────────────────────────────────────────
+
+@caching.swr('artists_page_data', tags=['artists'], soft_ttl=3600, hard_ttl=24 * 3600)
+def artists_page_data():
+    """
+    Videos are tagged with artists at ingest (sonyApp/artist_tagging.py),
+    so this is ONE indexed GROUP BY on VideoArtist over the last 90 days.
+    Stale-while-revalidate: fresh for 1 hour or until the 'artists' tag is
+    bumped; after that the old list is served while one caller rebuilds.
+    """
+    ninety_days_ago = timezone.now() - timedelta(days=90)
+
+    artist_data = list(
+        VideoArtist.objects
+        .filter(
+            published_at__gte=ninety_days_ago,
+            artist__is_active=True,
+            video__is_active=True,
+            video__is_embeddable=True,
+        )
+        .values(name=F('artist__name'))
+        .annotate(count=Count('video_id'))
+        .order_by('-count', 'name')
+    )
+
+    # Add bar percentage relative to top artist
+    max_count = artist_data[0]['count'] if artist_data else 1
+    for a in artist_data:
+        a['bar_pct'] = round((a['count'] / max_count) * 100)
+
+    return artist_data
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# GROWTH  (3-section, 6h snapshot based)
+# ───────────────────────────────────────────────────────────────────────────
+
+@caching.swr('growth_sections_v3', tags=['growth'], soft_ttl=1800, hard_ttl=6 * 3600)
+def get_growth_sections():
+    """
+    Return videos for all 3 growth sections.
+
+    Section 1 — Hot & New   : 0h  < age < 24h   | ranked by 6h delta
+    Section 2 — Daily Growth: 24h ≤ age < 168h  | ranked by 24h rolling delta
+    Section 3 — Weekly Growth:168h ≤ age < 720h | ranked by 168h rolling delta
+
+    Stale-while-revalidate: fresh for 30 minutes or until the 'growth' tag
+    is bumped (every ingestion / update_video_stats run). After that the
+    previous sections keep being served while ONE caller rebuilds them in
+    the background — no stampede of full scans right after each cron run.
+    What's cached is the top cards.GROWTH_TOP_K of each section as
+    VideoCards (sonyApp/cards.py), not model instances.
+    """
+    now = timezone.now()
+
+    # ── candidate pool: videos published in last 30 days, active, not shorts ──
+    thirty_days_ago = now - timedelta(hours=720)
+    candidates = (
+        Video.objects
+        .filter(
+            channel__is_active=True,
+            is_active=True,
+            is_embeddable=True,
+            is_short=False,
+            published_at__gte=thirty_days_ago,
+            base_snapshot_timestamp__isnull=False,   # must have at least 1 snapshot
+        )
+        .select_related('channel')
+        .defer('description', 'thumbnails', 'search_text', 'channel__description')
+    )
+
+    hot_list    = []
+    daily_list  = []
+    weekly_list = []
+
+    for video in candidates:
+        if video.in_hot_and_new():
+            growth = video.get_hot_growth()
+            if growth > 0:
+                video.growth_value = growth
+                video.growth_label = video.get_growth_label(section='hot')
+                hot_list.append(video)
+
+        elif video.in_daily_growth():
+            growth = video.get_daily_growth()
+            if growth > 0:
+                video.growth_value = growth
+                video.growth_label = video.get_growth_label(section='daily')
+                daily_list.append(video)
+
+        elif video.in_weekly_growth():
+            growth = video.get_weekly_growth()
+            if growth > 0:
+                video.growth_value = growth
+                video.growth_label = video.get_growth_label(section='weekly')
+                weekly_list.append(video)
+
+    # Sort each section by highest absolute growth
+   
+    hot_list.sort(key=lambda v: v.growth_value, reverse=True)
+    daily_list.sort(key=lambda v: v.growth_value, reverse=True)
+    weekly_list.sort(key=lambda v: v.growth_value, reverse=True)
+
+    result = {
+        'hot_and_new':   cards.to_cards(hot_list,    cards.GROWTH_TOP_K),
+        'daily_growth':  cards.to_cards(daily_list,  cards.GROWTH_TOP_K),
+        'weekly_growth': cards.to_cards(weekly_list, cards.GROWTH_TOP_K),
+    }
+    return result
@@ -0,0 +1,63 @@
+"""
+sonyApp/db_pool.py
+
+Per-process metrics for the database connection layer configured in
+settings.DATABASES (served at /api/db-pool/).
+"""
+
+import os
+import threading
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_lock    = threading.Lock()
+_created = {}
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    with _lock:
+        _created[connection.alias] = _created.get(connection.alias, 0) + 1
+
+
+def install():
+    """Called from SonyappConfig.ready()."""
+    connection_created.connect(_on_connection_created, dispatch_uid='sonyapp_db_pool_created')
+
+
+def _pool_stats(pool):
+    raw      = pool.get_stats()
+    requests = raw.get('requests_num', 0)
+    wait_ms  = raw.get('requests_wait_ms', 0)
+    return {
+        'mode':        'pool',
+        'min_size':    raw.get('pool_min'),
+        'max_size':    raw.get('pool_max'),
+        'size':        raw.get('pool_size'),
+        'in_use':      raw.get('pool_size', 0) - raw.get('pool_available', 0),
+        'waiting':     raw.get('requests_waiting', 0),
+        'requests':    requests,
+        'wait_ms':     wait_ms,
+        'avg_wait_ms': round(wait_ms / requests, 2) if requests else 0,
+        'timeouts':    raw.get('requests_errors', 0),
+        'opened':      raw.get('connections_num', 0),
+        'recycled':    raw.get('connections_lost', 0) + raw.get('returns_bad', 0),
+    }
+
+
+def stats():
+    result = {'pid': os.getpid(), 'databases': {}}
+    for alias in connections:
+        wrapper = connections[alias]
+        pool    = getattr(wrapper, 'pool', None) if wrapper.settings_dict.get('OPTIONS', {}).get('pool') else None
+        if pool is not None:
+            entry = _pool_stats(pool)
+        else:
+            entry = {
+                'mode':         'persistent' if wrapper.settings_dict.get('CONN_MAX_AGE') else 'per-request',
+                'conn_max_age': wrapper.settings_dict.get('CONN_MAX_AGE'),
+            }
+        with _lock:
+            entry['created'] = _created.get(alias, 0)
+        result['databases'][alias] = entry
+    return result
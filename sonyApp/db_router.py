@@ -0,0 +1,79 @@
+"""
+sonyApp/db_router.py
+
+Read-replica routing: safe public GETs read from the replica; the first
+write pins the request — and, by cookie, the visitor — to the primary.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .middleware import uses_session
+
+PRIMARY_ALIAS = 'default'
+REPLICA_ALIAS = 'replica'
+STICKY_COOKIE = 'db_primary'
+
+_use_replica = ContextVar('sonyapp_use_replica', default=False)
+_wrote       = ContextVar('sonyapp_db_wrote',   default=False)
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def pin_primary():
+    """Route the rest of this request / task to the primary."""
+    _use_replica.set(False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return REPLICA_ALIAS if _use_replica.get() and replica_enabled() else PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        _wrote.set(True)
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True     # same data on both aliases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_ALIAS
+
+
+def _begin(request):
+    read_only = (
+        replica_enabled()
+        and request.method in ('GET', 'HEAD')
+        and not request.COOKIES.get(STICKY_COOKIE)
+        and not uses_session(request)
+    )
+    return _use_replica.set(read_only), _wrote.set(False)
+
+
+def _finish(request, response, tokens):
+    if _wrote.get():
+        response.set_cookie(
+            STICKY_COOKIE, '1',
+            max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax',
+        )
+    replica_token, wrote_token = tokens
+    _use_replica.reset(replica_token)
+    _wrote.reset(wrote_token)
+    return response
+
+
+def replica_routing_middleware(get_response):
+    def middleware(request):
+        tokens = _begin(request)
+        try:
+            response = get_response(request)
+        except BaseException:
+            _use_replica.reset(tokens[0])
+            _wrote.reset(tokens[1])
+            raise
+        return _finish(request, response, tokens)
+    return middleware
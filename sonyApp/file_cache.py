@@ -0,0 +1,63 @@
+"""
+sonyApp/file_cache.py
+
+FileBasedCache with an atomic add() (os.link) and amortised culling —
+the cache backend when REDIS_URL isn't set.
+"""
+
+import os
+import pickle
+import random
+import tempfile
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class FileCache(FileBasedCache):
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_every = int(params.get('OPTIONS', {}).get('CULL_EVERY', 100))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        self._cull()
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as f:
+                self._write_content(f, timeout, value)
+            for _ in range(2):
+                try:
+                    os.link(tmp_path, fname)
+                    return True
+                except FileExistsError:
+                    if not self._unlink_if_expired(fname):
+                        return False
+            return False
+        finally:
+            os.remove(tmp_path)
+
+    def _unlink_if_expired(self, fname):
+        """Remove fname if it holds an expired entry. True if it's gone."""
+        try:
+            with open(fname, 'rb') as f:
+                try:
+                    expiry = pickle.load(f)
+                except EOFError:
+                    expiry = 0
+                if expiry is None or expiry >= time.time():
+                    return False
+                inode = os.fstat(f.fileno()).st_ino
+            # Another add() may have replaced it since — only remove ours
+            if os.stat(fname).st_ino == inode:
+                os.remove(fname)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _cull(self):
+        if random.randrange(self._cull_every) == 0:
+            super()._cull()
@@ -0,0 +1,169 @@
+"""
+sonyApp/http_cache.py
+
+Pre-serialized, pre-compressed JSON responses, and conditional GET with
+ETag / Last-Modified derived from cache tag versions.
+"""
+
+import functools
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from . import caching
+
+try:
+    import orjson
+except ImportError:       # optional — stdlib json is the fallback
+    orjson = None
+
+try:
+    import brotli
+except ImportError:       # optional — gzip only without it
+    brotli = None
+
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL         = 6
+BROTLI_QUALITY     = 5
+
+# Preference order when the client accepts several
+ENCODINGS = ('br', 'gzip')
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+
+def encode(data):
+    """{'identity': bytes, 'gzip': bytes, 'br': bytes} — variants that exist."""
+    raw     = dumps(data)
+    payload = {'identity': raw}
+    if len(raw) >= MIN_COMPRESS_BYTES:
+        payload['gzip'] = gzip.compress(raw, GZIP_LEVEL, mtime=0)
+        if brotli is not None:
+            payload['br'] = brotli.compress(raw, quality=BROTLI_QUALITY)
+    return payload
+
+
+def accepted_encodings(request):
+    """Accept-Encoding → set of codings with q > 0 ('*' expanded)."""
+    accepted = set()
+    refused  = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        (accepted if q > 0 else refused).add(coding)
+    if '*' in accepted:
+        accepted |= set(ENCODINGS) - refused
+    return accepted
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# VALIDATORS
+# ───────────────────────────────────────────────────────────────────────────
+
+def version_etag(stamp):
+    """Weak ETag for a caching.stamp() — the body differs per Content-Encoding."""
+    digest = hashlib.md5(repr(stamp).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def version_last_modified(stamp):
+    """Versions are ms timestamps — the newest one is when the data last changed."""
+    return datetime.fromtimestamp(max(stamp) / 1000, tz=timezone.utc) if stamp else None
+
+
+def conditional(tags):
+    """
+    ETag / Last-Modified from the versions of `tags` (a list, or a callable
+    (request, *args, **kwargs) -> list), with 304s short-circuiting the view.
+    """
+    def current_stamp(request, *args, **kwargs):
+        # Both validator functions ask — read the versions once per request
+        if not hasattr(request, '_version_stamp'):
+            names = tags(request, *args, **kwargs) if callable(tags) else tags
+            request._version_stamp = caching.stamp(names)
+        return request._version_stamp
+
+    def etag(request, *args, **kwargs):
+        return version_etag(current_stamp(request, *args, **kwargs))
+
+    def last_modified(request, *args, **kwargs):
+        return version_last_modified(current_stamp(request, *args, **kwargs))
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        def finish(response):
+            if response.status_code in (200, 304):
+                patch_cache_control(response, no_cache=True)
+            else:
+                # An error isn't "the data at this version" — no validators
+                del response['ETag']
+                del response['Last-Modified']
+            return response
+
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            return finish(conditional_view(request, *args, **kwargs))
+        return wrapped
+    return decorator
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# RESPONSES
+# ───────────────────────────────────────────────────────────────────────────
+
+def respond(request, payload, status=200, built_from=None):
+    """
+    HttpResponse for an encode()d payload. built_from (a caching.stamp())
+    sets the validators — @conditional only fills in headers not set here.
+    """
+    accepted = accepted_encodings(request)
+    coding   = next((c for c in ENCODINGS if c in payload and c in accepted), None)
+
+    response = HttpResponse(
+        payload[coding or 'identity'], status=status, content_type='application/json',
+    )
+    if coding:
+        response['Content-Encoding'] = coding
+    if len(payload) > 1:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    response['Content-Length'] = str(len(response.content))
+    if built_from is not None:
+        response['ETag'] = version_etag(built_from)
+        if built_from:
+            response['Last-Modified'] = http_date(version_last_modified(built_from).timestamp())
+    return response
+
+
+def cached_json(request, base, build, tags=(), timeout=300):
+    """Tag-versioned cache of build()'s encoded payload."""
+    payload = caching.get_or_set(f'http:{base}', tags, lambda: encode(build()), timeout)
+    return respond(request, payload)
+
+
+def swr_json(request, base, build, tags=(), soft_ttl=300, hard_ttl=3600):
+    """Same, stale-while-revalidate (see caching.swr_get)."""
+    payload, built_from = caching.swr_entry(f'http:{base}', lambda: encode(build()), tags, soft_ttl, hard_ttl)
+    return respond(request, payload, built_from=built_from)
+
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sonyApp import caching, thumbs
+from sonyApp.models import UpNextQueue, Video
+
+
+class Command(BaseCommand):
+    help = 'Build the inline LQIP placeholder for videos that have none (backfill / after a failed fetch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='At most N videos, newest first (default: all)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Parallel thumbnail downloads (default: 8)'
+        )
+        parser.add_argument(
+            '--evict',
+            action='store_true',
+            help='Also trim the /thumb/ disk cache to THUMB_CACHE_MAX_MB'
+        )
+
+    def handle(self, *args, **options):
+        videos = (
+            Video.objects
+            .filter(lqip='', is_active=True)
+            .only('pk', 'channel_id', 'youtube_video_id', 'thumbnail_url', 'thumbnails', 'lqip')
+            .order_by('-published_at')
+        )
+        if options['limit']:
+            videos = videos[:options['limit']]
+        videos = list(videos)
+        self.stdout.write(self.style.SUCCESS(f'🖼️  Building LQIP for {len(videos)} videos...'))
+
+        def build(video):
+            try:
+                thumbs.ensure_lqip(video)
+            finally:
+                close_old_connections()
+            return video
+
+        done     = 0
+        channels = set()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for video in pool.map(build, videos):
+                done += 1
+                if video.lqip:
+                    channels.add(video.channel_id)
+                if done % 100 == 0:
+                    self.stdout.write(f'   📹 {done}/{len(videos)}...', ending='\r')
+                    self.stdout.flush()
+
+        # Up-next cards carry the placeholder too
+        for channel_pk in channels:
+            UpNextQueue.rebuild(channel_pk)
+        caching.bump(*caching.INGEST_TAGS)
+
+        built = sum(1 for v in videos if v.lqip)
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Done! {built}/{len(videos)} placeholders built'))
+
+        if options['evict']:
+            removed = thumbs.evict()
+            self.stdout.write(self.style.SUCCESS(f'🧹 Evicted {removed} cached thumbnails'))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from sonyApp import read_model
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the local read-only catalogue snapshot (sonyApp/read_model.py) and swap it in'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=None,
+            help='Write here instead of settings.READ_MODEL_PATH'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('🗂️  Building read model...'))
+        started = time.monotonic()
+
+        counts = read_model.build(options['path'], aggregates=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Done! {counts['channels']} channels, {counts['videos']} videos "
+            f"({counts['changed_channels']} channels changed) in {time.monotonic() - started:.1f}s"
+        ))
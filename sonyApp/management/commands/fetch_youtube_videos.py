@@ -17,22 +17,40 @@ Usage:
   python manage.py fetch_youtube_videos --channel my_channel_id
   python manage.py fetch_youtube_videos --days 7
   python manage.py fetch_youtube_videos --check-embeddable-only
+  python manage.py fetch_youtube_videos --check-embeddable-only --unchecked
+  python manage.py fetch_youtube_videos --channel my_channel_id --backfill
+  python manage.py fetch_youtube_videos --channel my_channel_id --backfill --restart
+
+Backfill mode bulk-inserts one checkpointed page at a time (resumable);
+its rows stay unlisted until the --check-embeddable-only --unchecked pass.
 """
 
+import argparse
+import contextvars
 import isodate
 import requests
 import threading
+import time
+from collections        import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime           import datetime, timedelta
 
 from django.core.management.base import BaseCommand
 from django.conf                  import settings
+from django.db                    import transaction
+from django.db.models             import F
 from django.utils                 import timezone
 
-from googleapiclient.discovery    import build
 from googleapiclient.errors       import HttpError
 
-from sonyApp.models import Channel, Video
+from sonyApp.models         import Channel, ChannelBackfill, SiteStats, UpNextQueue, Video
+from sonyApp                import caching, read_model
+from sonyApp.artist_tagging import tag_videos
+from sonyApp.search         import build_search_text
+from sonyApp.sync_runs      import tracked_run
+from sonyApp.tasks          import fill_lqip
+from sonyApp.thumbs         import best_url, thumbnails_from_snippet
+from sonyApp.youtube_client import get_youtube, execute
 
 
 # ── Shared HTTP session (keep-alive, reused across threads) ──────────────────
@@ -42,6 +60,9 @@ _session.headers.update({'User-Agent': 'Mozilla/5.0'})
 # noembed.com returns {"error":"..."} for non-embeddable, {"html":"<iframe..."} for embeddable
 NOEMBED_URL = "https://noembed.com/embed?url=https://www.youtube.com/watch?v={video_id}"
 
+# Backfill: videos().list calls in flight while the next playlist page is fetched
+BACKFILL_WORKERS = 4
+
 
 def check_embeddable(video_id: str) -> bool:
     """
@@ -89,12 +110,29 @@ class Command(BaseCommand):
                             help='Re-fetch and update existing videos')
         parser.add_argument('--check-embeddable-only', action='store_true',
                             help='Only re-check embeddability for existing videos (fast, no quota)')
+        parser.add_argument('--unchecked', action='store_true',
+                            help='With --check-embeddable-only: only videos whose check was deferred')
+        parser.add_argument('--backfill', action='store_true',
+                            help='Resumable bulk import of a whole channel (requires --channel)')
+        parser.add_argument('--restart', action='store_true',
+                            help='With --backfill: discard the checkpoint and start from page 1')
+        parser.add_argument('--sync-run', type=int, help=argparse.SUPPRESS)   # SyncRun pk from a cron view
 
     def handle(self, *args, **options):
+        kind = (
+            'backfill'    if options.get('backfill') else
+            'embed_check' if options.get('check_embeddable_only') else
+            'fetch'
+        )
+        with tracked_run(self, kind, options.get('sync_run')) as run:
+            self.sync_run = run
+            self.fetch(**options)
+
+    def fetch(self, **options):
 
         # ── Special mode: just re-check embeddability ─────────────────────
         if options.get('check_embeddable_only'):
-            self.recheck_all_embeddability()
+            self.recheck_all_embeddability(only_unchecked=options.get('unchecked', False))
             return
 
         api_key = getattr(settings, 'YOUTUBE_API_KEY', None)
@@ -102,7 +140,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('❌ YOUTUBE_API_KEY not configured in settings'))
             return
 
-        youtube    = build('youtube', 'v3', developerKey=api_key)
+        youtube    = get_youtube()
         max_videos = options.get('recent') or options.get('max_videos') or 50
 
         # Date filter
@@ -120,6 +158,18 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR('❌ Invalid date format. Use YYYY-MM-DD'))
                 return
 
+        # ── Backfill mode: one channel, checkpointed, bulk writes ─────────
+        if options.get('backfill'):
+            if not options.get('channel'):
+                self.stdout.write(self.style.ERROR('❌ --backfill requires --channel'))
+                return
+            channel = Channel.objects.filter(channel_id=options['channel'], is_active=True).first()
+            if channel is None:
+                self.stdout.write(self.style.ERROR(f'❌ Channel not found: {options["channel"]}'))
+                return
+            self.backfill_channel(channel, restart=options.get('restart', False))
+            return
+
         # Channels to process
         if options.get('channel'):
             channels = Channel.objects.filter(channel_id=options['channel'], is_active=True)
@@ -138,6 +188,8 @@ class Command(BaseCommand):
         ))
 
         total_new = total_updated = total_skipped = total_blocked = 0
+        self.stats_delta  = {'videos': 0, 'monthly_views': 0, 'subscribers': 0}
+        self.lqip_pending = []   # queued once per run (tasks.fill_lqip)
 
         for channel in channels:
             self.stdout.write(f'\n📺 {channel.name}')
@@ -152,6 +204,9 @@ class Command(BaseCommand):
                 total_updated += updated
                 total_skipped += skipped
                 total_blocked += blocked
+                if new or updated:
+                    UpNextQueue.rebuild(channel.pk)
+                self.sync_run.bump(channels=1, new=new, updated=updated, skipped=skipped, blocked=blocked)
 
                 self.stdout.write(self.style.SUCCESS(
                     f'   ✅ New: {new} | Updated: {updated} | '
@@ -160,10 +215,18 @@ class Command(BaseCommand):
 
             except HttpError as e:
                 self.stdout.write(self.style.ERROR(f'   ❌ YouTube API error: {e}'))
+                self.sync_run.record_error(f'{channel.name}: {e}')
             except Exception as e:
                 import traceback
                 self.stdout.write(self.style.ERROR(f'   ❌ Error: {e}'))
                 self.stdout.write(self.style.ERROR(traceback.format_exc()))
+                self.sync_run.record_error(f'{channel.name}: {e}')
+
+        SiteStats.apply_delta(**self.stats_delta)
+        if total_new or total_updated:
+            caching.bump(*caching.INGEST_TAGS)
+        if self.lqip_pending:
+            fill_lqip(self.lqip_pending)
 
         self.stdout.write(self.style.SUCCESS(
             f'\n✅ Done!\n'
@@ -178,18 +241,21 @@ class Command(BaseCommand):
                               date_filter=None, update_existing=False):
         new_count = updated_count = skipped_count = blocked_count = 0
 
-        ch_resp = youtube.channels().list(
+        ch_resp = execute(youtube.channels().list(
             part='contentDetails,statistics',
             id=channel.youtube_channel_id
-        ).execute()
+        ))
 
         if not ch_resp.get('items'):
             self.stdout.write(self.style.WARNING('   ⚠️  Channel not found on YouTube'))
             return new_count, updated_count, skipped_count, blocked_count
 
-        stats = ch_resp['items'][0].get('statistics', {})
-        channel.subscriber_count = int(stats.get('subscriberCount', 0))
-        channel.save(update_fields=['subscriber_count'])
+        stats    = ch_resp['items'][0].get('statistics', {})
+        new_subs = int(stats.get('subscriberCount', 0))
+        if new_subs != channel.subscriber_count:   # unchanged → no write, no cache bump
+            self.stats_delta['subscribers'] += new_subs - channel.subscriber_count
+            channel.subscriber_count = new_subs
+            channel.save(update_fields=['subscriber_count'])
         self.stdout.write(f'   📊 Subscribers: {channel.subscriber_count:,}')
 
         uploads_id = ch_resp['items'][0]['contentDetails']['relatedPlaylists']['uploads']
@@ -199,21 +265,21 @@ class Command(BaseCommand):
         while fetched < max_videos:
             batch = min(50, max_videos - fetched)
 
-            pl_resp = youtube.playlistItems().list(
+            pl_resp = execute(youtube.playlistItems().list(
                 part='contentDetails',
                 playlistId=uploads_id,
                 maxResults=batch,
                 pageToken=next_page,
-            ).execute()
+            ))
 
             video_ids = [i['contentDetails']['videoId'] for i in pl_resp.get('items', [])]
             if not video_ids:
                 break
 
-            vids_resp = youtube.videos().list(
+            vids_resp = execute(youtube.videos().list(
                 part='snippet,contentDetails,statistics,status',
                 id=','.join(video_ids),
-            ).execute()
+            ))
 
             for vdata in vids_resp.get('items', []):
                 fetched += 1
@@ -261,9 +327,8 @@ class Command(BaseCommand):
 
         return new_count, updated_count, skipped_count, blocked_count
 
-    # ── Save / update one video ───────────────────────────────────────────────
-    def save_video(self, channel, vdata, is_embeddable: bool) -> bool:
-        vid_id  = vdata['id']
+    # ── Map one videos().list item to Video field values ──────────────────────
+    def video_fields(self, channel, vdata) -> dict:
         snippet = vdata['snippet']
         details = vdata['contentDetails']
         stats   = vdata.get('statistics', {})
@@ -276,51 +341,221 @@ class Command(BaseCommand):
             total_secs   = 0
             duration_str = '0:00'
 
-        is_short = 0 < total_secs <= 60
+        is_short = Video.is_short_duration(total_secs)
 
         pub_dt = datetime.fromisoformat(
             snippet['publishedAt'].replace('Z', '+00:00')
         )
 
-        thumbs = snippet.get('thumbnails', {})
-        thumb  = (
-            thumbs.get('maxres', {}).get('url') or
-            thumbs.get('high',   {}).get('url') or
-            thumbs.get('medium', {}).get('url') or
-            thumbs.get('default',{}).get('url', '')
-        )
+        thumbs = thumbnails_from_snippet(snippet)
+
+        title = snippet.get('title', 'Untitled')
+        return {
+            'channel':       channel,
+            'title':         title,
+            'description':   snippet.get('description', ''),
+            'thumbnail_url': best_url(thumbs),
+            'thumbnails':    thumbs,
+            'duration':      duration_str,
+            'view_count':    int(stats.get('viewCount', 0)),
+            'like_count':    int(stats.get('likeCount', 0)),
+            'published_at':  pub_dt,
+            'is_active':     True,
+            'is_short':      is_short,
+            'search_text':   build_search_text(title, channel.name),   # bulk_create skips save()
+        }
 
-        _, created = Video.objects.update_or_create(
-            youtube_video_id=vid_id,
-            defaults={
-                'channel':       channel,
-                'title':         snippet.get('title', 'Untitled'),
-                'description':   snippet.get('description', ''),
-                'thumbnail_url': thumb,
-                'duration':      duration_str,
-                'view_count':    int(stats.get('viewCount', 0)),
-                'like_count':    int(stats.get('likeCount', 0)),
-                'published_at':  pub_dt,
-                'is_active':     True,
-                'is_short':      is_short,
-                'is_embeddable': is_embeddable,
-            }
+    # ── Save / update one video ───────────────────────────────────────────────
+    def save_video(self, channel, vdata, is_embeddable: bool) -> bool:
+        defaults = self.video_fields(channel, vdata)
+        defaults['is_embeddable']    = is_embeddable
+        defaults['embed_checked_at'] = timezone.now()
+
+        before = Video.counter_row(vdata['id'])
+        video, created = Video.objects.update_or_create(
+            youtube_video_id=vdata['id'],
+            defaults=defaults,
         )
+        Channel.apply_video_save(before, video)
+        SiteStats.add_video_save(self.stats_delta, before, video)
+        tag_videos([video])
+        if not video.lqip:
+            self.lqip_pending.append(video.pk)
         return created
 
+    # ── Backfill: resumable, pipelined, bulk-inserted channel import ──────────
+    def backfill_channel(self, channel, restart=False):
+        state, _ = ChannelBackfill.objects.get_or_create(channel=channel)
+
+        if restart:
+            state.page_token  = ''
+            state.pages_done  = 0
+            state.videos_done = 0
+            state.finished_at = None
+            state.save()
+        elif state.finished_at:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {channel.name} already backfilled ({state.videos_done} videos). '
+                f'Use --restart to run again.'
+            ))
+            return
+
+        youtube = get_youtube()
+        ch_resp = execute(youtube.channels().list(
+            part='contentDetails,statistics',
+            id=channel.youtube_channel_id
+        ))
+        if not ch_resp.get('items'):
+            self.stdout.write(self.style.WARNING('   ⚠️  Channel not found on YouTube'))
+            return
+
+        item       = ch_resp['items'][0]
+        uploads_id = item['contentDetails']['relatedPlaylists']['uploads']
+        state.total_estimate = int(item.get('statistics', {}).get('videoCount', 0))
+        state.save(update_fields=['total_estimate', 'updated_at'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📦 Backfilling {channel.name} — ~{state.total_estimate:,} uploads'
+            + (f' (resuming at page {state.pages_done + 1})' if state.page_token else '')
+        ))
+
+        existing   = set(Video.objects.filter(channel=channel).values_list('youtube_video_id', flat=True))
+        started    = time.monotonic()
+        run_videos = 0
+        inserted   = 0
+        token      = state.page_token or None
+        in_flight  = deque()   # (future of videos().list items, token of the page AFTER it)
+
+        def commit_oldest():
+            nonlocal inserted, run_videos
+            future, after_token = in_flight.popleft()
+            items    = future.result()
+            page_new = self._write_backfill_page(channel, state, items, after_token, existing)
+            inserted   += page_new
+            run_videos += len(items)
+            self.sync_run.bump(pages=1, new=page_new, skipped=len(items) - page_new)
+            self._report_backfill_progress(state, run_videos, started)
+
+        with ThreadPoolExecutor(max_workers=BACKFILL_WORKERS) as pool:
+            try:
+                while True:
+                    pl_resp = execute(youtube.playlistItems().list(
+                        part='contentDetails',
+                        playlistId=uploads_id,
+                        maxResults=50,
+                        pageToken=token,
+                    ))
+                    video_ids  = [i['contentDetails']['videoId'] for i in pl_resp.get('items', [])]
+                    next_token = pl_resp.get('nextPageToken')
+
+                    if video_ids:
+                        # copy_context: the worker's API calls are charged to this run
+                        in_flight.append((
+                            pool.submit(contextvars.copy_context().run, self._fetch_video_details, video_ids),
+                            next_token,
+                        ))
+
+                    # Commit pages strictly in order so the checkpoint is always valid
+                    while in_flight and (len(in_flight) >= BACKFILL_WORKERS or not next_token):
+                        commit_oldest()
+
+                    if not next_token:
+                        break
+                    token = next_token
+            except BaseException:
+                # Keep pages already fetched — the next run resumes after them
+                while in_flight and in_flight[0][0].exception() is None:
+                    commit_oldest()
+                raise
+
+        state.page_token  = ''
+        state.finished_at = timezone.now()
+        state.save(update_fields=['page_token', 'finished_at', 'updated_at'])
+        UpNextQueue.rebuild(channel.pk)
+        if inserted:
+            caching.bump(*caching.INGEST_TAGS)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Backfill done in {timedelta(seconds=int(elapsed))}\n'
+            f'   Inserted: {inserted}\n'
+            f'   Pages:    {state.pages_done}\n'
+        ))
+
+        # Deferred noembed.com pass — lists the new rows that embed
+        self.recheck_all_embeddability(only_unchecked=True)
+
+    def _fetch_video_details(self, video_ids):
+        """Worker-thread side: API only, no DB access (get_youtube() is per thread)."""
+        return execute(get_youtube().videos().list(
+            part='snippet,contentDetails,statistics',
+            id=','.join(video_ids),
+        )).get('items', [])
+
+    def _write_backfill_page(self, channel, state, items, after_token, existing) -> int:
+        rows = []
+        for vdata in items:
+            if vdata['id'] in existing:
+                continue
+            video = Video(youtube_video_id=vdata['id'], **self.video_fields(channel, vdata))
+            video.is_embeddable = False   # unlisted until the deferred check (embed_checked_at NULL)
+            rows.append(video)
+            existing.add(vdata['id'])
+
+        with transaction.atomic():
+            Video.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+            if rows:
+                # New rows are active but not embeddable until the deferred check
+                Channel.objects.filter(pk=channel.pk).update(
+                    video_count=F('video_count') + len(rows),
+                    short_count=F('short_count') + sum(v.is_short for v in rows),
+                )
+                month_ago = timezone.now() - timedelta(days=30)
+                SiteStats.apply_delta(
+                    videos=len(rows),
+                    monthly_views=sum(v.view_count for v in rows if v.published_at >= month_ago),
+                )
+                # ignore_conflicts leaves pks unset — re-read the new rows to tag them
+                tag_videos(
+                    Video.objects
+                    .filter(youtube_video_id__in=[v.youtube_video_id for v in rows])
+                    .only('pk', 'title', 'description', 'published_at')
+                )
+            state.page_token   = after_token or ''
+            state.pages_done  += 1
+            state.videos_done += len(items)
+            state.save(update_fields=['page_token', 'pages_done', 'videos_done', 'updated_at'])
+        return len(rows)
+
+    def _report_backfill_progress(self, state, run_videos, started):
+        elapsed = time.monotonic() - started
+        rate    = run_videos / elapsed if elapsed else 0
+        total   = max(state.total_estimate, state.videos_done)
+        pct     = state.videos_done * 100 // total if total else 100
+        eta     = timedelta(seconds=int((total - state.videos_done) / rate)) if rate else '?'
+        self.stdout.write(
+            f'   📹 {state.videos_done:,}/{total:,} ({pct}%) · {rate:.0f}/s · ETA {eta}',
+            ending='\r'
+        )
+        self.stdout.flush()
+
     # ── Re-check embeddability for ALL existing DB videos (parallel) ──────────
-    def recheck_all_embeddability(self):
+    def recheck_all_embeddability(self, only_unchecked=False):
         """
         Parallel embeddability re-check using 30 threads.
         Does NOT use YouTube API quota — only calls noembed.com.
 
         Run with:  python manage.py fetch_youtube_videos --check-embeddable-only
+        only_unchecked → just the videos a backfill deferred (embed_checked_at NULL)
         """
         THREADS = 30
 
+        videos_qs = Video.objects.filter(is_active=True)
+        if only_unchecked:
+            videos_qs = videos_qs.filter(embed_checked_at__isnull=True)
+
         videos = list(
-            Video.objects.filter(is_active=True)
-            .values('id', 'youtube_video_id', 'title', 'is_embeddable')
+            videos_qs.values('id', 'youtube_video_id', 'title', 'is_embeddable')
         )
         total = len(videos)
 
@@ -369,11 +604,26 @@ class Command(BaseCommand):
 
         # Bulk DB update — max 2 queries total
         if to_block:
-            Video.objects.filter(id__in=to_block).update(is_embeddable=False)
+            blocked_qs = Video.objects.filter(id__in=to_block)
+            Channel.shift_counters(blocked_qs.filter(is_embeddable=True), -1, only=['embeddable_count'])
+            blocked_qs.update(is_embeddable=False)
+            read_model.hide(*to_block)
         if to_unblock:
-            Video.objects.filter(id__in=to_unblock).update(is_embeddable=True)
+            unblocked_qs = Video.objects.filter(id__in=to_unblock)
+            unblocked_qs.update(is_embeddable=True)
+            Channel.shift_counters(unblocked_qs, +1, only=['embeddable_count'])
+
+        # Stamp everything checked (chunked — IN lists stay under SQLite's variable limit)
+        checked_at = timezone.now()
+        video_pks  = [v['id'] for v in videos]
+        for i in range(0, len(video_pks), 1000):
+            Video.objects.filter(id__in=video_pks[i:i + 1000]).update(embed_checked_at=checked_at)
 
         changed = len(to_block) + len(to_unblock)
+        if changed:
+            UpNextQueue.rebuild_for_videos(to_block + to_unblock)
+            caching.bump(*caching.INGEST_TAGS)
+        self.sync_run.bump(checked=processed[0], changed=changed, blocked=blocked_count[0])
         self.stdout.write(self.style.SUCCESS(
             f'\n✅ Done!\n'
             f'   Checked:    {processed[0]}\n'
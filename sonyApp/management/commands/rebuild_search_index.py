@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+from sonyApp import search
+from sonyApp.models import Channel, Video
+
+
+class Command(BaseCommand):
+    help = 'Re-stamp Video.search_text and rebuild the search index (FTS5 / tsvector + trigram)'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'🔎 Rebuilding search index ({connection.vendor})...'))
+
+        stamped = 0
+        for channel_pk, name in Channel.objects.values_list('pk', 'name'):
+            stamped += Video.objects.filter(channel_id=channel_pk).update(
+                search_text=Concat('title', Value(' ' + name))
+            )
+        self.stdout.write(f'   📝 search_text refreshed on {stamped} videos')
+
+        search.install_index(connection)
+
+        self.stdout.write(self.style.SUCCESS('✅ Done!'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from sonyApp.models import Channel
+
+
+class Command(BaseCommand):
+    help = 'Recount Channel.video_count / short_count / embeddable_count and fix any drift'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('🔢 Reconciling channel counters...'))
+
+        drifted = Channel.reconcile_counters()
+
+        for ch in drifted:
+            self.stdout.write(self.style.WARNING(
+                f'   ⚠️  {ch.name}: videos={ch.video_count} shorts={ch.short_count} '
+                f'embeddable={ch.embeddable_count}'
+            ))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Done! {len(drifted)} channel(s) corrected'))
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sonyApp import caching
+from sonyApp.artist_tagging import get_matcher, tag_videos
+from sonyApp.models import Video
+
+CHUNK = 2000
+
+
+class Command(BaseCommand):
+    help = 'Re-tag videos with artists (VideoArtist) — run after adding artists or aliases'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Only videos published in the last N days (default: all)'
+        )
+
+    def handle(self, *args, **options):
+        videos = Video.objects.only('pk', 'title', 'description', 'published_at').order_by('pk')
+        if options['days']:
+            videos = videos.filter(published_at__gte=timezone.now() - timedelta(days=options['days']))
+
+        total = videos.count()
+        self.stdout.write(self.style.SUCCESS(f'🎤 Tagging {total} videos...'))
+
+        matcher = get_matcher()
+        done    = 0
+        links   = 0
+        chunk   = []
+        for video in videos.iterator(chunk_size=CHUNK):
+            chunk.append(video)
+            if len(chunk) == CHUNK:
+                links += tag_videos(chunk, matcher)
+                done  += len(chunk)
+                chunk  = []
+                self.stdout.write(f'   📹 {done}/{total}...', ending='\r')
+                self.stdout.flush()
+        if chunk:
+            links += tag_videos(chunk, matcher)
+            done  += len(chunk)
+
+        caching.bump('artists')
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Done! {done} videos, {links} artist links'))
@@ -1,11 +1,15 @@
 # sonyApp/management/commands/update_video_stats.py
+import argparse
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.conf import settings
+from django.db.models import F
 from datetime import timedelta
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from sonyApp.models import Video, Channel
+from sonyApp import caching, read_model
+from sonyApp.models import Video, Channel, SiteStats, UpNextQueue
+from sonyApp.sync_runs import tracked_run
+from sonyApp.youtube_client import get_youtube, execute
 import time
 import logging
 
@@ -33,18 +37,34 @@ class Command(BaseCommand):
             type=str,
             help='Update only a specific channel (channel_id)'
         )
+        parser.add_argument(
+            '--resurrect',
+            action='store_true',
+            help='Only re-check tombstoned videos and reactivate those YouTube returns again'
+        )
+        parser.add_argument('--sync-run', type=int, help=argparse.SUPPRESS)   # SyncRun pk from a cron view
 
     def handle(self, *args, **options):
+        kind = 'resurrect' if options['resurrect'] else 'stats'
+        with tracked_run(self, kind, options.get('sync_run')) as run:
+            self.sync_run = run
+            self.update_stats(**options)
+
+    def update_stats(self, **options):
         self.stdout.write(self.style.SUCCESS('🚀 Starting 6h video stats update...'))
 
         # ── Init YouTube API ─────────────────────────────────────────────────
         try:
-            youtube = build('youtube', 'v3', developerKey=settings.YOUTUBE_API_KEY)
+            youtube = get_youtube()
             self.stdout.write("✅ YouTube API initialised")
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'❌ Failed to initialise YouTube API: {e}'))
             return
 
+        if options['resurrect']:
+            self.resurrect_tombstoned(youtube, options['batch_size'])
+            return
+
         # ── Build queryset ───────────────────────────────────────────────────
         cutoff_date = timezone.now() - timedelta(days=options['days'])
         videos_qs = Video.objects.filter(
@@ -70,6 +90,9 @@ class Command(BaseCommand):
         updated      = 0
         errors       = 0
         now          = timezone.now()
+        missing_pks  = []   # not returned by YouTube this run
+        found_again  = []   # returned again after earlier misses
+        touched      = set()   # channel pks whose view counts changed (page-cache tags)
 
         for i in range(0, total_videos, batch_size):
             batch      = videos[i:i + batch_size]
@@ -80,10 +103,10 @@ class Command(BaseCommand):
             self.stdout.write(f"\n🔄 Batch {batch_num}/{total_batches}  ({len(batch)} videos)")
 
             try:
-                response = youtube.videos().list(
+                response = execute(youtube.videos().list(
                     part='statistics',
                     id=','.join(video_ids)
-                ).execute()
+                ))
 
                 returned_ids = {item['id'] for item in response.get('items', [])}
 
@@ -98,6 +121,9 @@ class Command(BaseCommand):
                     # ⭐ CORE CALL — stores timestamp-based 6h snapshot
                     video.save_6h_snapshot(current_views)
                     updated += 1
+                    touched.add(video.channel_id)
+                    if video.missing_count:
+                        found_again.append(video.pk)
 
                     # Determine which section this video belongs to now
                     section_label = (
@@ -120,12 +146,14 @@ class Command(BaseCommand):
                         f"7d: {weekly_g if weekly_g != '-' else '-':>8}"
                     )
 
-                # Warn about videos not returned (deleted / private)
+                # Videos not returned are deleted / private — count the miss
                 for video in batch:
                     if video.youtube_video_id not in returned_ids:
+                        missing_pks.append(video.pk)
                         self.stdout.write(
                             self.style.WARNING(
-                                f"  ⚠️  Not found on YouTube: {video.youtube_video_id}"
+                                f"  ⚠️  Not found on YouTube: {video.youtube_video_id} "
+                                f"(miss {video.missing_count + 1}/{settings.TOMBSTONE_AFTER_MISSES})"
                             )
                         )
 
@@ -134,10 +162,21 @@ class Command(BaseCommand):
             except HttpError as e:
                 self.stdout.write(self.style.ERROR(f'❌ YouTube API error: {e}'))
                 errors += len(batch)
+                self.sync_run.record_error(e)
 
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f'❌ Unexpected error: {e}'))
                 errors += len(batch)
+                self.sync_run.record_error(e)
+
+            self.sync_run.bump(batches=1)
+
+        # ── Misses & tombstones — bulk, once per run ─────────────────────────
+        tombstoned = self.apply_misses(missing_pks, found_again, now)
+        self.sync_run.bump(updated=updated, missing=len(missing_pks), tombstoned=tombstoned)
+        SiteStats.refresh()
+        self.build_read_model()
+        caching.bump(*caching.CATALOGUE_TAGS, *(f'channel:{pk}' for pk in touched))
 
         # ── Summary ──────────────────────────────────────────────────────────
         self.stdout.write("\n" + "=" * 72)
@@ -145,6 +184,8 @@ class Command(BaseCommand):
         self.stdout.write(f"   🕐 Run at  : {now.strftime('%Y-%m-%d %H:%M')} UTC")
         self.stdout.write(f"   ✅ Updated : {updated} videos")
         self.stdout.write(f"   ❌ Errors  : {errors} videos")
+        self.stdout.write(f"   ⚠️  Missing : {len(missing_pks)} videos")
+        self.stdout.write(f"   🪦 Tombstoned: {tombstoned} videos")
 
         # Section counts
         hot_count    = sum(1 for v in videos if v.in_hot_and_new())
@@ -159,4 +200,86 @@ class Command(BaseCommand):
         for video in videos[:3]:
             self.stdout.write(f"   • {video.title[:40]} | {video.get_history_summary()}")
 
-        self.stdout.write("=" * 72)
\ No newline at end of file
+        self.stdout.write("=" * 72)
+
+    def build_read_model(self):
+        """
+        Rebuild the snapshot BEFORE bumping 'growth' — this command is the
+        only place that tag moves, and pages re-rendered after the bump
+        must read the new growth rows. A failed build keeps the old one.
+        """
+        try:
+            read_model.build(aggregates=True)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Read model build failed: {e}'))
+            self.sync_run.record_error(e)
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # TOMBSTONES
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def apply_misses(self, missing_pks, found_again, now):
+        """
+        Bump missing_count for videos YouTube didn't return, reset it for
+        videos that came back, and deactivate the ones that hit
+        TOMBSTONE_AFTER_MISSES. Returns the number tombstoned.
+        Only batches whose API call succeeded contribute misses.
+        """
+        if found_again:
+            Video.objects.filter(pk__in=found_again).update(missing_count=0)
+        if not missing_pks:
+            return 0
+
+        Video.objects.filter(pk__in=missing_pks).update(missing_count=F('missing_count') + 1)
+        expired = Video.objects.filter(
+            pk__in=missing_pks,
+            missing_count__gte=settings.TOMBSTONE_AFTER_MISSES,
+            is_active=True,
+        )
+        expired_pks = list(expired.values_list('pk', flat=True))
+        if not expired_pks:
+            return 0
+
+        Channel.shift_counters(expired, -1)
+        tombstoned = Video.objects.filter(pk__in=expired_pks).update(is_active=False, tombstoned_at=now)
+        read_model.hide(*expired_pks)
+        UpNextQueue.rebuild_for_videos(expired_pks)
+        return tombstoned
+
+    def resurrect_tombstoned(self, youtube, batch_size):
+        """
+        Low-priority pass (daily): re-ask YouTube about tombstoned videos and
+        reactivate any that are public again. One bulk update at the end.
+        """
+        tombstoned = list(
+            Video.objects
+            .filter(is_active=False, tombstoned_at__isnull=False)
+            .values_list('pk', 'youtube_video_id')
+        )
+        self.stdout.write(f"🪦 Re-checking {len(tombstoned)} tombstoned videos")
+
+        revived = []
+        for i in range(0, len(tombstoned), batch_size):
+            batch = dict((vid, pk) for pk, vid in tombstoned[i:i + batch_size])
+            try:
+                response = execute(youtube.videos().list(
+                    part='id',
+                    id=','.join(batch)
+                ))
+            except HttpError as e:
+                self.stdout.write(self.style.ERROR(f'❌ YouTube API error: {e}'))
+                self.sync_run.record_error(e)
+                continue
+            revived += [batch[item['id']] for item in response.get('items', []) if item['id'] in batch]
+
+        if revived:
+            Video.objects.filter(pk__in=revived).update(
+                is_active=True, missing_count=0, tombstoned_at=None,
+            )
+            Channel.shift_counters(Video.objects.filter(pk__in=revived), +1)
+            UpNextQueue.rebuild_for_videos(revived)
+            SiteStats.refresh()
+            self.build_read_model()
+            caching.bump(*caching.CATALOGUE_TAGS)
+        self.sync_run.bump(checked=len(tombstoned), resurrected=len(revived))
+        self.stdout.write(self.style.SUCCESS(f"✅ Resurrected {len(revived)} videos"))
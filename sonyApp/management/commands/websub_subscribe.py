@@ -0,0 +1,104 @@
+"""
+management/commands/websub_subscribe.py
+
+Subscribes active channels' upload feeds to the WebSub hub (push instead of
+polling); run daily to renew leases close to expiry.
+
+Usage:
+  python manage.py websub_subscribe
+  python manage.py websub_subscribe --renew-within 48
+  python manage.py websub_subscribe --all
+  python manage.py websub_subscribe --channel my_channel_id
+  python manage.py websub_subscribe --unsubscribe --channel my_channel_id
+"""
+
+from datetime import timedelta
+
+import requests
+
+from django.conf                  import settings
+from django.core.management.base  import BaseCommand
+from django.db.models             import Q
+from django.utils                 import timezone
+
+from sonyApp.models import Channel
+
+
+class Command(BaseCommand):
+    help = 'Subscribe / renew WebSub leases for all active channels'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channel',      type=str, help='Specific channel_id to (un)subscribe')
+        parser.add_argument('--renew-within', type=int, default=24,
+                            help='Renew leases expiring within N hours (default 24)')
+        parser.add_argument('--all',          action='store_true',
+                            help='Re-subscribe every channel regardless of lease')
+        parser.add_argument('--unsubscribe',  action='store_true',
+                            help='Unsubscribe instead of subscribe')
+        parser.add_argument('--callback',     type=str,
+                            help='Override WEBSUB_CALLBACK_URL')
+
+    def handle(self, *args, **options):
+        callback = options.get('callback') or settings.WEBSUB_CALLBACK_URL
+        if not callback:
+            self.stdout.write(self.style.ERROR('❌ WEBSUB_CALLBACK_URL not configured'))
+            return
+        if not settings.WEBSUB_SECRET:
+            # Unsigned notifications are ignored by the callback — no point subscribing
+            self.stdout.write(self.style.ERROR('❌ WEBSUB_SECRET not configured'))
+            return
+
+        mode = 'unsubscribe' if options['unsubscribe'] else 'subscribe'
+
+        channels = Channel.objects.filter(is_active=True)
+        if options.get('channel'):
+            channels = Channel.objects.filter(channel_id=options['channel'])
+        elif mode == 'subscribe' and not options['all']:
+            renew_before = timezone.now() + timedelta(hours=options['renew_within'])
+            channels = channels.filter(
+                Q(websub_lease_expires_at__isnull=True) |
+                Q(websub_lease_expires_at__lte=renew_before)
+            )
+
+        total = channels.count()
+        if total == 0:
+            self.stdout.write(self.style.SUCCESS('✅ All leases are fresh — nothing to do'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'\n📡 {mode.title()} {total} channel(s) via {settings.WEBSUB_HUB_URL}\n'))
+
+        session  = requests.Session()
+        accepted = failed = 0
+
+        for channel in channels:
+            # The callback only confirms verifications we asked for
+            channel.expect_websub(mode)
+            try:
+                response = session.post(settings.WEBSUB_HUB_URL, data={
+                    'hub.mode':          mode,
+                    'hub.topic':         channel.get_feed_url(),
+                    'hub.callback':      callback,
+                    'hub.verify':        'async',
+                    'hub.secret':        settings.WEBSUB_SECRET,
+                    'hub.lease_seconds': settings.WEBSUB_LEASE_SECONDS,
+                }, timeout=10)
+            except requests.RequestException as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'   ❌ {channel.name}: {e}'))
+                continue
+
+            # 202 Accepted → hub will verify via GET on our callback
+            if response.status_code in (202, 204):
+                accepted += 1
+                self.stdout.write(f'   ✅ {channel.name}')
+            else:
+                failed += 1
+                self.stdout.write(self.style.ERROR(
+                    f'   ❌ {channel.name}: HTTP {response.status_code} {response.text[:100]}'
+                ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Done!\n'
+            f'   Accepted: {accepted}\n'
+            f'   Failed:   {failed}\n'
+        ))
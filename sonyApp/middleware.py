@@ -0,0 +1,52 @@
+"""
+sonyApp/middleware.py
+
+Session, auth and messages middleware that only run under
+settings.SESSION_PATH_PREFIXES; public requests get AnonymousUser, no session.
+"""
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+
+
+def uses_session(request):
+    return request.path_info.startswith(tuple(settings.SESSION_PATH_PREFIXES))
+
+
+class AdminOnlySessionMiddleware(SessionMiddleware):
+    def process_request(self, request):
+        if uses_session(request):
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        if not hasattr(request, 'session'):
+            return response
+        return super().process_response(request, response)
+
+
+class AdminOnlyAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        if uses_session(request):
+            return super().process_request(request)
+
+        anonymous = AnonymousUser()
+
+        async def auser():
+            return anonymous
+
+        request.user  = anonymous
+        request.auser = auser
+
+
+class AdminOnlyMessageMiddleware(MessageMiddleware):
+    def process_request(self, request):
+        if uses_session(request):
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        if not hasattr(request, '_messages'):
+            return response
+        return super().process_response(request, response)
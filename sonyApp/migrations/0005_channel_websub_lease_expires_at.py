@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0004_remove_video_last_updated_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='websub_lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text="When the hub subscription for this channel's upload feed expires. Set on hub verification.", null=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def mark_existing_checked(apps, schema_editor):
+    # Rows ingested before this migration were checked at ingest time
+    Video = apps.get_model('sonyApp', 'Video')
+    Video.objects.update(embed_checked_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0005_channel_websub_lease_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='embed_checked_at',
+            field=models.DateTimeField(blank=True, help_text='Last noembed.com check. NULL = check deferred (backfill).', null=True),
+        ),
+        migrations.RunPython(mark_existing_checked, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ChannelBackfill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_token', models.CharField(blank=True, max_length=255)),
+                ('pages_done', models.IntegerField(default=0)),
+                ('videos_done', models.IntegerField(default=0)),
+                ('total_estimate', models.IntegerField(default=0, help_text='Channel videoCount reported by YouTube')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('channel', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='backfill', to='sonyApp.channel')),
+            ],
+        ),
+    ]
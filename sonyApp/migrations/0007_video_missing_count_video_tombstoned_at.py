@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0006_channelbackfill_video_embed_checked_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='missing_count',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Consecutive stats runs where YouTube did not return this video.'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='tombstoned_at',
+            field=models.DateTimeField(blank=True, help_text='Set when deactivated for being missing (deleted/private) on YouTube.', null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0007_video_missing_count_video_tombstoned_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('fetch', 'Fetch videos'), ('backfill', 'Channel backfill'), ('embed_check', 'Embeddability check'), ('stats', 'Stats update (6h)'), ('stats_full', 'Stats update (full)'), ('resurrect', 'Tombstone re-check')], max_length=20)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('success', 'Success'), ('failed', 'Failed')], default='running', max_length=10)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('counters', models.JSONField(default=dict, help_text='{"new": 12, "updated": 40, ...}')),
+                ('errors', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('quota_used', models.IntegerField(default=0, help_text='YouTube API units spent by this run')),
+                ('log', models.JSONField(default=list, help_text='Ring buffer of the most recent output lines')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['kind', 'status', '-finished_at'], name='sonyApp_syn_kind_cb40a3_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0008_syncrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_artists', models.IntegerField(default=0)),
+                ('total_videos', models.IntegerField(default=0)),
+                ('monthly_views', models.BigIntegerField(default=0, help_text='Sum of view_count of videos published in the last 30 days')),
+                ('total_subscribers', models.BigIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'site stats',
+            },
+        ),
+    ]
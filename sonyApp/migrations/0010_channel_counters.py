@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:55
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_counters(apps, schema_editor):
+    Channel = apps.get_model('sonyApp', 'Channel')
+    active  = Q(videos__is_active=True)
+    channels = list(Channel.objects.annotate(
+        n_videos=Count('videos', filter=active),
+        n_shorts=Count('videos', filter=active & Q(videos__is_short=True)),
+        n_embeddable=Count('videos', filter=active & Q(videos__is_embeddable=True)),
+    ))
+    for ch in channels:
+        ch.video_count      = ch.n_videos
+        ch.short_count      = ch.n_shorts
+        ch.embeddable_count = ch.n_embeddable
+    Channel.objects.bulk_update(channels, ['video_count', 'short_count', 'embeddable_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0009_sitestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='embeddable_count',
+            field=models.IntegerField(default=0, help_text='Active + embeddable videos'),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='short_count',
+            field=models.IntegerField(default=0, help_text='Active shorts'),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='video_count',
+            field=models.IntegerField(default=0, help_text='Active videos (incl. shorts)'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:58
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+
+def populate_search_text(apps, schema_editor):
+    Channel = apps.get_model('sonyApp', 'Channel')
+    Video   = apps.get_model('sonyApp', 'Video')
+    for channel_pk, name in Channel.objects.values_list('pk', 'name'):
+        Video.objects.filter(channel_id=channel_pk).update(
+            search_text=Concat('title', Value(' ' + name))
+        )
+
+
+def create_search_index(apps, schema_editor):
+    from sonyApp.search import install_index
+    install_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from sonyApp.search import drop_index
+    drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0010_channel_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, help_text='title + channel name; indexed for search (see sonyApp/search.py).'),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
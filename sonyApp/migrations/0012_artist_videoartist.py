@@ -0,0 +1,141 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:01
+
+from collections import deque
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The list artists_page used to scan for on every cache miss
+REAL_ARTISTS = [
+    # Music Directors / Composers
+    'A.R. Rahman', 'Anirudh Ravichander', 'Yuvan Shankar Raja', 'Ilaiyaraaja',
+    'Harris Jayaraj', 'G.V. Prakash', 'D. Imman', 'Santhosh Narayanan',
+    'Sean Roldan', 'Hiphop Tamizha', 'Devi Sri Prasad', 'M.M. Keeravani',
+    'Thaman S', 'Pritam', 'Vishal Dadlani', 'Shekhar Ravjiani',
+    'Sam C.S.', 'Leon James', 'Siddhu Kumar', 'Justin Prabhakaran',
+    'Ron Ethan Yohann', 'Jakes Bejoy', 'Sushin Shyam', 'Dharan Kumar',
+    # Playback Singers - Male
+    'S.P. Balasubrahmanyam', 'K.J. Yesudas', 'Sid Sriram', 'Benny Dayal',
+    'Haricharan', 'Vijay Yesudas', 'Sathyaprakash', 'Pradeep Kumar',
+    'Armaan Malik', 'Arijit Singh', 'Mohit Chauhan', 'Javed Ali',
+    'Sonu Nigam', 'Shankar Mahadevan', 'Udit Narayan', 'Karthik',
+    'Rahul Nambiar', 'Ranjith', 'Vineeth Sreenivasan', 'Anand Aravindakshan',
+    'Shenbagaraj', 'Narayanan',
+    # Playback Singers - Female
+    'Shreya Ghoshal', 'Chinmayi', 'Jonita Gandhi', 'Neha Kakkar',
+    'Sunidhi Chauhan', 'K.S. Chithra', 'Sadhana Sargam', 'Alka Yagnik',
+    'Anuradha Sriram', 'Swetha Mohan', 'Madhushree', 'Bombay Jayashri',
+    'Vaikom Vijayalakshmi', 'Sithara', 'Shweta Mohan',
+    # Independent Artists / Bands
+    'Sivaangi Krishnakumar', 'Dhee', 'OfRo', 'The Indian Choral Ensemble',
+    'Agam', 'Thaikkudam Bridge', 'Avial', 'Masala Coffee',
+]
+
+
+class Matcher:
+    """
+    Frozen copy of sonyApp.artist_tagging.Matcher (Aho-Corasick, case-
+    insensitive substring) — this migration must keep tagging the same way
+    whatever the live module turns into.
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out  = [frozenset()]
+
+        for text, value in patterns:
+            text = (text or '').lower()
+            if not text:
+                continue
+            node = 0
+            for ch in text:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                    self._goto[node][ch] = nxt
+                node = nxt
+            self._out[node] = self._out[node] | {value}
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child]  = self._out[child] | self._out[self._fail[child]]
+
+    def find(self, text):
+        found = set()
+        node  = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for ch in (text or '').lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found |= out[node]
+        return found
+
+
+def seed_and_tag(apps, schema_editor):
+    Artist      = apps.get_model('sonyApp', 'Artist')
+    Video       = apps.get_model('sonyApp', 'Video')
+    VideoArtist = apps.get_model('sonyApp', 'VideoArtist')
+
+    Artist.objects.bulk_create([Artist(name=name) for name in REAL_ARTISTS], ignore_conflicts=True)
+    matcher = Matcher(Artist.objects.values_list('name', 'pk'))
+
+    links = []
+    for video in Video.objects.only('pk', 'title', 'description', 'published_at').iterator(chunk_size=2000):
+        for artist_pk in matcher.find(f"{video.title}\n{video.description}"):
+            links.append(VideoArtist(video_id=video.pk, artist_id=artist_pk, published_at=video.published_at))
+        if len(links) >= 2000:
+            VideoArtist.objects.bulk_create(links)
+            links = []
+    VideoArtist.objects.bulk_create(links)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0011_video_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Artist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('aliases', models.JSONField(blank=True, default=list, help_text='Extra spellings, e.g. ["AR Rahman", "ARR"]')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VideoArtist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published_at', models.DateTimeField()),
+                ('artist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_links', to='sonyApp.artist')),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artist_links', to='sonyApp.video')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['artist', '-published_at'], name='sonyApp_vid_artist__83b891_idx'), models.Index(fields=['published_at'], name='sonyApp_vid_publish_7e963d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('video', 'artist'), name='unique_video_artist')],
+            },
+        ),
+        migrations.RunPython(seed_and_tag, migrations.RunPython.noop),
+    ]
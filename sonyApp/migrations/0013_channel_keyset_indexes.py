@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0012_artist_videoartist'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_embeddable', True)), fields=['channel', '-published_at', '-id'], name='video_channel_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_embeddable', True)), fields=['channel', 'is_short', '-published_at', '-id'], name='video_channel_kind_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_embeddable', True)), fields=['channel', '-view_count', '-published_at', '-id'], name='video_channel_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_embeddable', True)), fields=['channel', 'is_short', '-view_count', '-published_at', '-id'], name='video_channel_kind_popular_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0013_channel_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpNextQueue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_short', models.BooleanField()),
+                ('video_ids', models.JSONField(default=list, help_text='youtube_video_id, newest first')),
+                ('items', models.JSONField(default=list, help_text='Card dicts in video_ids order, each with a pre-serialized "json" fragment')),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('channel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='up_next_queues', to='sonyApp.channel')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('channel', 'is_short'), name='unique_up_next_queue')],
+            },
+        ),
+    ]
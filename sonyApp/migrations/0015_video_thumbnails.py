@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0014_upnextqueue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='lqip',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Tiny blurred WebP data: URI shown until the thumbnail loads.'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, help_text='Every YouTube size: {"medium": {"url", "width", "height"}, ...} (see sonyApp/thumbs.py).'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def create_row(apps, schema_editor):
+    """SiteStats.apply_delta() only updates an existing row — create it once here."""
+    SiteStats = apps.get_model('sonyApp', 'SiteStats')
+    Channel   = apps.get_model('sonyApp', 'Channel')
+    Video     = apps.get_model('sonyApp', 'Video')
+
+    active_channels = Channel.objects.filter(is_active=True)
+    active_videos   = Video.objects.filter(channel__is_active=True, is_active=True)
+    SiteStats.objects.get_or_create(pk=1, defaults={
+        'total_artists':     active_channels.count(),
+        'total_videos':      active_videos.count(),
+        'monthly_views':     active_videos.filter(
+            published_at__gte=timezone.now() - timedelta(days=30),
+        ).aggregate(total=Coalesce(Sum('view_count'), 0))['total'],
+        'total_subscribers': active_channels.aggregate(total=Coalesce(Sum('subscriber_count'), 0))['total'],
+        'refreshed_at':      timezone.now(),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sonyApp', '0015_video_thumbnails'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_row, migrations.RunPython.noop),
+    ]
@@ -17,18 +17,158 @@ class Channel(models.Model):
     created_at         = models.DateTimeField(auto_now_add=True)
     updated_at         = models.DateTimeField(auto_now=True)
 
+    # ─── WEBSUB PUSH SUBSCRIPTION ──────────────────────────────────────────────
+    websub_lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='When the hub subscription for this channel\'s upload feed expires. Set on hub verification.'
+    )
+
+    # ─── DENORMALIZED COUNTERS (active videos only) ────────────────────────────
+    # Maintained by ingestion / tombstoning / embeddability paths via
+    # apply_video_change() and shift_counters(); `reconcile_channel_counters`
+    # repairs any drift.
+    video_count      = models.IntegerField(default=0, help_text='Active videos (incl. shorts)')
+    short_count      = models.IntegerField(default=0, help_text='Active shorts')
+    embeddable_count = models.IntegerField(default=0, help_text='Active + embeddable videos')
+
     class Meta:
         ordering = ['-created_at']
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        A rename re-stamps Video.search_text for the whole channel (one UPDATE).
+        Bumps 'channels' (lists of channels) and channel:<pk> (its own pages)
+        only when a saved field actually changed.
+        """
+        from . import caching
+
+        fields = kwargs.get('update_fields') or [
+            f.attname for f in self._meta.concrete_fields
+            if not f.primary_key and f.name not in ('created_at', 'updated_at')
+        ]
+        old = Channel.objects.filter(pk=self.pk).values(*fields).first() if self.pk else None
+        super().save(*args, **kwargs)
+        if old is None or any(old[f] != getattr(self, f) for f in fields):
+            caching.bump('channels', f'channel:{self.pk}')
+        if old is not None and 'name' in old and old['name'] != self.name:
+            from django.db.models import Value
+            from django.db.models.functions import Concat
+            self.videos.update(search_text=Concat('title', Value(' ' + self.name)))
+
     def get_subscribe_url(self):
         return f"https://www.youtube.com/channel/{self.youtube_channel_id}?sub_confirmation=1"
 
     def get_channel_url(self):
         return f"https://www.youtube.com/channel/{self.youtube_channel_id}"
 
+    def get_feed_url(self):
+        """Atom upload feed — the WebSub topic for this channel."""
+        return f"https://www.youtube.com/xml/feeds/videos.xml?channel_id={self.youtube_channel_id}"
+
+    def expect_websub(self, mode):
+        """Remember the (un)subscribe we're sending, so the hub's verification can be matched."""
+        from django.conf import settings
+        from django.core.cache import cache
+        cache.set(f'websub_intent_{self.youtube_channel_id}', mode, settings.WEBSUB_VERIFY_SECONDS)
+
+    @staticmethod
+    def websub_intent(youtube_channel_id):
+        """The mode of our last (un)subscribe request for this channel, or None."""
+        from django.core.cache import cache
+        return cache.get(f'websub_intent_{youtube_channel_id}')
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # COUNTER MAINTENANCE
+    # ───────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _counter_flags(state):
+        """(is_active, is_short, is_embeddable) → contribution to the 3 counters."""
+        if not state or not state[0]:
+            return 0, 0, 0
+        _, is_short, is_embeddable = state
+        return 1, int(bool(is_short)), int(bool(is_embeddable))
+
+    @classmethod
+    def apply_video_change(cls, channel_pk, before=None, after=None):
+        """
+        Single-row path. before/after are (is_active, is_short, is_embeddable)
+        tuples, or None when the row didn't / doesn't exist.
+        """
+        old = cls._counter_flags(before)
+        new = cls._counter_flags(after)
+        delta = [n - o for n, o in zip(new, old)]
+        if any(delta):
+            cls.objects.filter(pk=channel_pk).update(
+                video_count=models.F('video_count') + delta[0],
+                short_count=models.F('short_count') + delta[1],
+                embeddable_count=models.F('embeddable_count') + delta[2],
+            )
+
+    @classmethod
+    def apply_video_save(cls, before_row, video):
+        """
+        After update_or_create(): before_row is the Video.counter_row() read
+        just before the save (None for a new video), `video` the saved instance.
+        """
+        after = (video.is_active, video.is_short, video.is_embeddable)
+        if before_row and before_row[0] != video.channel_id:
+            cls.apply_video_change(before_row[0], before=before_row[1:4])
+            before_row = None
+        cls.apply_video_change(video.channel_id, before=before_row and before_row[1:4], after=after)
+
+    @classmethod
+    def shift_counters(cls, videos, sign=1, only=None):
+        """
+        Bulk path. Add (sign=1) or remove (sign=-1) the contribution of the
+        ACTIVE rows in `videos` (a Video queryset): one GROUP BY, then one
+        UPDATE per affected channel. `only` limits which counters move.
+        """
+        from django.db.models import Count, Q
+
+        rows = (
+            videos.filter(is_active=True)
+            .order_by()
+            .values('channel_id')
+            .annotate(
+                video_count=Count('id'),
+                short_count=Count('id', filter=Q(is_short=True)),
+                embeddable_count=Count('id', filter=Q(is_embeddable=True)),
+            )
+        )
+        fields = only or ('video_count', 'short_count', 'embeddable_count')
+        for row in rows:
+            updates = {f: models.F(f) + sign * row[f] for f in fields if row[f]}
+            if updates:
+                cls.objects.filter(pk=row['channel_id']).update(**updates)
+
+    @classmethod
+    def reconcile_counters(cls):
+        """Recount from scratch (one GROUP BY); returns the channels that had drifted."""
+        from django.db.models import Count, Q
+
+        active   = Q(videos__is_active=True)
+        channels = cls.objects.annotate(
+            n_videos=Count('videos', filter=active),
+            n_shorts=Count('videos', filter=active & Q(videos__is_short=True)),
+            n_embeddable=Count('videos', filter=active & Q(videos__is_embeddable=True)),
+        )
+        drifted = []
+        for ch in channels:
+            actual = (ch.n_videos, ch.n_shorts, ch.n_embeddable)
+            if (ch.video_count, ch.short_count, ch.embeddable_count) != actual:
+                ch.video_count, ch.short_count, ch.embeddable_count = actual
+                drifted.append(ch)
+        cls.objects.bulk_update(drifted, ['video_count', 'short_count', 'embeddable_count'])
+        return drifted
+
+
+SHORT_MAX_SECONDS = 70   # Shorts run up to 60s; YouTube's rounding leaves a margin
+
 
 class Video(models.Model):
     """
@@ -39,6 +179,8 @@ class Video(models.Model):
     title            = models.CharField(max_length=255)
     description      = models.TextField(blank=True)
     thumbnail_url    = models.URLField(blank=True)
+    thumbnails       = models.JSONField(default=dict, blank=True, help_text='Every YouTube size: {"medium": {"url", "width", "height"}, ...} (see sonyApp/thumbs.py).')
+    lqip             = models.TextField(blank=True, default='', editable=False, help_text='Tiny blurred WebP data: URI shown until the thumbnail loads.')
     duration         = models.CharField(max_length=20, blank=True)
     view_count       = models.IntegerField(default=0)
     like_count       = models.IntegerField(default=0)
@@ -46,6 +188,10 @@ class Video(models.Model):
     is_active        = models.BooleanField(default=True)
     is_short         = models.BooleanField(default=False, help_text="Is this a YouTube Short?")
     is_embeddable    = models.BooleanField(default=True, help_text="False = YouTube blocked embedding. Hidden from all listings.")
+    embed_checked_at = models.DateTimeField(null=True, blank=True, help_text="Last noembed.com check. NULL = check deferred (backfill).")
+    missing_count    = models.PositiveSmallIntegerField(default=0, help_text="Consecutive stats runs where YouTube did not return this video.")
+    tombstoned_at    = models.DateTimeField(null=True, blank=True, help_text="Set when deactivated for being missing (deleted/private) on YouTube.")
+    search_text      = models.TextField(blank=True, default='', editable=False, help_text="title + channel name; indexed for search (see sonyApp/search.py).")
     created_at       = models.DateTimeField(auto_now_add=True)
     updated_at       = models.DateTimeField(auto_now=True)
 
@@ -73,27 +219,43 @@ class Video(models.Model):
             models.Index(fields=['is_short']),
             models.Index(fields=['is_embeddable']),
             models.Index(fields=['base_snapshot_timestamp']),
+            # Keyset pagination on channel pages (see views.CHANNEL_ORDERINGS) —
+            # partial: only listable rows, the only ones those pages read
+            models.Index(
+                fields=['channel', '-published_at', '-id'],
+                condition=models.Q(is_active=True, is_embeddable=True),
+                name='video_channel_recent_idx',
+            ),
+            models.Index(
+                fields=['channel', 'is_short', '-published_at', '-id'],
+                condition=models.Q(is_active=True, is_embeddable=True),
+                name='video_channel_kind_recent_idx',
+            ),
+            models.Index(
+                fields=['channel', '-view_count', '-published_at', '-id'],
+                condition=models.Q(is_active=True, is_embeddable=True),
+                name='video_channel_popular_idx',
+            ),
+            models.Index(
+                fields=['channel', 'is_short', '-view_count', '-published_at', '-id'],
+                condition=models.Q(is_active=True, is_embeddable=True),
+                name='video_channel_kind_popular_idx',
+            ),
         ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        """Auto-detect YouTube Shorts by duration (<=60 seconds)."""
+        """Auto-detect YouTube Shorts by duration (see is_short_duration)."""
         if self.duration:
-            try:
-                parts = self.duration.split(':')
-                if len(parts) == 2:
-                    minutes, seconds = map(int, parts)
-                    total_seconds = minutes * 60 + seconds
-                elif len(parts) == 3:
-                    hours, minutes, seconds = map(int, parts)
-                    total_seconds = hours * 3600 + minutes * 60 + seconds
-                else:
-                    total_seconds = 0
-                self.is_short = 0 < total_seconds <= 70
-            except (ValueError, AttributeError):
-                self.is_short = False
+            self.is_short = self.is_short_duration(self.get_duration_seconds())
+
+        from .search import build_search_text
+        self.search_text = build_search_text(self.title, self.channel.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'title', 'channel'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
         super().save(*args, **kwargs)
 
     # ───────────────────────────────────────────────────────────────────────────
@@ -157,7 +319,11 @@ class Video(models.Model):
                 if old_keys:
                     logger.info(f"[{self.youtube_video_id}] Cleaned {len(old_keys)} old snapshots")
 
-            self.save()
+            # Only the stats fields: `self` was loaded at the start of a long
+            # run, and a full save would undo a concurrent flag / tombstone
+            self.save(update_fields=[
+                'view_count', 'view_count_history', 'base_snapshot_timestamp', 'last_snapshot_timestamp',
+            ])
 
         except Exception as e:
             logger.error(f"Error saving 6h snapshot for {self.youtube_video_id}: {e}")
@@ -338,6 +504,19 @@ class Video(models.Model):
     def get_today_growth(self):
         return self.get_daily_growth()
 
+    # ───────────────────────────────────────────────────────────────────────────
+    # CHANNEL COUNTERS
+    # ───────────────────────────────────────────────────────────────────────────
+
+    @classmethod
+    def counter_row(cls, youtube_video_id):
+        """(channel_id, is_active, is_short, is_embeddable, view_count) before a save, or None."""
+        return (
+            cls.objects.filter(youtube_video_id=youtube_video_id)
+            .values_list('channel_id', 'is_active', 'is_short', 'is_embeddable', 'view_count')
+            .first()
+        )
+
     # ───────────────────────────────────────────────────────────────────────────
     # URL HELPERS
     # ───────────────────────────────────────────────────────────────────────────
@@ -350,6 +529,11 @@ class Video(models.Model):
     def get_embed_url(self):
         return f"https://www.youtube.com/embed/{self.youtube_video_id}"
 
+    @staticmethod
+    def is_short_duration(total_seconds):
+        """The one Shorts rule — Video.save(), sync and backfill all use it."""
+        return 0 < total_seconds <= SHORT_MAX_SECONDS
+
     def get_duration_seconds(self):
         if not self.duration:
             return 0
@@ -373,4 +557,402 @@ class Video(models.Model):
             return f"{int(parts[0])}:{int(parts[1]):02d}"
         if len(parts) == 3:
             return f"{int(parts[0])}:{int(parts[1]):02d}:{int(parts[2]):02d}"
-        return self.duration
\ No newline at end of file
+        return self.duration
+
+
+class ChannelBackfill(models.Model):
+    """
+    Resumable checkpoint for `fetch_youtube_videos --backfill`.
+    page_token is the uploads-playlist token of the NEXT page to fetch,
+    written in the same transaction as the rows of the page before it.
+    """
+    channel        = models.OneToOneField(Channel, on_delete=models.CASCADE, related_name='backfill')
+    page_token     = models.CharField(max_length=255, blank=True)
+    pages_done     = models.IntegerField(default=0)
+    videos_done    = models.IntegerField(default=0)
+    total_estimate = models.IntegerField(default=0, help_text='Channel videoCount reported by YouTube')
+    started_at     = models.DateTimeField(auto_now_add=True)
+    updated_at     = models.DateTimeField(auto_now=True)
+    finished_at    = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Backfill {self.channel.name}: {self.videos_done}/{self.total_estimate}"
+
+
+class SyncRun(models.Model):
+    """
+    One ingestion / stats run (management command or cron endpoint).
+    Written incrementally while the run is in progress, so every worker
+    sees the same status. `log` is a bounded ring buffer of the last
+    SYNC_RUN_LOG_LINES output lines — never the full output.
+    """
+    KIND_CHOICES = [
+        ('fetch',       'Fetch videos'),
+        ('backfill',    'Channel backfill'),
+        ('embed_check', 'Embeddability check'),
+        ('stats',       'Stats update (6h)'),
+        ('stats_full',  'Stats update (full)'),
+        ('resurrect',   'Tombstone re-check'),
+    ]
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('failed',  'Failed'),
+    ]
+
+    # Buffered log lines are written at most this often (seconds / lines)
+    FLUSH_SECONDS = 2
+    FLUSH_LINES   = 25
+
+    kind        = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status      = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running')
+    started_at  = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    counters    = models.JSONField(default=dict, help_text='{"new": 12, "updated": 40, ...}')
+    errors      = models.IntegerField(default=0)
+    last_error  = models.TextField(blank=True)
+    quota_used  = models.IntegerField(default=0, help_text='YouTube API units spent by this run')
+    log         = models.JSONField(default=list, help_text='Ring buffer of the most recent output lines')
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['kind', 'status', '-finished_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # INCREMENTAL WRITES
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def begin(self):
+        """
+        Start in-memory bookkeeping (ring buffer, quota meter) for this
+        process. The calling thread owns the run: only it writes to the DB.
+        """
+        import threading
+        from collections import deque
+        from django.conf import settings
+        from .youtube_client import QuotaMeter
+
+        self._ring        = deque(self.log, maxlen=settings.SYNC_RUN_LOG_LINES)
+        self._ring_lock   = threading.Lock()
+        self._owner       = threading.get_ident()
+        self.quota_meter  = QuotaMeter()
+        self._quota_base  = self.quota_used
+        self._pending     = 0
+        self._flushed_at  = timezone.now()
+        return self
+
+    def log_line(self, line):
+        """
+        Buffer a line. Worker threads only buffer — their lines go out with
+        the owner's next flush (log line, bump, error or finish), so a
+        thread pool never opens DB connections of its own.
+        """
+        import threading
+
+        with self._ring_lock:
+            self._ring.append(line[:500])
+            self._pending += 1
+        if threading.get_ident() == self._owner and (
+                self._pending >= self.FLUSH_LINES or
+                (timezone.now() - self._flushed_at).total_seconds() >= self.FLUSH_SECONDS):
+            self.flush()
+
+    def bump(self, **counts):
+        """Add to named counters, e.g. run.bump(new=3, updated=10)."""
+        for name, value in counts.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        self.flush()
+
+    def record_error(self, message):
+        self.errors    += 1
+        self.last_error = str(message)[:2000]
+        self.flush()
+
+    def flush(self):
+        with self._ring_lock:
+            self.log      = list(self._ring)
+            self._pending = 0
+        self.quota_used  = self._quota_base + self.quota_meter.units
+        self._flushed_at = timezone.now()
+        SyncRun.objects.filter(pk=self.pk).update(
+            log=self.log,
+            counters=self.counters,
+            errors=self.errors,
+            last_error=self.last_error,
+            quota_used=self.quota_used,
+        )
+
+    def finish(self, status='success', error=None):
+        if error is not None:
+            self.errors    += 1
+            self.last_error = str(error)[:2000]
+        self.flush()
+        self.status      = status
+        self.finished_at = timezone.now()
+        SyncRun.objects.filter(pk=self.pk).update(status=status, finished_at=self.finished_at)
+
+    def as_dict(self, with_log=False):
+        data = {
+            'id':          self.pk,
+            'kind':        self.kind,
+            'status':      self.status,
+            'started_at':  self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'counters':    self.counters,
+            'errors':      self.errors,
+            'last_error':  self.last_error,
+            'quota_used':  self.quota_used,
+        }
+        if with_log:
+            data['log'] = self.log
+        return data
+
+
+class SiteStats(models.Model):
+    """
+    Single row (pk=1) of site-wide counters shown on the home page, so
+    home() never runs aggregate queries itself.
+      - Ingestion (the 10-minute fetch, backfills, WebSub pushes) applies
+        what it changed with apply_delta(): new videos, their views,
+        subscriber changes.
+      - Stats runs recompute everything with refresh() — they touch most
+        rows anyway, and the 30-day window of monthly_views slides, which
+        no per-row delta can follow.
+    """
+    CACHE_KEY = 'site_stats'
+
+    total_artists     = models.IntegerField(default=0)
+    total_videos      = models.IntegerField(default=0)
+    monthly_views     = models.BigIntegerField(default=0, help_text='Sum of view_count of videos published in the last 30 days')
+    total_subscribers = models.BigIntegerField(default=0)
+    refreshed_at      = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'site stats'
+
+    def __str__(self):
+        return f"Site stats @ {self.refreshed_at}"
+
+    @classmethod
+    def current(cls):
+        """
+        Cached read path (stale-while-revalidate): a cache hit, even right
+        after a refresh — the one PK lookup is redone in the background.
+        Never writes: until the row exists (migration 0016 / a stats run)
+        the page shows zeros.
+        """
+        from . import caching
+
+        return caching.swr_get(
+            cls.CACHE_KEY,
+            lambda: cls.objects.filter(pk=1).first() or cls(pk=1),
+            tags=['stats'], soft_ttl=300, hard_ttl=6 * 3600,
+        )
+
+    @classmethod
+    def refresh(cls):
+        """Recompute every counter (4 aggregates) — stats runs and reconcile only."""
+        from django.db.models import Sum
+
+        from . import caching
+        from django.db.models.functions import Coalesce
+
+        active_channels = Channel.objects.filter(is_active=True)
+        active_videos   = Video.objects.filter(channel__is_active=True, is_active=True)
+
+        stats, _ = cls.objects.update_or_create(pk=1, defaults={
+            'total_artists':     active_channels.count(),
+            'total_videos':      active_videos.count(),
+            'monthly_views':     active_videos.filter(
+                published_at__gte=timezone.now() - timedelta(days=30),
+            ).aggregate(total=Coalesce(Sum('view_count'), 0))['total'],
+            'total_subscribers': active_channels.aggregate(
+                total=Coalesce(Sum('subscriber_count'), 0),
+            )['total'],
+            'refreshed_at':      timezone.now(),
+        })
+        caching.bump('stats')
+        return stats
+
+    @staticmethod
+    def add_video_save(delta, before_row, video):
+        """Add one update_or_create() to an apply_delta() kwargs dict (before_row: Video.counter_row())."""
+        was_active = bool(before_row and before_row[1])
+        delta['videos'] += int(video.is_active) - int(was_active)
+        if video.published_at >= timezone.now() - timedelta(days=30):
+            delta['monthly_views'] += (video.view_count if video.is_active else 0) - (before_row[4] if was_active else 0)
+
+    @classmethod
+    def apply_delta(cls, videos=0, monthly_views=0, subscribers=0):
+        """Incremental update between full refreshes (one UPDATE)."""
+        from . import caching
+
+        if not (videos or monthly_views or subscribers):
+            return
+        if cls.objects.filter(pk=1).update(
+            total_videos=models.F('total_videos') + videos,
+            monthly_views=models.F('monthly_views') + monthly_views,
+            total_subscribers=models.F('total_subscribers') + subscribers,
+        ):
+            caching.bump('stats')
+
+
+class Artist(models.Model):
+    """
+    An artist tagged on videos at ingest time (see sonyApp/artist_tagging.py).
+    A video is linked when the name — or any alias — appears in its title or
+    description (case-insensitive substring, the same rule the old
+    icontains scan used).
+    """
+    name       = models.CharField(max_length=255, unique=True)
+    aliases    = models.JSONField(default=list, blank=True, help_text='Extra spellings, e.g. ["AR Rahman", "ARR"]')
+    is_active  = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def patterns(self):
+        """Every spelling that tags a video with this artist."""
+        return [self.name, *(a for a in self.aliases if a)]
+
+
+class VideoArtist(models.Model):
+    """
+    Video ↔ Artist link written by the matcher. published_at is copied from
+    the video so "this artist's videos in the last N days" is one range scan
+    on (artist, published_at).
+    """
+    video        = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='artist_links')
+    artist       = models.ForeignKey(Artist, on_delete=models.CASCADE, related_name='video_links')
+    published_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'artist'], name='unique_video_artist'),
+        ]
+        indexes = [
+            models.Index(fields=['artist', '-published_at']),
+            models.Index(fields=['published_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.artist} · {self.video_id}"
+
+
+class UpNextQueue(models.Model):
+    """
+    Precomputed "More from this channel" list for video_player, one row per
+    (channel, is_short). Holds the newest UP_NEXT_SIZE + 1 listable videos
+    (one spare so the list is still full after removing the video being
+    watched) as ready-to-render card dicts, each with its end-screen JSON
+    pre-serialized. Rebuilt when ingestion touches the channel; the player
+    only reads it (cache first) and slices out the current video.
+    """
+    UP_NEXT_SIZE = 20
+    CACHE_KEY    = 'upnext_{channel_pk}_{is_short:d}'
+
+    channel      = models.ForeignKey(Channel, on_delete=models.CASCADE, related_name='up_next_queues')
+    is_short     = models.BooleanField()
+    video_ids    = models.JSONField(default=list, help_text='youtube_video_id, newest first')
+    items        = models.JSONField(default=list, help_text='Card dicts in video_ids order, each with a pre-serialized "json" fragment')
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['channel', 'is_short'], name='unique_up_next_queue'),
+        ]
+
+    def __str__(self):
+        return f"Up next · {self.channel_id} · {'shorts' if self.is_short else 'videos'}"
+
+    @classmethod
+    def _cache_key(cls, channel_pk, is_short):
+        return cls.CACHE_KEY.format(channel_pk=channel_pk, is_short=bool(is_short))
+
+    @classmethod
+    def rebuild(cls, channel_pk, is_short=None):
+        """
+        Recompute (both kinds by default) — called by ingestion, not per
+        request. Also bumps the channel:<pk> cache tag, since whatever
+        touched the queue touched the channel's listing.
+        """
+        import json
+        from django.core.cache import cache
+        from . import caching
+
+        caching.bump(f'channel:{channel_pk}')
+
+        kinds = (False, True) if is_short is None else (is_short,)
+        for kind in kinds:
+            videos = (
+                Video.objects
+                .filter(channel_id=channel_pk, is_active=True, is_embeddable=True, is_short=kind)
+                .order_by('-published_at')
+                .only('youtube_video_id', 'title', 'thumbnail_url', 'lqip', 'duration', 'is_short', 'published_at')
+                [:cls.UP_NEXT_SIZE + 1]
+            )
+            items = [
+                {
+                    'youtube_video_id': v.youtube_video_id,
+                    'title':            v.title,
+                    'thumbnail_url':    v.thumbnail_url,
+                    'lqip':             v.lqip,
+                    'duration':         v.duration,
+                    'is_short':         v.is_short,
+                    'published':        v.published_at.strftime('%b %d, %Y') if v.published_at else '',
+                    # End-screen entry, serialized once here instead of per view
+                    'json':             json.dumps({
+                        'youtube_video_id': v.youtube_video_id,
+                        'title':            v.title,
+                        'thumbnail_url':    v.thumbnail_url,
+                        'is_short':         v.is_short,
+                    }),
+                }
+                for v in videos
+            ]
+            queue, _ = cls.objects.update_or_create(
+                channel_id=channel_pk, is_short=kind,
+                defaults={'video_ids': [i['youtube_video_id'] for i in items], 'items': items},
+            )
+            cache.set(cls._cache_key(channel_pk, kind), queue.items, None)
+
+    @classmethod
+    def rebuild_for_videos(cls, video_pks):
+        """Rebuild the queues of every channel owning one of `video_pks`."""
+        channel_pks = set(
+            Video.objects.filter(pk__in=video_pks).values_list('channel_id', flat=True).distinct()
+        )
+        for channel_pk in channel_pks:
+            cls.rebuild(channel_pk)
+
+    @classmethod
+    def up_next(cls, channel_pk, is_short, exclude_video_id):
+        """
+        (cards, end-screen JSON string) for the player: one cache read,
+        falling back to the stored row, then to a rebuild.
+        """
+        from django.core.cache import cache
+
+        key   = cls._cache_key(channel_pk, is_short)
+        items = cache.get(key)
+        if items is None:
+            queue = cls.objects.filter(channel_id=channel_pk, is_short=is_short).first()
+            if queue is None:
+                cls.rebuild(channel_pk, is_short)
+                items = cache.get(key) or []
+            else:
+                items = queue.items
+                cache.set(key, items, None)
+
+        cards = [i for i in items if i['youtube_video_id'] != exclude_video_id][:cls.UP_NEXT_SIZE]
+        return cards, '[' + ','.join(i['json'] for i in cards) + ']'
@@ -0,0 +1,69 @@
+"""
+sonyApp/page_cache.py
+
+Full-page cache for anonymous HTML pages, keyed on the path, the listed
+query params and the versions of the page's cache tags.
+"""
+
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from . import caching
+
+DEFAULT_TIMEOUT = 3600
+
+
+def _cache_key(request, tags, params):
+    query  = '&'.join(f'{p}={request.GET.get(p, "")}' for p in params)
+    digest = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return caching.make_key(f'page:{digest}', tags)
+
+
+def _cacheable(request, response, csrf_before):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not response.has_header('Cache-Control')
+        # The template (or view) asked for a CSRF token → per-visitor body
+        and not (request.META.get('CSRF_COOKIE_NEEDS_UPDATE') and not csrf_before)
+    )
+
+
+def cached_page(tags, params=(), timeout=DEFAULT_TIMEOUT, csrf_cookie=False):
+    """
+    Cache a GET view's HTML for anonymous visitors. `tags`: list of cache
+    tags, or callable(request, *args, **kwargs) -> list. `params`: the
+    query parameters the page depends on (everything else is ignored).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or settings.SESSION_COOKIE_NAME in request.COOKIES:
+                return view(request, *args, **kwargs)
+
+            names = tags(request, *args, **kwargs) if callable(tags) else tags
+            key   = _cache_key(request, names, params)
+            entry = cache.get(key)
+
+            if entry is not None:
+                content, content_type = entry
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                csrf_before = bool(request.META.get('CSRF_COOKIE_NEEDS_UPDATE'))
+                response    = view(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response = response.render()
+                if _cacheable(request, response, csrf_before):
+                    cache.set(key, (response.content, response['Content-Type']), timeout)
+
+            if csrf_cookie:
+                get_token(request)
+            return response
+        return wrapped
+    return decorator
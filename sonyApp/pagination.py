@@ -0,0 +1,82 @@
+"""
+sonyApp/pagination.py
+
+Keyset (seek) pagination with opaque cursors — orderings must end in the
+primary key.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _json_default(value):
+    # Full precision: DjangoJSONEncoder truncates datetimes to milliseconds,
+    # which would break the "= last key" half of the seek condition.
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not cursor-serializable')
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    """Cursor → list of sort-key values (None for the first page)."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor('cursor does not match ordering')
+    return values
+
+
+def _after(ordering, values):
+    """
+    Rows strictly after `values` in `ordering`:
+      (a > x) OR (a = x AND b > y) OR ...   (< for descending fields)
+    """
+    condition = Q()
+    equal     = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        op   = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{name}__{op}': value})
+        equal[name] = value
+    return condition
+
+
+def keyset_page(queryset, ordering, cursor=None, limit=24):
+    """
+    One page of `queryset` in `ordering` (unique; fields — annotations
+    included — must be attributes of the rows). Returns (rows, next_cursor);
+    next_cursor is None on the last page. Raises InvalidCursor.
+    """
+    values = decode_cursor(cursor, ordering)
+    qs     = queryset.order_by(*ordering)
+    if values is not None:
+        try:
+            qs = qs.filter(_after(ordering, values))
+        except (ValueError, TypeError, ValidationError) as e:
+            raise InvalidCursor(str(e))
+
+    rows     = list(qs[:limit + 1])
+    has_more = len(rows) > limit
+    rows     = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor([getattr(rows[-1], f.lstrip('-')) for f in ordering])
+    return rows, next_cursor
@@ -0,0 +1,542 @@
+"""
+sonyApp/read_model.py
+
+Read-only SQLite snapshot of the public catalogue, read by web workers from
+local disk; the views fall back to the ORM when it isn't available.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cards import GROWTH_TOP_K, ChannelRef, VideoCard
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+MMAP_BYTES     = 256 * 1024 * 1024
+BATCH_SIZE     = 2000
+HIDDEN_SECONDS = 7 * 24 * 3600   # hide() marks outlive any realistic gap between builds
+
+GROWTH_SECTIONS = ('hot_and_new', 'daily_growth', 'weekly_growth')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_local = threading.local()
+
+_SCHEMA = [
+    'CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID',
+    'CREATE TABLE channels ('
+    ' id INTEGER PRIMARY KEY, channel_id TEXT UNIQUE, name TEXT, description TEXT,'
+    ' thumbnail_url TEXT, subscriber_count INTEGER, is_active INTEGER, created_us INTEGER)',
+    'CREATE TABLE videos ('
+    ' id INTEGER PRIMARY KEY, youtube_video_id TEXT UNIQUE, channel INTEGER,'
+    ' title TEXT, thumbnail_url TEXT, lqip TEXT, duration TEXT,'
+    ' view_count INTEGER, like_count INTEGER, published_us INTEGER,'
+    ' is_short INTEGER, channel_active INTEGER, search_text TEXT)',
+    'CREATE TABLE growth ('
+    ' section TEXT, rank INTEGER, video INTEGER, growth_value INTEGER, growth_label TEXT,'
+    ' PRIMARY KEY (section, rank)) WITHOUT ROWID',
+    'CREATE TABLE artists (rank INTEGER PRIMARY KEY, name TEXT, count INTEGER, bar_pct INTEGER)',
+    'CREATE TABLE channel_digests (channel INTEGER PRIMARY KEY, digest BLOB)',
+]
+
+# Created after the bulk insert — cheaper than maintaining them row by row
+_INDEXES = [
+    'CREATE INDEX videos_recent  ON videos (channel, is_short, published_us DESC, id DESC)',
+    'CREATE INDEX videos_popular ON videos (channel, is_short, view_count DESC, published_us DESC, id DESC)',
+    'CREATE INDEX videos_global  ON videos (is_short, published_us DESC, id DESC)',
+    'CREATE INDEX channels_subs  ON channels (is_active, subscriber_count DESC)',
+]
+
+_FTS = [
+    "CREATE VIRTUAL TABLE videos_fts USING fts5("
+    "search_text, content='videos', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO videos_fts(videos_fts) VALUES ('rebuild')",
+]
+
+
+def _to_us(dt):
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_us(us):
+    return _EPOCH + timedelta(microseconds=us)
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# BUILD  (management command build_read_model)
+# ───────────────────────────────────────────────────────────────────────────
+
+def _digest(digests, channel_pk, row):
+    h = digests.get(channel_pk)
+    if h is None:
+        h = digests[channel_pk] = hashlib.blake2b(digest_size=16)
+    h.update(repr(row).encode())
+
+
+def _insert_channels(db, digests):
+    from .models import Channel
+
+    rows = Channel.objects.values_list(
+        'pk', 'channel_id', 'name', 'description', 'thumbnail_url',
+        'subscriber_count', 'is_active', 'created_at',
+    )
+    active = {}
+    for pk, channel_id, name, description, thumb, subs, is_active, created_at in rows:
+        row = (pk, channel_id, name, description, thumb, subs or 0, int(is_active), _to_us(created_at))
+        db.execute('INSERT INTO channels VALUES (?, ?, ?, ?, ?, ?, ?, ?)', row)
+        _digest(digests, pk, row)
+        active[pk] = is_active
+    return active
+
+
+def _insert_videos(db, channel_active, digests):
+    from .models import Video
+
+    rows = (
+        Video.objects
+        .filter(is_active=True, is_embeddable=True)
+        .values_list(
+            'pk', 'youtube_video_id', 'channel_id', 'title', 'thumbnail_url', 'lqip',
+            'duration', 'view_count', 'like_count', 'published_at', 'is_short', 'search_text',
+        )
+        .order_by('pk')   # stable per-channel digest order
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    count = 0
+    batch = []
+    for pk, vid, channel, title, thumb, lqip, duration, views, likes, published, short, text in rows:
+        row = (
+            pk, vid, channel, title, thumb, lqip, duration, views or 0, likes or 0,
+            _to_us(published), int(short), int(channel_active.get(channel, False)), text,
+        )
+        batch.append(row)
+        _digest(digests, channel, row)
+        if len(batch) >= BATCH_SIZE:
+            db.executemany('INSERT INTO videos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', batch)
+            count += len(batch)
+            batch = []
+    db.executemany('INSERT INTO videos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', batch)
+    return count + len(batch)
+
+
+def _insert_growth(db):
+    from .catalogue import get_growth_sections
+
+    sections = get_growth_sections.uncached()   # stats just ran — compute fresh
+    for section in GROWTH_SECTIONS:
+        db.executemany('INSERT INTO growth VALUES (?, ?, ?, ?, ?)', [
+            (section, rank, v.pk, v.growth_value, v.growth_label)
+            for rank, v in enumerate(sections[section][:GROWTH_TOP_K])
+        ])
+
+
+def _insert_artists(db):
+    from .catalogue import artists_page_data
+
+    rows = [(rank, a['name'], a['count'], a['bar_pct']) for rank, a in enumerate(artists_page_data.uncached())]
+    db.executemany('INSERT INTO artists VALUES (?, ?, ?, ?)', rows)
+    return rows
+
+
+def _copy_aggregates(db, previous):
+    """Growth and artists rows from the previous snapshot, unchanged."""
+    db.executemany('INSERT INTO growth VALUES (?, ?, ?, ?, ?)', previous.growth)
+    db.executemany('INSERT INTO artists VALUES (?, ?, ?, ?)', previous.artists)
+    return previous.artists
+
+
+def _previous(path):
+    """Digests, meta and aggregate rows of the snapshot at `path`, or None if unreadable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            meta = dict(conn.execute('SELECT key, value FROM meta'))
+            if meta.get('schema') != str(SCHEMA_VERSION):
+                return None
+            return SimpleNamespace(
+                digests=dict(conn.execute('SELECT channel, digest FROM channel_digests')),
+                meta=meta,
+                growth=conn.execute('SELECT * FROM growth ORDER BY section, rank').fetchall(),
+                artists=conn.execute('SELECT * FROM artists ORDER BY rank').fetchall(),
+            )
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+def build(path=None, aggregates=False):
+    """
+    Write a fresh snapshot and swap it into place. Returns {table: rows}.
+
+    The growth sections and artist counts are recomputed only with
+    aggregates=True (stats runs, build_read_model); ingest builds copy them
+    from the previous snapshot, so they change with the 6-hourly stats run.
+    """
+    path = str(path or settings.READ_MODEL_PATH)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    started_at = time.time()   # hide() marks after this may not be in the rows read below
+    previous   = _previous(path)
+
+    db = sqlite3.connect(tmp)
+    try:
+        db.execute('PRAGMA journal_mode = OFF')
+        db.execute('PRAGMA synchronous = OFF')
+        for sql in _SCHEMA:
+            db.execute(sql)
+
+        digests        = {}
+        channel_active = _insert_channels(db, digests)
+        counts = {'channels': len(channel_active), 'videos': _insert_videos(db, channel_active, digests)}
+        digests = {pk: h.digest() for pk, h in digests.items()}
+        db.executemany('INSERT INTO channel_digests VALUES (?, ?)', digests.items())
+        if aggregates or previous is None:
+            _insert_growth(db)   # 'growth' is bumped by update_video_stats, after this build
+            artists = _insert_artists(db)
+        else:
+            artists = _copy_aggregates(db, previous)
+        listings = {'artists': hashlib.blake2b(repr([tuple(r) for r in artists]).encode(), digest_size=16).hexdigest()}
+
+        for sql in _INDEXES:
+            db.execute(sql)
+        try:
+            for sql in _FTS:
+                db.execute(sql)
+            fts = True
+        except sqlite3.OperationalError:   # SQLite built without FTS5 — search scans
+            fts = False
+
+        db.executemany('INSERT INTO meta VALUES (?, ?)', [
+            ('schema', str(SCHEMA_VERSION)),
+            ('started_at', str(started_at)),
+            ('built_at', str(time.time())),
+            ('fts', str(int(fts))),
+            *((f'digest:{tag}', digest) for tag, digest in listings.items()),
+        ])
+        db.commit()
+        db.execute('ANALYZE')
+        db.execute('VACUUM')
+    except BaseException:
+        db.close()
+        os.remove(tmp)
+        raise
+    db.close()
+
+    previous_digests = previous.digests if previous else None
+    previous_meta    = previous.meta if previous else {}
+    os.replace(tmp, path)   # atomic — readers reopen on the next call
+
+    # Bump only what differs from the previous snapshot. First build / old
+    # schema → everything, since those pages may have come from the ORM.
+    changed = [
+        pk for pk in digests.keys() | (previous_digests or {}).keys()
+        if previous_digests is None or previous_digests.get(pk) != digests.get(pk)
+    ]
+    tags = [f'channel:{pk}' for pk in changed]
+    if changed:
+        tags += ['search', 'channels']
+    tags += [tag for tag, digest in listings.items() if previous_meta.get(f'digest:{tag}') != digest]
+    if tags:
+        from . import caching
+        caching.bump(*tags)
+    counts['changed_channels'] = len(changed)
+    counts['bumped_tags']      = len(tags)
+    return counts
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# READ
+# ───────────────────────────────────────────────────────────────────────────
+
+def _connect():
+    """This thread's connection to the current file, or None."""
+    path = str(settings.READ_MODEL_PATH)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    ident = (st.st_ino, st.st_mtime_ns)
+
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.ident == ident:
+        return conn
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=ro&immutable=1', uri=True, check_same_thread=False)
+        conn.execute(f'PRAGMA mmap_size = {MMAP_BYTES}')
+        meta = dict(conn.execute('SELECT key, value FROM meta'))
+    except sqlite3.Error as e:
+        logger.warning(f"Read model unreadable at {path}: {e}")
+        return None
+    if meta.get('schema') != str(SCHEMA_VERSION):
+        conn.close()
+        return None
+
+    conn.row_factory = sqlite3.Row
+    _local.conn, _local.ident, _local.fts = conn, ident, meta.get('fts') == '1'
+    _local.started_at = float(meta['started_at'])
+    return conn
+
+
+def available():
+    return _connect() is not None
+
+
+def built_at():
+    conn = _connect()
+    if conn is None:
+        return None
+    row = conn.execute("SELECT value FROM meta WHERE key = 'built_at'").fetchone()
+    return datetime.fromtimestamp(float(row[0]), tz=dt_timezone.utc)
+
+
+def _hidden_key(video_pk):
+    return f'read_model:hidden:{video_pk}'
+
+
+def hide(*video_pks):
+    """Stop serving these videos from the snapshot now (flag / tombstone paths)."""
+    if video_pks:
+        now = time.time()
+        cache.set_many({_hidden_key(pk): now for pk in video_pks}, HIDDEN_SECONDS)
+
+
+def _visible(cards):
+    """Drop cards hidden since this thread's snapshot was built."""
+    if not cards:
+        return cards
+    marks = cache.get_many([_hidden_key(card.pk) for card in cards])
+    if not marks:
+        return cards
+    since = _local.started_at
+    return [card for card in cards if marks.get(_hidden_key(card.pk), 0) <= since]
+
+
+def _channel(row):
+    return SimpleNamespace(
+        pk=row['id'], id=row['id'], channel_id=row['channel_id'], name=row['name'],
+        description=row['description'], thumbnail_url=row['thumbnail_url'],
+        subscriber_count=row['subscriber_count'], is_active=bool(row['is_active']),
+    )
+
+
+def _cards(conn, rows, extra=()):
+    """Video rows → cards.VideoCard (each ChannelRef read once per call)."""
+    refs   = {}
+    result = []
+    for row in rows:
+        pk = row['channel']
+        if pk not in refs:
+            ch = conn.execute('SELECT channel_id, name FROM channels WHERE id = ?', (pk,)).fetchone()
+            refs[pk] = ChannelRef(pk, ch['channel_id'], ch['name'])
+        card = VideoCard(
+            row['id'], row['youtube_video_id'], refs[pk], row['title'], row['thumbnail_url'],
+            row['lqip'], row['duration'], row['view_count'], row['like_count'],
+            _from_us(row['published_us']), bool(row['is_short']),
+        )
+        for name in extra:
+            setattr(card, name, row[name])
+        result.append(card)
+    return result
+
+
+def _videos(conn, sql, params=(), extra=()):
+    return _cards(conn, conn.execute(sql, params).fetchall(), extra)
+
+
+def channels(active_only=True):
+    conn = _connect()
+    sql  = 'SELECT * FROM channels'
+    if active_only:
+        sql += ' WHERE is_active = 1'
+    return [_channel(r) for r in conn.execute(sql + ' ORDER BY created_us DESC')]
+
+
+def channel(channel_id):
+    row = _connect().execute('SELECT * FROM channels WHERE channel_id = ?', (channel_id,)).fetchone()
+    return _channel(row) if row else None
+
+
+def recent_videos(days=30, limit=10):
+    """Home carousel: newest videos of active channels."""
+    since = _to_us(datetime.now(dt_timezone.utc) - timedelta(days=days))
+    return _visible(_videos(
+        _connect(),
+        'SELECT * FROM videos WHERE channel_active = 1 AND published_us >= ? '
+        'ORDER BY published_us DESC, id DESC LIMIT ?',
+        (since, limit),
+    ))
+
+
+def video(channel_id, youtube_video_id):
+    """The player's video (with .channel), or None — also if hidden since the build."""
+    rows = _visible(_videos(
+        _connect(),
+        'SELECT v.* FROM videos v JOIN channels c ON c.id = v.channel '
+        'WHERE v.youtube_video_id = ? AND c.channel_id = ?',
+        (youtube_video_id, channel_id),
+    ))
+    return rows[0] if rows else None
+
+
+def channel_counts(channel_pk):
+    """(videos, shorts) for the channel page tabs."""
+    row = _connect().execute(
+        'SELECT COALESCE(SUM(is_short = 0), 0), COALESCE(SUM(is_short = 1), 0) '
+        'FROM videos WHERE channel = ?',
+        (channel_pk,),
+    ).fetchone()
+    return row[0], row[1]
+
+
+# Snapshot columns for the sort keys of views.CHANNEL_ORDERINGS
+_COLUMNS = {'published_at': 'published_us', 'view_count': 'view_count', 'id': 'id'}
+
+
+def _cursor_value(field, value):
+    if field == 'published_at':
+        return _to_us(datetime.fromisoformat(value))
+    return int(value)
+
+
+def channel_page(channel_pk, category, ordering, cursor=None, limit=24):
+    """
+    pagination.keyset_page() over the snapshot — same cursors, so a page
+    rendered from the ORM can be continued from here and vice versa.
+    Raises InvalidCursor.
+    """
+    values = decode_cursor(cursor, ordering)
+
+    where  = ['channel = ?']
+    params = [channel_pk]
+    if category == 'videos':
+        where.append('is_short = 0')
+    elif category == 'shorts':
+        where.append('is_short = 1')
+
+    if values is not None:
+        try:
+            values = [_cursor_value(f.lstrip('-'), v) for f, v in zip(ordering, values)]
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor(str(e))
+        # (a < x) OR (a = x AND b < y) OR ...
+        clauses, equal = [], []
+        for field, value in zip(ordering, values):
+            col = _COLUMNS[field.lstrip('-')]
+            op  = '<' if field.startswith('-') else '>'
+            clauses.append('(' + ' AND '.join([f'{c} = ?' for c, _ in equal] + [f'{col} {op} ?']) + ')')
+            params += [v for _, v in equal] + [value]
+            equal.append((col, value))
+        where.append('(' + ' OR '.join(clauses) + ')')
+
+    order = ', '.join(
+        _COLUMNS[f.lstrip('-')] + (' DESC' if f.startswith('-') else '') for f in ordering
+    )
+    rows = _videos(
+        _connect(),
+        f'SELECT * FROM videos WHERE {" AND ".join(where)} ORDER BY {order} LIMIT ?',
+        params + [limit + 1],
+    )
+    has_more = len(rows) > limit
+    rows     = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor([getattr(rows[-1], f.lstrip('-')) for f in ordering])
+    return _visible(rows), next_cursor
+
+
+def growth_sections():
+    """{section: [video, ...]} — same shape as catalogue.get_growth_sections()."""
+    conn = _connect()
+    return {
+        section: _visible(_videos(
+            conn,
+            'SELECT v.*, g.growth_value, g.growth_label FROM growth g '
+            'JOIN videos v ON v.id = g.video WHERE g.section = ? ORDER BY g.rank',
+            (section,),
+            extra=('growth_value', 'growth_label'),
+        ))
+        for section in GROWTH_SECTIONS
+    }
+
+
+def artists():
+    return [dict(r) for r in _connect().execute('SELECT name, count, bar_pct FROM artists ORDER BY rank')]
+
+
+# ── Search — same rules as views._search_querysets / sonyApp/search.py ─────
+
+def _prefix_matcher(words):
+    patterns = [re.compile(r'(^|\s)' + re.escape(w), re.IGNORECASE) for w in words]
+    return lambda text: all(p.search(text or '') for p in patterns)
+
+
+def _search_videos(conn, words, is_short, limit):
+    from .search import _tokens
+
+    matches = _prefix_matcher(words)
+    tokens  = _tokens(words)
+    if tokens and _local.fts:
+        sql    = ('SELECT * FROM videos WHERE is_short = ? AND id IN '
+                  '(SELECT rowid FROM videos_fts WHERE videos_fts MATCH ?) '
+                  'ORDER BY published_us DESC, id DESC')
+        params = (int(is_short), ' '.join(f'"{t}"*' for t in tokens))
+    else:
+        sql    = 'SELECT * FROM videos WHERE is_short = ? ORDER BY published_us DESC, id DESC'
+        params = (int(is_short),)
+
+    # Candidates come newest first — stop at the limit-th exact match
+    rows = []
+    for row in conn.execute(sql, params):
+        if matches(row['search_text']):
+            rows.append(row)
+            if len(rows) == limit:
+                break
+    return _visible(_cards(conn, rows))
+
+
+def search(normalized, limit=15, channel_limit=5):
+    """(videos, shorts, channels) for a search.normalize_query() string."""
+    conn  = _connect()
+    words = normalized.split()
+
+    matches  = _prefix_matcher(words)
+    channels = []
+    for row in conn.execute('SELECT * FROM channels WHERE is_active = 1 ORDER BY subscriber_count DESC'):
+        if matches(row['name']):
+            channels.append(_channel(row))
+            if len(channels) == channel_limit:
+                break
+
+    return (
+        _search_videos(conn, words, False, limit),
+        _search_videos(conn, words, True, limit),
+        channels,
+    )
+
+
+def recent(limit=8):
+    """(videos, shorts) — the empty-query search payload."""
+    conn = _connect()
+    sql  = 'SELECT * FROM videos WHERE is_short = ? ORDER BY published_us DESC, id DESC LIMIT ?'
+    return _visible(_videos(conn, sql, (0, limit))), _visible(_videos(conn, sql, (1, limit)))
@@ -0,0 +1,220 @@
+"""
+sonyApp/search.py
+
+Indexed prefix search over Video.search_text (FTS5 / tsvector + pg_trgm),
+filtered by the exact `(^|\\s)word` regex, with a single-flight result cache.
+"""
+
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from . import caching, http_cache
+
+# Same token rule as FTS5 unicode61: runs of letters/digits
+_TOKEN = re.compile(r'[^\W_]+')
+
+FTS_TABLE = 'sonyApp_video_fts'
+
+
+def build_search_text(title, channel_name):
+    """The indexed column. Joined by a space so `(^|\\s)word` still means
+    "a word in the title OR in the channel name"."""
+    return f"{title or ''} {channel_name or ''}"
+
+
+def prefix_filter(field, words):
+    """AND of case-insensitive `(^|\\s)word` matches on `field`."""
+    q = Q()
+    for word in words:
+        q &= Q(**{f'{field}__iregex': r'(^|\s)' + re.escape(word)})
+    return q
+
+
+def _tokens(words):
+    return [t.lower() for word in words for t in _TOKEN.findall(word)]
+
+
+def _whole_tokens(words):
+    """
+    Query words that are a single token as they stand. Postgres' parser keeps
+    "ac/dc", "2.0" or "jay-z" as ONE lexeme, so re-splitting them like
+    _TOKEN would look up lexemes that were never stored — those words are
+    narrowed by the pg_trgm index through the regex instead.
+    """
+    return [word.lower() for word in words if _TOKEN.fullmatch(word)]
+
+
+def index_filter(words):
+    """Q narrowing Video ids through the backend's search index (Q() if none)."""
+    from .models import Video
+    table = connection.ops.quote_name(Video._meta.db_table)
+
+    if connection.vendor == 'postgresql':
+        tokens = _whole_tokens(words)
+        if not tokens:
+            return Q()
+        return Q(id__in=RawSQL(
+            f"SELECT id FROM {table} "
+            f"WHERE to_tsvector('simple', search_text) @@ to_tsquery('simple', %s)",
+            [' & '.join(f'{t}:*' for t in tokens)],
+        ))
+    if connection.vendor == 'sqlite':
+        tokens = _tokens(words)
+        if not tokens:
+            return Q()
+        return Q(id__in=RawSQL(
+            f'SELECT rowid FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s',
+            [' '.join(f'"{t}"*' for t in tokens)],
+        ))
+    return Q()
+
+
+def video_filter(words):
+    return index_filter(words) & prefix_filter('search_text', words)
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# RESULT CACHE
+# ───────────────────────────────────────────────────────────────────────────
+
+LOCK_SECONDS      = 10     # a crashed builder can't block a key for longer
+WAIT_SECONDS      = 2      # how long a coalesced miss waits before building itself
+WAIT_POLL_SECONDS = 0.05
+
+
+def normalize_query(query):
+    """'  Naatu  NAATU rrr ' → 'naatu rrr' (the result doesn't depend on order)."""
+    return ' '.join(sorted(set(query.lower().split())))
+
+
+def _key_base(normalized):
+    return f'search:http:{hashlib.md5(normalized.encode()).hexdigest()}'
+
+
+def _ttl(normalized):
+    return settings.SEARCH_CACHE_TTL if normalized else settings.SEARCH_RECENT_CACHE_TTL
+
+
+def cached(normalized, build):
+    """
+    Return the cached encoded payload for `normalized` (http_cache.encode
+    of build()), or build it once — concurrent callers with the same key
+    wait for the first builder (single-flight).
+    """
+    key = caching.make_key(_key_base(normalized), ['search'])
+    ttl = _ttl(normalized)
+
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    lock = f'{key}:lock'
+    if cache.add(lock, 1, LOCK_SECONDS):
+        try:
+            payload = http_cache.encode(build())
+            cache.set(key, payload, ttl)
+            return payload
+        finally:
+            cache.delete(lock)
+
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_SECONDS)
+        payload = cache.get(key)
+        if payload is not None:
+            return payload
+    return http_cache.encode(build())
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# DDL (migration 0011 + rebuild_search_index)
+# ───────────────────────────────────────────────────────────────────────────
+
+def _sqlite_statements(table):
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS "{FTS_TABLE}" USING fts5('
+        f"search_text, content={table}, content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+
+        f'CREATE TRIGGER IF NOT EXISTS "{FTS_TABLE}_ai" AFTER INSERT ON {table} BEGIN '
+        f'INSERT INTO "{FTS_TABLE}"(rowid, search_text) VALUES (new.id, new.search_text); END',
+
+        f'CREATE TRIGGER IF NOT EXISTS "{FTS_TABLE}_ad" AFTER DELETE ON {table} BEGIN '
+        f'INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, search_text) '
+        f"VALUES ('delete', old.id, old.search_text); END",
+
+        f'CREATE TRIGGER IF NOT EXISTS "{FTS_TABLE}_au" AFTER UPDATE OF search_text ON {table} BEGIN '
+        f'INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, search_text) '
+        f"VALUES ('delete', old.id, old.search_text); "
+        f'INSERT INTO "{FTS_TABLE}"(rowid, search_text) VALUES (new.id, new.search_text); END',
+
+        f'INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}") VALUES (\'rebuild\')',
+    ]
+
+
+def _postgres_statements(table, channel_table):
+    return [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        f'CREATE INDEX IF NOT EXISTS sonyapp_video_search_tsv '
+        f"ON {table} USING GIN (to_tsvector('simple', search_text))",
+        f'CREATE INDEX IF NOT EXISTS sonyapp_video_search_trgm '
+        f'ON {table} USING GIN (search_text gin_trgm_ops)',
+        f'CREATE INDEX IF NOT EXISTS sonyapp_channel_name_trgm '
+        f'ON {channel_table} USING GIN (name gin_trgm_ops)',
+    ]
+
+
+def install_index(conn, video_table='sonyApp_video', channel_table='sonyApp_channel'):
+    """Create (or refresh) the search index for conn's backend. Idempotent."""
+    table = conn.ops.quote_name(video_table)
+    if conn.vendor == 'sqlite':
+        statements = _sqlite_statements(table)
+    elif conn.vendor == 'postgresql':
+        statements = _postgres_statements(table, conn.ops.quote_name(channel_table))
+    else:
+        return
+    with conn.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def ensure_index(sender=None, using='default', **kwargs):
+    """post_migrate receiver: reinstall the SQLite triggers if a table rebuild dropped them."""
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, COUNT(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s) GROUP BY type",
+            [FTS_TABLE] + [f'{FTS_TABLE}_{s}' for s in ('ai', 'ad', 'au')],
+        )
+        installed = dict(cursor.fetchall())
+    # No FTS table → migrated back past 0011 (or never installed): leave it
+    if installed.get('table') and installed.get('trigger', 0) < 3:
+        install_index(conn)
+
+
+def drop_index(conn):
+    if conn.vendor == 'sqlite':
+        statements = [f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_{s}"' for s in ('ai', 'ad', 'au')]
+        statements.append(f'DROP TABLE IF EXISTS "{FTS_TABLE}"')
+    elif conn.vendor == 'postgresql':
+        statements = [
+            'DROP INDEX IF EXISTS sonyapp_video_search_tsv',
+            'DROP INDEX IF EXISTS sonyapp_video_search_trgm',
+            'DROP INDEX IF EXISTS sonyapp_channel_name_trgm',
+        ]
+    else:
+        return
+    with conn.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
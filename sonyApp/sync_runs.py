@@ -0,0 +1,73 @@
+"""
+sonyApp/sync_runs.py
+
+Glue between management commands and SyncRun rows: tracked_run() records a
+run's output, counters, errors and YouTube quota.
+"""
+
+import io
+import re
+import threading
+from contextlib import contextmanager
+
+from django.core.management.base import OutputWrapper
+
+from .models import SyncRun
+from .youtube_client import metered
+
+_LINE_BREAK = re.compile(r'[\r\n]')
+
+
+class SyncRunStream(io.TextIOBase):
+    """
+    Write-only text stream: complete lines go to the SyncRun ring buffer,
+    everything is forwarded unchanged to `forward` (the real stdout).
+    \r-terminated progress lines count as lines too.
+    """
+
+    def __init__(self, run, forward=None):
+        self.run      = run
+        self.forward  = forward
+        self._partial = ''
+        self._lock    = threading.Lock()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if self.forward is not None:
+            self.forward.write(text)
+        with self._lock:
+            lines = _LINE_BREAK.split(self._partial + text)
+            self._partial = lines.pop()
+            for line in lines:
+                if line.strip():
+                    self.run.log_line(line)
+        return len(text)
+
+    def flush(self):
+        if self.forward is not None:
+            self.forward.flush()
+
+
+@contextmanager
+def tracked_run(command, kind, run_id=None):
+    """
+    Attach to SyncRun `run_id` (created by a cron view) or open a new one of
+    `kind`, and route command.stdout through it for the duration.
+    """
+    run = SyncRun.objects.get(pk=run_id) if run_id else SyncRun.objects.create(kind=kind)
+    run.begin()
+
+    original       = command.stdout
+    command.stdout = OutputWrapper(SyncRunStream(run, forward=getattr(original, '_out', original)))
+    try:
+        with metered(run.quota_meter):
+            yield run
+    except BaseException as e:
+        run.finish('failed', error=e)
+        raise
+    else:
+        run.finish('success')
+    finally:
+        command.stdout = original
@@ -1,8 +1,12 @@
 from background_task import background
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from .models import Channel, Video
-from googleapiclient.discovery import build
+from . import caching, read_model
+from .artist_tagging import tag_videos
+from .models import Channel, SiteStats, UpNextQueue, Video
+from .thumbs import best_url, ensure_lqip, thumbnails_from_snippet
+from .youtube_client import get_youtube, execute
 from googleapiclient.errors import HttpError
 import isodate
 from datetime import datetime, timedelta
@@ -10,6 +14,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+REBUILD_PENDING_KEY = 'read_model:rebuild_pending'
+
 
 @background(schedule=60)  # Run every 60 seconds (1 minute) - for testing
 def sync_recent_videos():
@@ -25,8 +31,8 @@ def sync_recent_videos():
         logger.error("❌ YOUTUBE_API_KEY not set!")
         return
     
-    # Build YouTube API client
-    youtube = build('youtube', 'v3', developerKey=api_key)
+    # Per-thread pooled YouTube API client
+    youtube = get_youtube()
     
     # Get all active channels
     channels = Channel.objects.filter(is_active=True)
@@ -37,6 +43,7 @@ def sync_recent_videos():
     
     total_new = 0
     total_updated = 0
+    stats_delta = {'videos': 0, 'monthly_views': 0, 'subscribers': 0}
     
     for channel in channels:
         try:
@@ -47,11 +54,14 @@ def sync_recent_videos():
                 youtube, 
                 channel,
                 hours=24,  # Last 24 hours
-                max_videos=50  # Max 50 recent videos
+                max_videos=50,  # Max 50 recent videos
+                stats_delta=stats_delta,
             )
             
             total_new += new_count
             total_updated += updated_count
+            if new_count or updated_count:
+                UpNextQueue.rebuild(channel.pk)
             
             logger.info(f"   ✅ {channel.name}: {new_count} new, {updated_count} updated")
             
@@ -59,32 +69,46 @@ def sync_recent_videos():
             logger.error(f"   ❌ Error syncing {channel.name}: {e}")
     
     logger.info(f"✅ Sync complete! Total: {total_new} new, {total_updated} updated")
+    SiteStats.apply_delta(**stats_delta)
+    if total_new or total_updated:
+        caching.bump(*caching.INGEST_TAGS)
+    try:
+        read_model.build()
+    except Exception as e:
+        logger.error(f"❌ Read model build failed: {e}")
     
     # Schedule next run (1 hour from now)
     sync_recent_videos(schedule=3600)  # 3600 seconds = 1 hour
 
 
-def fetch_recent_channel_videos(youtube, channel, hours=24, max_videos=50):
+def fetch_recent_channel_videos(youtube, channel, hours=24, max_videos=50, stats_delta=None):
     """
-    Fetch recent videos from a channel (last N hours)
+    Fetch recent videos from a channel (last N hours).
+    Site-wide counter changes are added to stats_delta (SiteStats.apply_delta kwargs).
     """
+    if stats_delta is None:
+        stats_delta = {'videos': 0, 'monthly_views': 0, 'subscribers': 0}
     new_videos = 0
     updated_videos = 0
     
     try:
         # Get channel info
-        channel_response = youtube.channels().list(
+        channel_response = execute(youtube.channels().list(
             part='contentDetails,statistics',
             id=channel.youtube_channel_id
-        ).execute()
+        ))
         
         if not channel_response['items']:
             return new_videos, updated_videos
         
         # Update subscriber count
         stats = channel_response['items'][0].get('statistics', {})
-        channel.subscriber_count = int(stats.get('subscriberCount', 0))
-        channel.save()
+        new_subs = int(stats.get('subscriberCount', 0))
+        if new_subs != channel.subscriber_count:   # unchanged → no write, no cache bump
+            stats_delta['subscribers'] += new_subs - channel.subscriber_count
+            channel.subscriber_count = new_subs
+            # update_fields: a full save would write back stale counters
+            channel.save(update_fields=['subscriber_count'])
         
         # Get uploads playlist
         uploads_playlist_id = channel_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
@@ -93,11 +117,11 @@ def fetch_recent_channel_videos(youtube, channel, hours=24, max_videos=50):
         cutoff_time = timezone.now() - timedelta(hours=hours)
         
         # Fetch recent videos
-        playlist_response = youtube.playlistItems().list(
+        playlist_response = execute(youtube.playlistItems().list(
             part='snippet,contentDetails',
             playlistId=uploads_playlist_id,
             maxResults=max_videos
-        ).execute()
+        ))
         
         video_ids = [item['contentDetails']['videoId'] for item in playlist_response['items']]
         
@@ -105,10 +129,10 @@ def fetch_recent_channel_videos(youtube, channel, hours=24, max_videos=50):
             return new_videos, updated_videos
         
         # Get video details
-        videos_response = youtube.videos().list(
+        videos_response = execute(youtube.videos().list(
             part='snippet,contentDetails,statistics',
             id=','.join(video_ids)
-        ).execute()
+        ))
         
         # Process each video
         for video_data in videos_response['items']:
@@ -121,7 +145,7 @@ def fetch_recent_channel_videos(youtube, channel, hours=24, max_videos=50):
                 continue
             
             # Save video
-            created = save_video(channel, video_data)
+            created = save_video(channel, video_data, stats_delta=stats_delta)
             
             if created:
                 new_videos += 1
@@ -137,9 +161,77 @@ def fetch_recent_channel_videos(youtube, channel, hours=24, max_videos=50):
     return new_videos, updated_videos
 
 
-def save_video(channel, video_data):
+@background(schedule=0)
+def ingest_video(youtube_video_id):
     """
-    Save or update video in database
+    Targeted single-video ingestion, enqueued by the WebSub callback the
+    moment the hub pushes a new/updated upload. One videos().list call,
+    one embeddability check, one row written.
+    """
+    from .management.commands.fetch_youtube_videos import check_embeddable
+
+    api_key = settings.YOUTUBE_API_KEY
+    if not api_key:
+        logger.error("❌ YOUTUBE_API_KEY not set!")
+        return
+
+    youtube = get_youtube()
+
+    try:
+        response = execute(youtube.videos().list(
+            part='snippet,contentDetails,statistics',
+            id=youtube_video_id
+        ))
+    except HttpError as e:
+        logger.error(f"YouTube API error for {youtube_video_id}: {e}")
+        return
+
+    if not response.get('items'):
+        logger.warning(f"⚠️ Pushed video not found on YouTube: {youtube_video_id}")
+        return
+
+    video_data = response['items'][0]
+    channel = Channel.objects.filter(
+        youtube_channel_id=video_data['snippet'].get('channelId'),
+        is_active=True,
+    ).first()
+    if channel is None:
+        logger.warning(f"⚠️ Pushed video {youtube_video_id} belongs to no active channel")
+        return
+
+    stats_delta = {'videos': 0, 'monthly_views': 0, 'subscribers': 0}
+    created = save_video(channel, video_data, is_embeddable=check_embeddable(youtube_video_id), stats_delta=stats_delta)
+    UpNextQueue.rebuild(channel.pk)
+    SiteStats.apply_delta(**stats_delta)
+    caching.bump(*caching.INGEST_TAGS)   # a push means the video is new or was edited
+    # Snapshot-backed listings show it after a rebuild — one per burst of pushes
+    if cache.add(REBUILD_PENDING_KEY, 1, settings.READ_MODEL_PUSH_DELAY * 10):
+        rebuild_read_model(schedule=settings.READ_MODEL_PUSH_DELAY)
+    logger.info(
+        f"📨 Push ingest {'🆕 new' if created else 'updated'}: "
+        f"{video_data['snippet'].get('title', '')[:50]}"
+    )
+
+
+@background(schedule=60)
+def rebuild_read_model():
+    """
+    Debounced snapshot rebuild after WebSub pushes (queued by ingest_video).
+    The pending flag is cleared first, so a push landing mid-build queues
+    the next one.
+    """
+    cache.delete(REBUILD_PENDING_KEY)
+    try:
+        read_model.build()
+    except Exception as e:
+        logger.error(f"❌ Read model build failed: {e}")
+
+
+def save_video(channel, video_data, is_embeddable=None, stats_delta=None):
+    """
+    Save or update video in database.
+    is_embeddable is only written when the caller has actually checked it.
+    The change to site-wide counters is added to stats_delta, if given.
     """
     video_id = video_data['id']
     snippet = video_data['snippet']
@@ -165,30 +257,64 @@ def save_video(channel, video_data):
     published_at_str = snippet['publishedAt']
     published_at = datetime.fromisoformat(published_at_str.replace('Z', '+00:00'))
     
-    # Get best thumbnail
-    thumbnails = snippet.get('thumbnails', {})
-    thumbnail_url = (
-        thumbnails.get('maxres', {}).get('url') or
-        thumbnails.get('high', {}).get('url') or
-        thumbnails.get('medium', {}).get('url') or
-        thumbnails.get('default', {}).get('url', '')
-    )
+    # Every thumbnail size (sonyApp/thumbs.py); thumbnail_url stays the largest
+    thumbnails    = thumbnails_from_snippet(snippet)
+    thumbnail_url = best_url(thumbnails)
     
-    # Create or update
+    defaults = {
+        'channel': channel,
+        'title': snippet.get('title', 'Untitled'),
+        'description': snippet.get('description', ''),
+        'thumbnail_url': thumbnail_url,
+        'thumbnails': thumbnails,
+        'duration': duration_formatted,
+        'view_count': int(statistics.get('viewCount', 0)),
+        'like_count': int(statistics.get('likeCount', 0)),
+        'published_at': published_at,
+        'is_active': True,
+    }
+    if is_embeddable is not None:
+        defaults['is_embeddable']    = is_embeddable
+        defaults['embed_checked_at'] = timezone.now()
+
+    # Create or update (keeping Channel counters in step)
+    before = Video.counter_row(video_id)
     video, created = Video.objects.update_or_create(
         youtube_video_id=video_id,
-        defaults={
-            'channel': channel,
-            'title': snippet.get('title', 'Untitled'),
-            'description': snippet.get('description', ''),
-            'thumbnail_url': thumbnail_url,
-            'duration': duration_formatted,
-            'view_count': int(statistics.get('viewCount', 0)),
-            'like_count': int(statistics.get('likeCount', 0)),
-            'published_at': published_at,
-            'is_active': True,
-        }
+        defaults=defaults,
     )
+    Channel.apply_video_save(before, video)
+    if stats_delta is not None:
+        SiteStats.add_video_save(stats_delta, before, video)
+    if before and not video.is_embeddable:
+        read_model.hide(video.pk)   # now blocked — off the snapshot pages at once
+    tag_videos([video])
+    if not video.lqip:
+        fill_lqip([video.pk])   # thumbnail download — off the ingest path
     
     return created
 
+
+@background(schedule=0)
+def fill_lqip(video_pks):
+    """
+    Build the LQIP placeholder for freshly ingested videos. Queued by the
+    ingest paths so a slow thumbnail host never holds up a sync; the
+    build_lqip command backfills anything this missed.
+    """
+    videos = list(
+        Video.objects
+        .filter(pk__in=video_pks, lqip='')
+        .only('pk', 'channel_id', 'youtube_video_id', 'thumbnail_url', 'thumbnails', 'lqip')
+    )
+    for video in videos:
+        ensure_lqip(video)
+
+    channels = {v.channel_id for v in videos if v.lqip}
+    if not channels:
+        return
+    # Up-next cards carry the placeholder too; the snapshot picks it up on its next build
+    for channel_pk in channels:
+        UpNextQueue.rebuild(channel_pk)
+    caching.bump(*caching.INGEST_TAGS)
+
@@ -71,3 +71,44 @@ def short_number(value):
 
     
 
+
+
+# ── Thumbnails (sonyApp/thumbs.py) ─────────────────────────────────────────
+# Work on Video instances and on UpNextQueue card dicts alike.
+
+def _video_id(video):
+    if isinstance(video, dict):
+        return video.get('youtube_video_id')
+    return getattr(video, 'youtube_video_id', None)
+
+
+@register.filter
+def thumb_url(video, width=320):
+    """
+    Resized WebP thumbnail URL.
+    Usage: <img src="{{ video|thumb_url:320 }}">
+    """
+    from django.urls import reverse
+    return reverse('thumbnail', args=[_video_id(video), int(width)])
+
+
+@register.filter
+def thumb_srcset(video):
+    """
+    srcset over every width the /thumb/ endpoint renders.
+    Usage: <img srcset="{{ video|thumb_srcset }}" sizes="...">
+    """
+    from sonyApp.thumbs import WIDTHS
+    return ', '.join(f'{thumb_url(video, w)} {w}w' for w in WIDTHS)
+
+
+@register.filter
+def lqip_bg(video):
+    """
+    Inline blurred placeholder, painted until the image loads.
+    Usage: <img style="{{ video|lqip_bg }}width:100%;">
+    """
+    lqip = video.get('lqip') if isinstance(video, dict) else getattr(video, 'lqip', '')
+    if not lqip:
+        return ''
+    return f"background:url('{lqip}') center/cover no-repeat;"
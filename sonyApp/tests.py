@@ -1,3 +1,960 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from background_task.models import Task
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import cards, caching, db_router, http_cache, read_model, search, tasks
+from .artist_tagging import Matcher, tag_videos
+from .file_cache import FileCache
+from .models import Artist, Channel, SiteStats, SyncRun, UpNextQueue, Video, VideoArtist
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+from .sync_runs import tracked_run
+from .views import CHANNEL_ORDERINGS, _channel_videos_query
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+PLAIN_STATIC = {
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'default':     {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+}
+
+
+def make_channel(name='Sony Music South', channel_id='UC_test'):
+    return Channel.objects.create(channel_id=channel_id, youtube_channel_id=channel_id, name=name)
+
+
+def use_temp_read_model(test):
+    """Point READ_MODEL_PATH at a throwaway directory for one test."""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+    settings_override = override_settings(READ_MODEL_PATH=os.path.join(directory, 'read-model.sqlite3'))
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+
+
+def make_video(channel, youtube_video_id, title, days_ago=0, published_at=None, **fields):
+    return Video.objects.create(
+        channel=channel, youtube_video_id=youtube_video_id, title=title,
+        published_at=published_at or timezone.now() - timedelta(days=days_ago), **fields,
+    )
+
+
+def make_listing():
+    """A channel with 11 videos (3 shorts) tied on published_at / view_count."""
+    channel = make_channel()
+    tie = timezone.now().replace(microsecond=123456) - timedelta(days=1)
+    for i in range(11):
+        make_video(
+            channel, f'v{i:02}', f'Video {i}',
+            # Ties on published_at and view_count: the id breaks them
+            published_at=tie if i % 3 == 0 else tie - timedelta(hours=i),
+            view_count=(i % 4) * 100,
+            duration='0:30' if i % 5 == 0 else '4:00',
+        )
+    return channel
+
+
+def walk(page, limit=3):
+    """Follow next cursors of page(cursor, limit) to the end → video ids."""
+    ids, cursor = [], None
+    while True:
+        rows, cursor = page(cursor, limit)
+        ids += [row.youtube_video_id for row in rows]
+        if cursor is None:
+            return ids
+
+
+class SearchTests(TestCase):
+    """sonyApp/search.py — index narrowing + exact `(^|\\s)word` semantics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        channel = make_channel()
+        make_video(channel, 'robot', 'Robot 2.0 - Official Trailer')
+        make_video(channel, 'acdc',  'AC/DC Tribute Live')
+        make_video(channel, 'naatu', 'Naatu Naatu Full Video')
+        make_video(channel, 'jayz',  'Jay-Z & Friends')
+        make_video(channel, 'ball',  'Mirrorball')
+
+    def matches(self, query):
+        words = search.normalize_query(query).split()
+        return set(Video.objects.filter(search.video_filter(words)).values_list('youtube_video_id', flat=True))
+
+    def test_punctuated_words(self):
+        self.assertEqual(self.matches('Robot 2.0'), {'robot'})
+        self.assertEqual(self.matches('robot 2.'), {'robot'})
+        self.assertEqual(self.matches('AC/DC'), {'acdc'})
+        self.assertEqual(self.matches('ac/d'), {'acdc'})
+        self.assertEqual(self.matches('jay-z'), {'jayz'})
+
+    def test_prefix_only(self):
+        self.assertEqual(self.matches('naa'), {'naatu'})
+        self.assertEqual(self.matches('NAATU naatu  full'), {'naatu'})
+        self.assertEqual(self.matches('dc'), set())      # "dc" follows "/", not whitespace
+        self.assertEqual(self.matches('ball'), set())    # inside "Mirrorball"
+        self.assertEqual(self.matches('sony'), {'robot', 'acdc', 'naatu', 'jayz', 'ball'})
+
+    def test_word_without_letters_goes_through_regex(self):
+        self.assertEqual(self.matches('&'), {'jayz'})
+        self.assertEqual(self.matches('& friends'), {'jayz'})
+
+    def test_postgres_tsquery_words(self):
+        # Postgres keeps "2.0", "ac/dc", "jay-z" as single lexemes — only words
+        # that are one letters/digits token go into the tsquery
+        self.assertEqual(
+            search._whole_tokens(['Robot', '2.0', 'AC/DC', 'jay-z', '&', 'Naatu']),
+            ['robot', 'naatu'],
+        )
+
+    def test_normalize_query(self):
+        self.assertEqual(search.normalize_query('  Naatu  NAATU rrr '), 'naatu rrr')
+        self.assertEqual(search.normalize_query('rrr naatu'), 'naatu rrr')
+
+    def test_every_payload_expires(self):
+        self.assertIsNotNone(search._ttl(''))
+        self.assertIsNotNone(search._ttl('naatu'))
+
+
+class FileCacheTests(TestCase):
+    """sonyApp/file_cache.py — add() is create-if-absent across processes."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.cache = FileCache(self.dir, {'OPTIONS': {'MAX_ENTRIES': 50, 'CULL_EVERY': 1}})
+
+    def test_add_only_creates(self):
+        self.assertTrue(self.cache.add('lock', 1, 10))
+        self.assertFalse(FileCache(self.dir, {}).add('lock', 2, 10))
+        self.assertEqual(self.cache.get('lock'), 1)
+
+    def test_add_replaces_expired(self):
+        self.cache.set('lock', 1, 1)
+        time.sleep(1.1)
+        self.assertTrue(self.cache.add('lock', 2, 10))
+        self.assertEqual(self.cache.get('lock'), 2)
+
+
+class MatcherTests(TestCase):
+    """sonyApp/artist_tagging.py — one pass finds every artist in a text."""
+
+    def test_overlapping_patterns(self):
+        matcher = Matcher([('he', 1), ('she', 2), ('his', 3), ('hers', 4)])
+        self.assertEqual(matcher.find('ushers'), {1, 2, 4})
+        self.assertEqual(matcher.find('this'), {3})
+        self.assertEqual(matcher.find('nothing'), set())
+
+    def test_case_insensitive_substring_like_icontains(self):
+        matcher = Matcher([('A.R. Rahman', 1), ('AR Rahman', 1), ('Karthik', 2), ('', 3)])
+        self.assertEqual(matcher.find('Music by A.R. RAHMAN | Sung by Karthikeyan'), {1, 2})
+        self.assertEqual(matcher.find('ar rahman hits'), {1})
+        self.assertEqual(matcher.find(''), set())
+        self.assertEqual(matcher.find(None), set())
+
+    def test_tag_videos_replaces_links(self):
+        # Both are seeded by migration 0012
+        rahman, _ = Artist.objects.update_or_create(name='A.R. Rahman', defaults={'aliases': ['ARR']})
+        karthik   = Artist.objects.get(name='Karthik')
+        video   = make_video(make_channel(), 'v1', 'ARR Jukebox', description='feat. Karthik')
+
+        self.assertEqual(tag_videos([video]), 2)
+        self.assertEqual(
+            set(VideoArtist.objects.filter(video=video).values_list('artist_id', flat=True)),
+            {rahman.pk, karthik.pk},
+        )
+
+        video.description = ''
+        tag_videos([video])
+        self.assertEqual(list(VideoArtist.objects.filter(video=video).values_list('artist_id', flat=True)), [rahman.pk])
+
+
+class PaginationTests(TestCase):
+    """sonyApp/pagination.py — cursors round-trip and pages never skip or repeat."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.channel = make_listing()
+
+    def test_cursor_round_trip(self):
+        published = timezone.now().replace(microsecond=654321)
+        cursor    = encode_cursor([published, 42])
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor, ('-published_at', '-id')), [published.isoformat(), 42])
+        self.assertIsNone(decode_cursor(None, ('-id',)))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not base64 json!', ('-id',))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(encode_cursor([1, 2]), ('-id',))
+        with self.assertRaises(InvalidCursor):
+            keyset_page(Video.objects.all(), ('-published_at', '-id'), encode_cursor(['yesterday', 1]))
+
+    def test_pages_cover_ordering_exactly(self):
+        for sort_by, ordering in CHANNEL_ORDERINGS.items():
+            for category in ('all', 'videos', 'shorts'):
+                qs, _ = _channel_videos_query(self.channel, category, sort_by)
+                expected = list(qs.order_by(*ordering).values_list('youtube_video_id', flat=True))
+                walked   = walk(lambda cursor, limit: keyset_page(qs, ordering, cursor, limit=limit))
+                self.assertEqual(walked, expected, (sort_by, category))
+
+
+@override_settings(CACHES=LOCMEM)
+class ReadModelTests(TestCase):
+    """sonyApp/read_model.py — the snapshot pages exactly like the ORM."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.channel = make_listing()
+        make_video(cls.channel, 'gone', 'Unembeddable', is_embeddable=False)
+
+    def setUp(self):
+        use_temp_read_model(self)
+        self.counts = read_model.build()
+
+    def orm_page(self, category, sort_by):
+        qs, ordering = _channel_videos_query(self.channel, category, sort_by)
+        return lambda cursor, limit: keyset_page(qs, ordering, cursor, limit=limit)
+
+    def snapshot_page(self, category, sort_by):
+        ordering = CHANNEL_ORDERINGS[sort_by]
+        return lambda cursor, limit: read_model.channel_page(self.channel.pk, category, ordering, cursor, limit=limit)
+
+    def test_snapshot_pages_match_orm(self):
+        self.assertTrue(read_model.available())
+        self.assertEqual(self.counts['videos'], 11)
+        for sort_by in CHANNEL_ORDERINGS:
+            for category in ('all', 'videos', 'shorts'):
+                self.assertEqual(
+                    walk(self.snapshot_page(category, sort_by)),
+                    walk(self.orm_page(category, sort_by)),
+                    (sort_by, category),
+                )
+
+    def test_cursors_are_interchangeable(self):
+        for sort_by in CHANNEL_ORDERINGS:
+            orm, snapshot = self.orm_page('all', sort_by), self.snapshot_page('all', sort_by)
+            _, orm_cursor      = orm(None, 4)
+            _, snapshot_cursor = snapshot(None, 4)
+            for cursor in (orm_cursor, snapshot_cursor):
+                self.assertEqual(
+                    [v.youtube_video_id for v in snapshot(cursor, 4)[0]],
+                    [v.youtube_video_id for v in orm(cursor, 4)[0]],
+                )
+
+    def test_counts_and_player_lookup(self):
+        qs, _ = _channel_videos_query(self.channel, 'shorts', 'recent')
+        self.assertEqual(read_model.channel_counts(self.channel.pk), (11 - qs.count(), qs.count()))
+        self.assertEqual(read_model.video('UC_test', 'v01').title, 'Video 1')
+        self.assertIsNone(read_model.video('UC_test', 'gone'))
+
+    def test_hidden_videos_drop_out_until_the_next_build(self):
+        video = Video.objects.get(youtube_video_id='v01')
+        read_model.hide(video.pk)
+        self.assertIsNone(read_model.video('UC_test', 'v01'))
+        self.assertNotIn('v01', walk(self.snapshot_page('all', 'recent')))
+
+        # Unblocked again before the next build → that build shows it
+        time.sleep(0.01)
+        read_model.build()
+        self.assertEqual(read_model.video('UC_test', 'v01').pk, video.pk)
+
+    def test_build_bumps_only_changed_channels(self):
+        self.assertEqual(read_model.build()['changed_channels'], 0)
+        Video.objects.filter(youtube_video_id='v01').update(view_count=999)
+        self.assertEqual(read_model.build()['changed_channels'], 1)
+
+
+@override_settings(CACHES=LOCMEM)
+class HttpCacheTests(TestCase):
+    """sonyApp/http_cache.py — content negotiation and 304s from tag versions."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def encodings(self, header):
+        return http_cache.accepted_encodings(self.factory.get('/', HTTP_ACCEPT_ENCODING=header))
+
+    def test_accepted_encodings(self):
+        self.assertEqual(self.encodings(''), set())
+        self.assertEqual(self.encodings('gzip, deflate, br'), {'gzip', 'deflate', 'br'})
+        self.assertEqual(self.encodings('GZIP;q=0.5, br;q=0'), {'gzip'})
+        self.assertEqual(self.encodings('br;q=abc, gzip'), {'gzip'})
+        self.assertEqual(self.encodings('*'), {'*', 'br', 'gzip'})
+        self.assertEqual(self.encodings('*;q=1, br;q=0'), {'*', 'gzip'})
+
+    def test_respond_picks_accepted_variant(self):
+        payload  = http_cache.encode({'rows': ['x' * 40] * 40})
+        response = http_cache.respond(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip'), payload)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response.content, payload['gzip'])
+        response = http_cache.respond(self.factory.get('/'), payload)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, payload['identity'])
+
+    def test_conditional_304_until_tag_bump(self):
+        calls = []
+
+        @http_cache.conditional(['test-tag'])
+        def view(request):
+            calls.append(request)
+            return HttpResponse('body')
+
+        first = view(self.factory.get('/'))
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        again = view(self.factory.get('/', HTTP_IF_NONE_MATCH=first['ETag']))
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(len(calls), 1)   # the view never ran
+
+        time.sleep(0.002)
+        caching.bump('test-tag')
+        changed = view(self.factory.get('/', HTTP_IF_NONE_MATCH=first['ETag']))
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+        self.assertEqual(len(calls), 2)
+
+
+@override_settings(CACHES=LOCMEM, WEBSUB_SECRET='hub-secret')
+class WebSubCallbackTests(TestCase):
+    """views.websub_callback — only our own (un)subscribes verify, only signed pushes ingest."""
+
+    FEED = ('<feed xmlns="http://www.w3.org/2005/Atom" xmlns:yt="http://www.youtube.com/xml/schemas/2015">'
+            '<entry><yt:videoId>abc123</yt:videoId></entry></feed>').encode()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.channel = make_channel()
+
+    def setUp(self):
+        cache.clear()
+
+    def verify(self, mode, topic=None):
+        return self.client.get('/api/websub/callback/', {
+            'hub.mode':          mode,
+            'hub.topic':         topic or self.channel.get_feed_url(),
+            'hub.challenge':     'xyz',
+            'hub.lease_seconds': 3600,
+        })
+
+    def push(self, signature):
+        with mock.patch('sonyApp.views.ingest_video') as ingest:
+            response = self.client.post(
+                '/api/websub/callback/', self.FEED, content_type='application/atom+xml',
+                HTTP_X_HUB_SIGNATURE=signature,
+            )
+        return response, ingest
+
+    def test_unrequested_verification_is_refused(self):
+        self.assertEqual(self.verify('subscribe').status_code, 404)
+        self.assertEqual(self.verify('unsubscribe').status_code, 404)
+        self.channel.refresh_from_db()
+        self.assertIsNone(self.channel.websub_lease_expires_at)
+
+    def test_requested_subscribe_echoes_challenge(self):
+        self.channel.expect_websub('subscribe')
+        self.assertEqual(self.verify('unsubscribe').status_code, 404)
+        self.assertEqual(self.verify('subscribe', topic=self.channel.get_feed_url() + 'x').status_code, 404)
+
+        response = self.verify('subscribe')
+        self.assertEqual((response.status_code, response.content), (200, b'xyz'))
+        self.channel.refresh_from_db()
+        self.assertIsNotNone(self.channel.websub_lease_expires_at)
+
+        self.channel.expect_websub('unsubscribe')
+        self.assertEqual(self.verify('unsubscribe').content, b'xyz')
+        self.channel.refresh_from_db()
+        self.assertIsNone(self.channel.websub_lease_expires_at)
+
+    def test_signed_push_is_ingested(self):
+        digest = hmac.new(b'hub-secret', self.FEED, hashlib.sha1).hexdigest()
+        response, ingest = self.push(f'sha1={digest}')
+        self.assertEqual(response.status_code, 204)
+        ingest.assert_called_once_with('abc123')
+
+    def test_bad_signature_is_dropped(self):
+        for signature in ('', 'sha1=' + '0' * 40, 'md5=abc'):
+            response, ingest = self.push(signature)
+            self.assertEqual(response.status_code, 204)
+            ingest.assert_not_called()
+
+    def test_pushes_share_one_debounced_rebuild(self):
+        use_temp_read_model(self)
+        youtube = mock.Mock()
+        youtube.videos.return_value.list.return_value.execute.return_value = {'items': [{
+            **video_item('abc123', 10),
+            'snippet': {**video_item('abc123', 10)['snippet'], 'channelId': self.channel.youtube_channel_id},
+        }]}
+        with mock.patch('sonyApp.tasks.get_youtube', return_value=youtube), \
+             mock.patch('sonyApp.management.commands.fetch_youtube_videos.check_embeddable', return_value=True), \
+             override_settings(YOUTUBE_API_KEY='k'):
+            tasks.ingest_video.now('abc123')
+            tasks.ingest_video.now('abc123')
+        self.assertEqual(Task.objects.filter(task_name='sonyApp.tasks.rebuild_read_model').count(), 1)
+
+        tasks.rebuild_read_model.now()
+        self.assertIsNone(cache.get(tasks.REBUILD_PENDING_KEY))
+        self.assertEqual([v.youtube_video_id for v in read_model.recent()[0]], ['abc123'])
+
+
+class ShortsRuleTests(TestCase):
+    """One duration rule for Shorts — Video.save(), sync and backfill agree."""
+
+    def test_backfill_fields_match_save(self):
+        from .management.commands.fetch_youtube_videos import Command
+
+        channel = make_channel()
+        for seconds, expected in ((0, False), (45, True), (65, True), (70, True), (71, False)):
+            vdata = {
+                'id': f'd{seconds}',
+                'snippet': {'title': 't', 'publishedAt': '2024-01-01T00:00:00Z'},
+                'contentDetails': {'duration': f'PT{seconds}S'},
+            }
+            fields = Command().video_fields(channel, vdata)
+            saved  = Video.objects.create(youtube_video_id=vdata['id'], **fields)
+            self.assertEqual((fields['is_short'], saved.is_short), (expected, expected), seconds)
+
+
+def fake_youtube(returned, views=10):
+    """A YouTube client whose videos().list returns only the ids in `returned`."""
+    def videos_list(part, id):
+        request = mock.Mock()
+        request.execute.return_value = {'items': [
+            {'id': vid, 'statistics': {'viewCount': str(views)}} for vid in id.split(',') if vid in returned
+        ]}
+        return request
+
+    youtube = mock.Mock()
+    youtube.videos.return_value.list.side_effect = videos_list
+    return youtube
+
+
+@override_settings(CACHES=LOCMEM, TOMBSTONE_AFTER_MISSES=2)
+class TombstoneTests(TestCase):
+    """update_video_stats — missing videos are tombstoned after N misses and resurrected."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.channel = make_channel()
+        make_video(cls.channel, 'alive', 'Still there')
+        make_video(cls.channel, 'gone',  'Deleted', duration='0:30')
+        Channel.reconcile_counters()
+
+    def setUp(self):
+        cache.clear()
+        use_temp_read_model(self)
+
+    def stats_run(self, returned, *args):
+        with mock.patch('sonyApp.management.commands.update_video_stats.get_youtube',
+                        return_value=fake_youtube(returned)):
+            call_command('update_video_stats', *args, stdout=StringIO())
+
+    def test_tombstone_after_consecutive_misses(self):
+        self.stats_run({'alive'})
+        gone = Video.objects.get(youtube_video_id='gone')
+        self.assertEqual((gone.is_active, gone.missing_count), (True, 1))
+
+        self.stats_run({'alive', 'gone'})   # seen again → the streak resets
+        self.assertEqual(Video.objects.get(youtube_video_id='gone').missing_count, 0)
+
+        self.stats_run({'alive'})
+        self.stats_run({'alive'})
+        gone = Video.objects.get(youtube_video_id='gone')
+        self.assertFalse(gone.is_active)
+        self.assertIsNotNone(gone.tombstoned_at)
+        self.assertEqual(Video.objects.get(youtube_video_id='alive').missing_count, 0)
+        self.assertEqual(Channel.reconcile_counters(), [])   # counters moved with it
+
+        self.stats_run(set())   # tombstoned rows leave the refresh set
+        self.assertEqual(Video.objects.get(youtube_video_id='gone').missing_count, 2)
+
+    def test_resurrect(self):
+        Video.objects.filter(youtube_video_id='gone').update(missing_count=2)
+        self.stats_run({'alive'})
+        self.assertFalse(Video.objects.get(youtube_video_id='gone').is_active)
+
+        self.stats_run({'alive', 'gone'}, '--resurrect')
+        gone = Video.objects.get(youtube_video_id='gone')
+        self.assertEqual((gone.is_active, gone.missing_count, gone.tombstoned_at), (True, 0, None))
+        self.assertEqual(Channel.reconcile_counters(), [])
+
+
+@override_settings(SYNC_RUN_LOG_LINES=5, AUTO_SYNC_SECRET_TOKEN='t')
+class SyncRunTests(TestCase):
+    """sonyApp/sync_runs.py — bounded, incrementally written run records."""
+
+    def test_ring_buffer_and_counters(self):
+        command = BaseCommand(stdout=StringIO())
+        with tracked_run(command, 'fetch') as run:
+            for i in range(50):
+                command.stdout.write(f'line {i}')
+            command.stdout.write('progress 1\rprogress 2\r', ending='')
+            run.bump(new=2)
+            run.bump(new=1, updated=4)
+
+            # Worker-thread lines are buffered until the owner flushes
+            worker = threading.Thread(target=command.stdout.write, args=('from a worker',))
+            worker.start()
+            worker.join()
+            self.assertNotIn('from a worker', SyncRun.objects.get(pk=run.pk).log)
+
+        run = SyncRun.objects.get(pk=run.pk)
+        self.assertEqual(run.status, 'success')
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(run.counters, {'new': 3, 'updated': 4})
+        self.assertEqual(run.log, ['line 48', 'line 49', 'progress 1', 'progress 2', 'from a worker'])
+
+    def test_failed_run(self):
+        with self.assertRaises(ValueError):
+            with tracked_run(BaseCommand(stdout=StringIO()), 'stats') as run:
+                raise ValueError('quota exceeded')
+        run = SyncRun.objects.get(pk=run.pk)
+        self.assertEqual((run.status, run.errors, run.last_error), ('failed', 1, 'quota exceeded'))
+
+    def test_status_api(self):
+        run = SyncRun.objects.create(kind='fetch', log=['hello'])
+        self.assertEqual(self.client.get('/api/sync-runs/').status_code, 401)
+        listing = self.client.get('/api/sync-runs/', {'token': 't', 'kind': 'fetch'}).json()
+        self.assertEqual([r['id'] for r in listing['runs']], [run.pk])
+        self.assertNotIn('log', listing['runs'][0])
+        detail = self.client.get(f'/api/sync-runs/{run.pk}/', {'token': 't'}).json()
+        self.assertEqual(detail['log'], ['hello'])
+
+
+def video_item(youtube_video_id, views, published_at=None, duration='PT4M'):
+    """One videos().list item, as the YouTube API returns it."""
+    published_at = published_at or timezone.now() - timedelta(hours=1)
+    return {
+        'id':             youtube_video_id,
+        'snippet':        {'title': f'Video {youtube_video_id}', 'publishedAt': published_at.isoformat()},
+        'contentDetails': {'duration': duration},
+        'statistics':     {'viewCount': str(views)},
+    }
+
+
+@override_settings(CACHES=LOCMEM, STORAGES=PLAIN_STATIC)
+class SiteStatsTests(TestCase):
+    """SiteStats — ingestion applies deltas, the home page only reads."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_home_never_writes(self):
+        SiteStats.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('db_primary', response.cookies)
+        self.assertEqual([q['sql'] for q in queries if not q['sql'].lstrip().upper().startswith('SELECT')], [])
+        self.assertFalse(SiteStats.objects.exists())
+
+    def test_ingestion_deltas_match_refresh(self):
+        channel = make_channel()
+        delta   = {'videos': 0, 'monthly_views': 0, 'subscribers': 0}
+        tasks.save_video(channel, video_item('new', 100), stats_delta=delta)
+        tasks.save_video(channel, video_item('old', 50, timezone.now() - timedelta(days=60)), stats_delta=delta)
+        tasks.save_video(channel, video_item('new', 130), stats_delta=delta)   # views grew
+        self.assertEqual(delta, {'videos': 2, 'monthly_views': 130, 'subscribers': 0})
+
+        SiteStats.objects.filter(pk=1).update(total_videos=0, monthly_views=0, total_subscribers=0, total_artists=1)
+        SiteStats.apply_delta(**delta)
+        delta_row = SiteStats.objects.values('total_videos', 'monthly_views').get(pk=1)
+        refreshed = SiteStats.refresh()
+        self.assertEqual(delta_row, {'total_videos': refreshed.total_videos, 'monthly_views': refreshed.monthly_views})
+
+
+@override_settings(CACHES=LOCMEM, STORAGES=PLAIN_STATIC)
+class ChannelCounterTests(TestCase):
+    """Channel.video_count / short_count / embeddable_count stay exact on every path."""
+
+    def setUp(self):
+        cache.clear()
+        self.channel = make_channel()
+        self.video   = make_video(self.channel, 'v1', 'Song', duration='4:00')
+        make_video(self.channel, 's1', 'Short', duration='0:30')
+        Channel.reconcile_counters()
+
+    def counters(self):
+        self.channel.refresh_from_db()
+        return self.channel.video_count, self.channel.short_count, self.channel.embeddable_count
+
+    def flag(self, youtube_video_id):
+        return self.client.post(
+            '/api/video/flag-unembeddable/', {'youtube_video_id': youtube_video_id},
+            content_type='application/json',
+        ).json()['flagged']
+
+    def test_flag_unembeddable_counts_once(self):
+        self.assertEqual([self.flag('v1') for _ in range(3)], [True, False, False])
+        self.assertEqual(self.counters(), (2, 1, 1))
+        self.assertEqual(Channel.reconcile_counters(), [])
+
+    def test_save_video_moves_counters(self):
+        tasks.save_video(self.channel, video_item('n1', 5, duration='PT20S'), is_embeddable=True)
+        self.assertEqual(self.counters(), (3, 2, 3))
+        tasks.save_video(self.channel, video_item('n1', 5, duration='PT20S'), is_embeddable=False)
+        self.assertEqual(self.counters(), (3, 2, 2))
+        self.assertEqual(Channel.reconcile_counters(), [])
+
+    def test_lqip_is_queued_not_fetched_inline(self):
+        with mock.patch('sonyApp.tasks.ensure_lqip') as ensure_lqip:
+            tasks.save_video(self.channel, video_item('n1', 5), is_embeddable=True)
+        ensure_lqip.assert_not_called()
+        queued = Task.objects.get(task_name='sonyApp.tasks.fill_lqip')
+        pk = Video.objects.get(youtube_video_id='n1').pk
+        self.assertEqual(json.loads(queued.task_params), [[[pk]], {}])
+
+        def build(video):
+            video.lqip = 'data:image/webp;base64,AAAA'
+            Video.objects.filter(pk=video.pk).update(lqip=video.lqip)
+        with mock.patch('sonyApp.tasks.ensure_lqip', side_effect=build):
+            tasks.fill_lqip.now([pk])
+        self.assertTrue(Video.objects.get(pk=pk).lqip)
+
+    def test_snapshot_keeps_concurrent_flag(self):
+        stale = Video.objects.select_related('channel').get(pk=self.video.pk)
+        self.flag('v1')
+        stale.save_6h_snapshot(1234)   # loaded before the flag, saved after
+
+        video = Video.objects.get(pk=self.video.pk)
+        self.assertEqual((video.view_count, video.is_embeddable), (1234, False))
+        self.assertEqual(Channel.reconcile_counters(), [])
+
+
+@override_settings(CACHES=LOCMEM, STORAGES=PLAIN_STATIC)
+class UpNextTests(TestCase):
+    """UpNextQueue — precomputed same-type lists the player only slices."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.channel = make_channel()
+        for i in range(UpNextQueue.UP_NEXT_SIZE + 3):
+            make_video(cls.channel, f'v{i:02}', f'Video {i}', days_ago=i, duration='4:00')
+        make_video(cls.channel, 'short', 'A Short', duration='0:30')
+        make_video(cls.channel, 'blocked', 'Blocked', is_embeddable=False, duration='4:00')
+
+    def setUp(self):
+        cache.clear()
+        UpNextQueue.rebuild(self.channel.pk)
+
+    def test_queue_is_same_type_newest_first(self):
+        cards, end_screen = UpNextQueue.up_next(self.channel.pk, False, 'v00')
+        ids = [c['youtube_video_id'] for c in cards]
+        self.assertEqual(ids, [f'v{i:02}' for i in range(1, UpNextQueue.UP_NEXT_SIZE + 1)])
+        self.assertEqual([v['youtube_video_id'] for v in json.loads(end_screen)], ids)
+
+        # Watching a video outside the stored list still gets a full list
+        cards, _ = UpNextQueue.up_next(self.channel.pk, False, 'v22')
+        self.assertEqual(len(cards), UpNextQueue.UP_NEXT_SIZE)
+        self.assertEqual([c['youtube_video_id'] for c in UpNextQueue.up_next(self.channel.pk, True, 'x')[0]], ['short'])
+
+    def test_player_reads_the_stored_queue(self):
+        cache.clear()   # cold cache → the stored row, not a rebuild
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/channel/{self.channel.channel_id}/video/v03/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('v03', [c['youtube_video_id'] for c in response.context['streaming']])
+        self.assertEqual(len(response.context['streaming']), UpNextQueue.UP_NEXT_SIZE)
+        self.assertFalse([q for q in queries if 'INSERT' in q['sql'] or 'UPDATE' in q['sql']])
+
+    def test_rebuild_picks_up_new_videos(self):
+        make_video(self.channel, 'fresh', 'Just uploaded', duration='4:00')
+        self.assertNotEqual(UpNextQueue.up_next(self.channel.pk, False, 'v00')[0][0]['youtube_video_id'], 'fresh')
+        UpNextQueue.rebuild(self.channel.pk)
+        self.assertEqual(UpNextQueue.up_next(self.channel.pk, False, 'v00')[0][0]['youtube_video_id'], 'fresh')
+
+
+@override_settings(CACHES=LOCMEM)
+class TagBumpTests(TestCase):
+    """Cache tags move only when the data behind them changed."""
+
+    TAGS = ('search', 'artists', 'growth', 'channels', 'stats')
+
+    def setUp(self):
+        cache.clear()
+        self.channel = make_channel()
+        make_video(self.channel, 'v1', 'Song')
+        use_temp_read_model(self)
+
+    def versions(self):
+        time.sleep(0.002)   # versions are ms timestamps
+        return caching.tag_versions([*self.TAGS, f'channel:{self.channel.pk}'])
+
+    def test_noop_channel_save_keeps_tags(self):
+        before = self.versions()
+        self.channel.save(update_fields=['subscriber_count'])
+        Channel.objects.get(pk=self.channel.pk).save()
+        self.assertEqual(self.versions(), before)
+
+        self.channel.subscriber_count += 1
+        self.channel.save(update_fields=['subscriber_count'])
+        after = self.versions()
+        self.assertNotEqual(after['channels'], before['channels'])
+        self.assertNotEqual(after[f'channel:{self.channel.pk}'], before[f'channel:{self.channel.pk}'])
+        self.assertEqual(after['search'], before['search'])
+
+    def test_unchanged_build_keeps_tags(self):
+        read_model.build()
+        before = self.versions()
+        counts = read_model.build()
+        self.assertEqual((counts['changed_channels'], counts['bumped_tags']), (0, 0))
+        self.assertEqual(self.versions(), before)
+
+        Video.objects.filter(youtube_video_id='v1').update(title='Song (Remastered)')
+        read_model.build()
+        after = self.versions()
+        for tag in ('search', 'channels', f'channel:{self.channel.pk}'):
+            self.assertNotEqual(after[tag], before[tag], tag)
+        for tag in ('artists', 'growth', 'stats'):
+            self.assertEqual(after[tag], before[tag], tag)
+
+    def test_ingest_builds_keep_aggregates(self):
+        read_model.build(aggregates=True)
+        before = (read_model.artists(), self.versions()['artists'])
+        tag_videos([make_video(self.channel, 'v2', 'Karthik Live')])   # Karthik is seeded by migration 0012
+
+        read_model.build()
+        self.assertEqual((read_model.artists(), self.versions()['artists']), before)
+
+        read_model.build(aggregates=True)
+        self.assertIn('Karthik', [a['name'] for a in read_model.artists()])
+        self.assertNotEqual(self.versions()['artists'], before[1])
+
+    @override_settings(STORAGES=PLAIN_STATIC, YOUTUBE_API_KEY='k')
+    def test_unchanged_fetch_keeps_channel_page_cached(self):
+        read_model.build()
+        page = f'/channel/{self.channel.channel_id}/'
+        self.assertEqual(self.client.get(page).status_code, 200)
+        before = self.versions()
+
+        youtube = mock.Mock()
+        youtube.channels.return_value.list.return_value.execute.return_value = {'items': [{
+            'statistics': {'subscriberCount': str(self.channel.subscriber_count)},
+            'contentDetails': {'relatedPlaylists': {'uploads': 'UU_test'}},
+        }]}
+        youtube.playlistItems.return_value.list.return_value.execute.return_value = {
+            'items': [{'contentDetails': {'videoId': 'v1'}}],
+        }
+        youtube.videos.return_value.list.return_value.execute.return_value = {'items': [{'id': 'v1'}]}
+        with mock.patch('sonyApp.management.commands.fetch_youtube_videos.get_youtube', return_value=youtube):
+            call_command('fetch_youtube_videos', stdout=StringIO())
+        read_model.build()
+
+        self.assertEqual(self.versions(), before)
+        with self.assertNumQueries(0):   # still a page-cache hit
+            self.assertEqual(self.client.get(page).status_code, 200)
+
+    def test_only_stats_runs_bump_growth(self):
+        before = self.versions()
+        Video.objects.filter(youtube_video_id='v1').update(title='Song (Live)')
+        read_model.build()
+        self.assertEqual(self.versions()['growth'], before['growth'])
+
+        with mock.patch('sonyApp.management.commands.update_video_stats.get_youtube',
+                        return_value=fake_youtube({'v1'})), \
+             mock.patch('sonyApp.read_model.build', wraps=read_model.build) as build:
+            call_command('update_video_stats', stdout=StringIO())
+        build.assert_called_once()
+        self.assertNotEqual(self.versions()['growth'], before['growth'])
+
+
+@override_settings(CACHES=LOCMEM)
+class StaleWhileRevalidateTests(TestCase):
+    """caching.swr_get — one builder per key, stale values served meanwhile."""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+    def compute(self, value, delay=0):
+        def build():
+            self.calls.append(value)
+            time.sleep(delay)
+            return value
+        return build
+
+    def wait_for(self, expected, compute):
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            if caching.swr_get('k', compute, ['t']) == expected:
+                return
+            time.sleep(0.01)
+        self.fail(f'never saw {expected!r}')
+
+    def test_cold_miss_is_single_flight(self):
+        results = []
+        workers = [
+            threading.Thread(target=lambda: results.append(caching.swr_get('k', self.compute('v1', 0.2), ['t'])))
+            for _ in range(5)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(results, ['v1'] * 5)
+        self.assertEqual(self.calls, ['v1'])
+
+    def test_stale_served_while_one_caller_rebuilds(self):
+        caching.swr_get('k', self.compute('v1'), ['t'])
+        time.sleep(0.002)
+        caching.bump('t')
+
+        slow = self.compute('v2', 0.2)
+        self.assertEqual([caching.swr_get('k', slow, ['t']) for _ in range(5)], ['v1'] * 5)
+        self.wait_for('v2', slow)
+        self.assertEqual(self.calls, ['v1', 'v2'])
+
+    def test_soft_ttl_expiry_revalidates(self):
+        caching.swr_get('k', self.compute('v1'), ['t'], soft_ttl=0)
+        self.assertEqual(caching.swr_get('k', self.compute('v2'), ['t'], soft_ttl=0), 'v1')
+        self.wait_for('v2', self.compute('v2'))
+
+
+@override_settings(CACHES=LOCMEM, STORAGES=PLAIN_STATIC)
+class SessionFreeMiddlewareTests(TestCase):
+    """sonyApp/middleware.py — sessions only under SESSION_PATH_PREFIXES."""
+
+    def setUp(self):
+        cache.clear()
+        self.channel = make_channel()
+        make_video(self.channel, 'v1', 'Song', duration='4:00')
+
+    def session_queries(self, path, client=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = (client or self.client).get(path)
+        return response, [q['sql'] for q in queries if 'django_session' in q['sql']]
+
+    def test_public_pages_skip_the_session(self):
+        self.client.cookies['sessionid'] = 'stale-admin-session'
+        for path in ('/', f'/channel/{self.channel.channel_id}/', '/api/search/videos/?q=song'):
+            response, queries = self.session_queries(path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertEqual(queries, [], path)
+            self.assertNotIn('Cookie', response.get('Vary', ''), path)
+
+    def test_admin_still_gets_a_session(self):
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'pw'))
+        response, queries = self.session_queries('/admin/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries)
+        self.assertEqual(response.context['user'].username, 'admin')
+
+    def test_csrf_still_enforced(self):
+        client = Client(enforce_csrf_checks=True)
+        page = client.get(f'/channel/{self.channel.channel_id}/video/v1/')
+        token = page.cookies['csrftoken'].value
+
+        def flag(**headers):
+            return client.post(
+                '/api/video/flag-unembeddable/', {'youtube_video_id': 'v1'},
+                content_type='application/json', **headers,
+            )
+        self.assertEqual(flag().status_code, 403)
+        self.assertEqual(flag(HTTP_X_CSRFTOKEN=token).status_code, 200)
+
+
+@override_settings(REPLICA_STICKY_SECONDS=30)
+class ReplicaRoutingTests(TestCase):
+    """sonyApp/db_router.py — which alias a request's queries are routed to."""
+
+    def setUp(self):
+        patcher = mock.patch('sonyApp.db_router.replica_enabled', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.channel = make_channel()
+
+    def routed(self, method='get', path='/', cookies=None, write=False):
+        """Run a view through the middleware; returns (read aliases seen, response)."""
+        seen = []
+
+        def view(request):
+            seen.append(Video.objects.all().db)
+            if write:
+                make_video(self.channel, 'w1', 'Written')
+                seen.append(Video.objects.all().db)
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)(path)
+        request.COOKIES.update(cookies or {})
+        return seen, db_router.replica_routing_middleware(view)(request)
+
+    def test_public_get_reads_from_replica(self):
+        seen, response = self.routed()
+        self.assertEqual(seen, ['replica'])
+        self.assertNotIn(db_router.STICKY_COOKIE, response.cookies)
+
+    def test_write_pins_request_and_visitor_to_primary(self):
+        seen, response = self.routed(write=True)
+        self.assertEqual(seen, ['replica', 'default'])
+        self.assertEqual(response.cookies[db_router.STICKY_COOKIE]['max-age'], 30)
+        self.assertEqual(self.routed(cookies={db_router.STICKY_COOKIE: '1'})[0], ['default'])
+
+    def test_primary_for_unsafe_admin_and_background_work(self):
+        self.assertEqual(self.routed(method='post')[0], ['default'])
+        self.assertEqual(self.routed(path='/admin/')[0], ['default'])
+        self.assertEqual(Video.objects.all().db, 'default')   # outside any request
+
+        with mock.patch('sonyApp.db_router.replica_enabled', return_value=False):
+            self.assertEqual(self.routed()[0], ['default'])
+
+
+class CardTests(TestCase):
+    """sonyApp/cards.py — slotted cards, bounded lists, compact pickles."""
+
+    @classmethod
+    def setUpTestData(cls):
+        channel = make_channel()
+        Video.objects.bulk_create(
+            Video(channel=channel, youtube_video_id=f'v{i:03}', title=f'Song {i}',
+                  published_at=timezone.now() - timedelta(hours=i))
+            for i in range(cards.GROWTH_TOP_K + 5)
+        )
+
+    def videos(self):
+        return Video.objects.select_related('channel').order_by('-published_at')
+
+    def test_cards_have_no_instance_dict(self):
+        card = cards.to_cards(self.videos(), limit=1)[0]
+        for obj in (card, card.channel):
+            self.assertFalse(hasattr(obj, '__dict__'), obj)
+            with self.assertRaises(AttributeError):
+                obj.extra = 1
+
+    def test_to_cards_is_bounded_and_shares_channel_refs(self):
+        listing = cards.to_cards(self.videos(), limit=cards.GROWTH_TOP_K)
+        self.assertEqual(len(listing), cards.GROWTH_TOP_K)
+        self.assertEqual(listing[0].youtube_video_id, 'v000')
+        self.assertEqual(len({id(card.channel) for card in listing}), 1)
+
+    def test_pickle_round_trip(self):
+        video = self.videos().first()
+        video.growth_value, video.growth_label = 1200, '+1.2K'
+        listing = cards.to_cards([video, *self.videos()[1:3]])
+
+        fields   = [name for name in cards.VideoCard.__slots__ if name != 'channel']
+        restored = pickle.loads(pickle.dumps(listing))
+        for before, after in zip(listing, restored):
+            self.assertEqual([getattr(after, f) for f in fields], [getattr(before, f) for f in fields])
+            self.assertEqual((after.channel.pk, after.channel.name), (before.channel.pk, before.channel.name))
+        self.assertEqual((restored[0].growth_value, restored[0].growth_label), (1200, '+1.2K'))
+        self.assertIs(restored[0].channel, restored[1].channel)   # pickled once per list
+        self.assertLess(len(pickle.dumps(listing)), len(pickle.dumps(list(self.videos()[:3]))) // 3)
@@ -0,0 +1,240 @@
+"""
+sonyApp/thumbs.py
+
+Resized WebP thumbnails served from an LRU disk cache, and the inline LQIP
+placeholder (Video.lqip).
+"""
+
+import base64
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+WIDTHS         = (160, 320, 480, 640, 1280)
+WEBP_QUALITY   = 72
+LQIP_WIDTH     = 24
+LQIP_QUALITY   = 30
+FETCH_TIMEOUT  = 5
+EVICT_EVERY    = 50      # writes between directory scans
+EVICT_TO       = 0.9     # evict down to this fraction of the limit
+RENDER_WORKERS = 2       # background renders per process
+RENDER_LOCK_SECONDS = 30 # a render lock older than this is abandoned
+MISS_MAX_AGE   = 60      # browsers re-ask for the WebP after this long
+
+# YouTube sizes, smallest first (fallback when Video.thumbnails is empty)
+YOUTUBE_SIZES = ('default', 'medium', 'high', 'standard', 'maxres')
+
+_writes      = 0
+_writes_lock = threading.Lock()
+_renderer    = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix='thumbs')
+
+
+def thumbnails_from_snippet(snippet):
+    """snippet['thumbnails'] → the dict stored in Video.thumbnails."""
+    return {
+        name: {'url': t['url'], 'width': t.get('width'), 'height': t.get('height')}
+        for name, t in (snippet.get('thumbnails') or {}).items()
+        if t.get('url')
+    }
+
+
+def best_url(thumbnails):
+    """The largest size — what Video.thumbnail_url has always stored."""
+    for name in reversed(YOUTUBE_SIZES):
+        if thumbnails.get(name, {}).get('url'):
+            return thumbnails[name]['url']
+    return ''
+
+
+def source_url(thumbnails, fallback_url, width):
+    """Smallest stored size at least `width` wide (else the largest)."""
+    sized = sorted(
+        (t for t in thumbnails.values() if t.get('url') and t.get('width')),
+        key=lambda t: t['width'],
+    )
+    for t in sized:
+        if t['width'] >= width:
+            return t['url']
+    return sized[-1]['url'] if sized else fallback_url
+
+
+def _open(url):
+    from PIL import Image
+
+    resp = requests.get(url, timeout=FETCH_TIMEOUT)
+    resp.raise_for_status()
+    img = Image.open(io.BytesIO(resp.content))
+    return img.convert('RGB')
+
+
+def _crop_16_9(img):
+    # default/high/standard are 4:3 with the 16:9 frame letterboxed inside
+    w, h     = img.size
+    target_h = round(w * 9 / 16)
+    if target_h < h:
+        top = (h - target_h) // 2
+        img = img.crop((0, top, w, top + target_h))
+    return img
+
+
+def _webp(img, width, quality):
+    from PIL import Image
+
+    img = _crop_16_9(img)
+    if img.width != width:
+        img = img.resize((width, round(width * 9 / 16)), Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, 'WEBP', quality=quality, method=4)
+    return out.getvalue()
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# DISK CACHE
+# ───────────────────────────────────────────────────────────────────────────
+
+def cache_dir():
+    path = settings.THUMB_CACHE_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cached_path(video_id, width):
+    return os.path.join(cache_dir(), f'{video_id}_{width}.webp')
+
+
+def touch(path):
+    """Mark as recently served — eviction goes by mtime."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def evict():
+    """Delete least-recently-served files until the directory is under EVICT_TO × limit."""
+    limit = settings.THUMB_CACHE_MAX_MB * 1024 * 1024
+    files = []
+    total = 0
+    with os.scandir(cache_dir()) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith('.webp'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    if total <= limit:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= limit * EVICT_TO:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total   -= size
+        removed += 1
+    return removed
+
+
+def _write(path, data):
+    global _writes
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)   # atomic — concurrent renders of one file just race harmlessly
+
+    with _writes_lock:
+        _writes += 1
+        due = _writes % EVICT_EVERY == 0
+    if due:
+        evict()
+
+
+def open_cached(video_id, width):
+    """Open the cached WebP for reading — FileNotFoundError on a miss."""
+    path = cached_path(video_id, width)
+    f = open(path, 'rb')
+    touch(path)
+    return f
+
+
+def _acquire(lock_path):
+    """Create lock_path exclusively; take over a stale one. True if ours."""
+    for _ in range(2):
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(lock_path).st_mtime < RENDER_LOCK_SECONDS:
+                    return False
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+    return False
+
+
+def _render(video_id, width, url, lock_path):
+    try:
+        _write(cached_path(video_id, width), _webp(_open(url), width, WEBP_QUALITY))
+    except Exception as e:
+        logger.warning(f"Thumbnail render failed for {video_id} @ {width}: {e}")
+    finally:
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+        close_old_connections()
+
+
+def render_in_background(video_id, width, url):
+    """
+    Queue a render of `url` into the cache unless one is already running
+    (in any worker) or the file exists. Returns True if queued.
+    """
+    path      = cached_path(video_id, width)
+    lock_path = f'{path}.lock'
+    if not _acquire(lock_path):
+        return False
+    if os.path.exists(path):   # finished between the caller's miss and our lock
+        os.remove(lock_path)
+        return False
+    _renderer.submit(_render, video_id, width, url, lock_path)
+    return True
+
+
+# ───────────────────────────────────────────────────────────────────────────
+# LQIP
+# ───────────────────────────────────────────────────────────────────────────
+
+def build_lqip(thumbnails, fallback_url):
+    url = source_url(thumbnails or {}, fallback_url, LQIP_WIDTH)
+    if not url:
+        return ''
+    data = _webp(_open(url), LQIP_WIDTH, LQIP_QUALITY)
+    return 'data:image/webp;base64,' + base64.b64encode(data).decode()
+
+
+def ensure_lqip(video):
+    """Fill video.lqip if empty — best effort, a failed fetch just leaves it blank."""
+    if video.lqip:
+        return
+    try:
+        lqip = build_lqip(video.thumbnails, video.thumbnail_url)
+    except Exception as e:
+        logger.warning(f"LQIP failed for {video.youtube_video_id}: {e}")
+        return
+    if lqip:
+        type(video).objects.filter(pk=video.pk).update(lqip=lqip)
+        video.lqip = lqip
@@ -11,9 +11,11 @@ urlpatterns = [
 
     # Channel pages
     path('channel/<str:channel_id>/', views.channel_detail, name='channel_detail'),
+    path('api/channel/<str:channel_id>/videos/', views.channel_videos_api, name='channel_videos_api'),
 
     # Video player
     path('channel/<str:channel_id>/video/<str:video_id>/', views.video_player, name='video_player'),
+    path('thumb/<str:video_id>/<int:width>/', views.thumbnail, name='thumbnail'),
 
     # Search
     path('api/search/videos/', views.search_videos, name='search_videos'),
@@ -38,10 +40,18 @@ urlpatterns = [
     # Artists pages
     path('artists/',         views.artists_page,   name='artists_page'),
     path('artists/videos/', views.artist_videos,  name='artist_videos'),
+    path('api/artists/videos/', views.artist_videos_api, name='artist_videos_api'),
 
     # ── Cron job endpoints ──────────────────────────────────────
     path('api/health/', views.health_check, name='health_check'),                        # CRON 1 — every 5-10 min
+    path('api/db-pool/', views.db_pool_stats, name='db_pool_stats'),
     path('api/auto-fetch/', views.auto_fetch_videos, name='auto_fetch_videos'),          # CRON 2 — every 10 min
     path('api/update-stats/', views.auto_update_stats, name='auto_update_stats'),        # CRON 3 — every 6 hours
     path('api/update-stats-full/', views.auto_update_stats_full, name='auto_update_stats_full'),  # CRON 4 — daily
+
+    path('api/sync-runs/', views.sync_runs_api, name='sync_runs_api'),
+    path('api/sync-runs/<int:run_id>/', views.sync_runs_api, name='sync_run_detail'),
+
+    # ── WebSub push (hub → us) ──────────────────────────────────
+    path('api/websub/callback/', views.websub_callback, name='websub_callback'),
 ]
\ No newline at end of file
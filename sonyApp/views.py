@@ -1,40 +1,30 @@
-
+import hashlib
+import hmac
 import json
-from datetime import timedelta
-from django.shortcuts import redirect, render, get_object_or_404
-from django.http import HttpResponse, JsonResponse
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
 from django.conf import settings
 from django.core.cache import cache
-from django.utils import timezone
-from django.db.models import Q, Sum
-from django.db.models.functions import Coalesce
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.views.decorators.http import require_POST, require_http_methods
-from django.views.decorators.csrf import csrf_protect
-
-from django.core.mail import send_mail
-
-from datetime import timedelta
-
-from .models import Channel, Video
-
-from collections import Counter
-import re
-
-from django.views.decorators.csrf import csrf_exempt
 from django.core.management import call_command
-from django.db import connection
-from datetime import datetime
-from io import StringIO
-import logging
-
+from django.db import connections
+from django.db.models import Count, F, Q
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
 
-from django.views.decorators.cache import cache_page
-
-# API endpoint for AJAX updates (called every 5 minutes by your JavaScript)
-from django.http import JsonResponse
-from django.views.decorators.http import require_GET
+from . import cards, caching, catalogue, db_pool, http_cache, page_cache, read_model, search, thumbs
+from .models import Artist, Channel, SiteStats, SyncRun, UpNextQueue, Video
+from .pagination import InvalidCursor, keyset_page
+from .tasks import ingest_video
 
 logger = logging.getLogger(__name__)
 
@@ -81,101 +71,57 @@ def format_number(num):
 
 
 # ═══════════════════════════════════════════════════════════════
-# ARTISTS PAGE  — optimized: 1 DB query instead of ~70
+# ARTISTS PAGE  — one GROUP BY over ingest-time artist tags
 # ═══════════════════════════════════════════════════════════════
 
+@page_cache.cached_page(['artists'], timeout=300)
 def artists_page(request):
-    """
-    Full artists list page.
-    Uses a SINGLE DB query with Django ORM filtering + Python counting.
-    Cached 1 hour.
+    """Full artists list page."""
+    artists = read_model.artists() if read_model.available() else catalogue.artists_page_data()
+    return render(request, 'sonyApp/webpage/artists.html', {
+        'artists': artists,
+    })
+# ═══════════════════════════════════════════════════════════════
+# ARTIST VIDEOS PAGE  — keyset-paginated videos for one artist
+# ═══════════════════════════════════════════════════════════════
 
-    Strategy:
-    - Fetch ALL matching videos in last 90 days in ONE query
-    - Group/count in Python — much faster than 70 separate queries
-    """
-    cache_key = 'artists_page_data'
-    cached = cache.get(cache_key)
-    if cached:
-        return render(request, 'sonyApp/webpage/artists.html', {'artists': cached})
+ARTIST_PAGE_SIZE = 24
 
-    ninety_days_ago = timezone.now() - timedelta(days=90)
 
-    REAL_ARTISTS = [
-        # Music Directors / Composers
-        'A.R. Rahman', 'Anirudh Ravichander', 'Yuvan Shankar Raja', 'Ilaiyaraaja',
-        'Harris Jayaraj', 'G.V. Prakash', 'D. Imman', 'Santhosh Narayanan',
-        'Sean Roldan', 'Hiphop Tamizha', 'Devi Sri Prasad', 'M.M. Keeravani',
-        'Thaman S', 'Pritam', 'Vishal Dadlani', 'Shekhar Ravjiani',
-        'Sam C.S.', 'Leon James', 'Siddhu Kumar', 'Justin Prabhakaran',
-        'Ron Ethan Yohann', 'Jakes Bejoy', 'Sushin Shyam', 'Dharan Kumar',
-        # Playback Singers - Male
-        'S.P. Balasubrahmanyam', 'K.J. Yesudas', 'Sid Sriram', 'Benny Dayal',
-        'Haricharan', 'Vijay Yesudas', 'Sathyaprakash', 'Pradeep Kumar',
-        'Armaan Malik', 'Arijit Singh', 'Mohit Chauhan', 'Javed Ali',
-        'Sonu Nigam', 'Shankar Mahadevan', 'Udit Narayan', 'Karthik',
-        'Rahul Nambiar', 'Ranjith', 'Vineeth Sreenivasan', 'Anand Aravindakshan',
-        'Shenbagaraj', 'Narayanan',
-        # Playback Singers - Female
-        'Shreya Ghoshal', 'Chinmayi', 'Jonita Gandhi', 'Neha Kakkar',
-        'Sunidhi Chauhan', 'K.S. Chithra', 'Sadhana Sargam', 'Alka Yagnik',
-        'Anuradha Sriram', 'Swetha Mohan', 'Madhushree', 'Bombay Jayashri',
-        'Vaikom Vijayalakshmi', 'Sithara', 'Shweta Mohan',
-        # Independent Artists / Bands
-        'Sivaangi Krishnakumar', 'Dhee', 'OfRo', 'The Indian Choral Ensemble',
-        'Agam', 'Thaikkudam Bridge', 'Avial', 'Masala Coffee',
-    ]
-
-    # ── Step 1: Build one big OR filter for ALL artists ──────────────────
-    # One single DB query fetches all relevant video titles + descriptions
-    combined_filter = Q()
-    for artist in REAL_ARTISTS:
-        combined_filter |= Q(title__icontains=artist) | Q(description__icontains=artist)
-
-    # Fetch only the fields we need — no select_related required
-    video_texts = list(
-        Video.objects
-        .filter(
-            combined_filter,
-            published_at__gte=ninety_days_ago,
-            is_active=True,
-            is_embeddable=True,
-        )
-        .values('title', 'description')   # only 2 fields — fast
-    )
+def _artist_videos_query(artist_name):
+    """
+    (display name, queryset, ordering, count cache key) for an artist.
+    Known artists join through VideoArtist and page on its copy of
+    published_at (index: artist, -published_at); other names fall back to
+    the old icontains scan.
+    """
+    ninety_days_ago = timezone.now() - timedelta(days=90)
 
-    # ── Step 2: Count in Python ───────────────────────────────────────────
-    artist_data = []
-    for artist in REAL_ARTISTS:
-        artist_lower = artist.lower()
-        count = sum(
-            1 for v in video_texts
-            if artist_lower in (v['title'] or '').lower()
-            or artist_lower in (v['description'] or '').lower()
-        )
-        if count > 0:
-            artist_data.append({'name': artist, 'count': count})
+    base = Video.objects.filter(
+        published_at__gte=ninety_days_ago,
+        is_active=True,
+        is_embeddable=True,
+        channel__is_active=True,
+    ).select_related('channel')
 
-    # Sort descending
-    artist_data.sort(key=lambda x: x['count'], reverse=True)
+    artist = Artist.objects.filter(name__iexact=artist_name, is_active=True).first()
+    if artist:
+        videos = base.filter(
+            artist_links__artist=artist,
+            artist_links__published_at__gte=ninety_days_ago,
+        ).annotate(tagged_at=F('artist_links__published_at'))
+        return artist.name, videos, ('-tagged_at', '-id'), f'artist_video_count_{artist.pk}'
 
-    # Add bar percentage relative to top artist
-    max_count = artist_data[0]['count'] if artist_data else 1
-    for a in artist_data:
-        a['bar_pct'] = round((a['count'] / max_count) * 100)
+    videos = base.filter(Q(title__icontains=artist_name) | Q(description__icontains=artist_name))
+    digest = hashlib.md5(artist_name.lower().encode()).hexdigest()
+    return artist_name, videos, ('-published_at', '-id'), f'artist_video_count_q_{digest}'
 
-    cache.set(cache_key, artist_data, 3600)  # cache 1 hour
-
-    return render(request, 'sonyApp/webpage/artists.html', {
-        'artists': artist_data,
-    })
-# ═══════════════════════════════════════════════════════════════
-# ARTIST VIDEOS PAGE  — all videos for a specific artist
-# ═══════════════════════════════════════════════════════════════
 
 def artist_videos(request):
     """
-    Shows all videos matching the artist name in title or description.
+    Shows videos tagged with the artist (name or alias in title or
+    description). Only the first ARTIST_PAGE_SIZE cards are rendered;
+    "Load more" pulls the rest from artist_videos_api by cursor.
     URL: /artists/videos/?artist=Arijit+Singh
     """
     artist_name = request.GET.get('artist', '').strip()
@@ -183,163 +129,93 @@ def artist_videos(request):
     if not artist_name:
         return redirect('artists_page')
 
-    ninety_days_ago = timezone.now() - timedelta(days=90)
-
-    videos = (
-        Video.objects
-        .filter(
-            Q(title__icontains=artist_name) | Q(description__icontains=artist_name),
-            published_at__gte=ninety_days_ago,
-            is_active=True,
-            is_embeddable=True,
-            channel__is_active=True,
-        )
-        .select_related('channel')
-        .order_by('-published_at')
-    )
+    artist_name, videos, ordering, count_key = _artist_videos_query(artist_name)
+    page, next_cursor = keyset_page(videos, ordering, limit=ARTIST_PAGE_SIZE)
 
     return render(request, 'sonyApp/webpage/artist_videos.html', {
         'artist_name':  artist_name,
-        'videos':       videos,
-        'total_count':  videos.count(),
+        'videos':       page,
+        'next_cursor':  next_cursor,
+        'total_count':  caching.get_or_set(count_key, ['artists'], videos.count, 600),   # cache 10 minutes
     })
 
-# ═══════════════════════════════════════════════════════════════
-# GROWTH ANALYTICS  (3-section, 6h snapshot based)
-# ═══════════════════════════════════════════════════════════════
 
-def get_growth_sections():
+@require_GET
+def artist_videos_api(request):
     """
-    Return videos for all 3 growth sections.
-
-    Section 1 — Hot & New   : 0h  < age < 24h   | ranked by 6h delta
-    Section 2 — Daily Growth: 24h ≤ age < 168h  | ranked by 24h rolling delta
-    Section 3 — Weekly Growth:168h ≤ age < 720h | ranked by 168h rolling delta
-
-    Results cached for 30 minutes (cache is busted on each cron run via
-    cache.delete('growth_sections') inside update_video_stats if desired).
+    Next page of artist cards for "Load more".
+    GET /api/artists/videos/?artist=<name>&cursor=<next_cursor>
+    → {"html": "<card>…", "next_cursor": "…" | null}
     """
-    cache_key = 'growth_sections_v2'
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
-
-    now = timezone.now()
+    artist_name = request.GET.get('artist', '').strip()
+    if not artist_name:
+        return JsonResponse({'error': 'missing artist'}, status=400)
 
-    # ── candidate pool: videos published in last 30 days, active, not shorts ──
-    thirty_days_ago = now - timedelta(hours=720)
-    candidates = (
-        Video.objects
-        .filter(
-            channel__is_active=True,
-            is_active=True,
-            is_embeddable=True,
-            is_short=False,
-            published_at__gte=thirty_days_ago,
-            base_snapshot_timestamp__isnull=False,   # must have at least 1 snapshot
+    _, videos, ordering, _ = _artist_videos_query(artist_name)
+    try:
+        page, next_cursor = keyset_page(
+            videos, ordering, request.GET.get('cursor'), limit=ARTIST_PAGE_SIZE,
         )
-        .select_related('channel')
-    )
-
-    hot_list    = []
-    daily_list  = []
-    weekly_list = []
-
-    for video in candidates:
-        if video.in_hot_and_new():
-            growth = video.get_hot_growth()
-            if growth > 0:
-                video.growth_value = growth
-                video.growth_label = video.get_growth_label(section='hot')
-                hot_list.append(video)
-
-        elif video.in_daily_growth():
-            growth = video.get_daily_growth()
-            if growth > 0:
-                video.growth_value = growth
-                video.growth_label = video.get_growth_label(section='daily')
-                daily_list.append(video)
-
-        elif video.in_weekly_growth():
-            growth = video.get_weekly_growth()
-            if growth > 0:
-                video.growth_value = growth
-                video.growth_label = video.get_growth_label(section='weekly')
-                weekly_list.append(video)
-
-    # Sort each section by highest absolute growth
-   
-    hot_list.sort(key=lambda v: v.growth_value, reverse=True)
-    daily_list.sort(key=lambda v: v.growth_value, reverse=True)
-    weekly_list.sort(key=lambda v: v.growth_value, reverse=True)
-
-    result = {
-        'hot_and_new':   hot_list,
-        'daily_growth':  daily_list,
-        'weekly_growth': weekly_list,
-    }
-
-    cache.set(cache_key, result, 1800)   # cache 30 minutes
-    return result
-
+    except InvalidCursor:
+        return JsonResponse({'error': 'invalid cursor'}, status=400)
 
+    html = ''.join(
+        render_to_string('sonyApp/inc/artist_video_card.html', {'video': v}, request=request)
+        for v in page
+    )
+    return JsonResponse({'html': html, 'next_cursor': next_cursor})
 
 # ═══════════════════════════════════════════════════════════════
 # HOME
 # ═══════════════════════════════════════════════════════════════
 
+@page_cache.cached_page(['channels', 'stats'], timeout=300)
 def home(request):
-    """Landing page."""
-    channels = Channel.objects.filter(is_active=True)
+    """
+    Landing page — full-page cached for anonymous visitors (sonyApp/page_cache.py);
+    a miss reads the local snapshot (sonyApp/read_model.py) when there is one.
+    """
+    if read_model.available():
+        channels      = read_model.channels()
+        recent_videos = read_model.recent_videos(days=30, limit=10)
+    else:
+        channels = Channel.objects.filter(is_active=True)
 
-    # ── Carousel: last 30 days ─────────────────────────────────────────────
-    recent_videos = (
-        Video.objects
-        .filter(
-            channel__is_active=True,
-            is_active=True,
-            is_embeddable=True,
-            published_at__gte=timezone.now() - timedelta(days=30),
+        # ── Carousel: last 30 days ─────────────────────────────────────────
+        recent_videos = (
+            Video.objects
+            .filter(
+                channel__is_active=True,
+                is_active=True,
+                is_embeddable=True,
+                published_at__gte=timezone.now() - timedelta(days=30),
+            )
+            .select_related('channel')
+            .order_by('-published_at')[:10]
         )
-        .select_related('channel')
-        .order_by('-published_at')[:10]
-    )
-
-    # ── Statistics ─────────────────────────────────────────────────────────
-    total_artists = Channel.objects.filter(is_active=True).count()
 
-    total_videos = Video.objects.filter(
-        channel__is_active=True, is_active=True
-    ).count()
-
-    monthly_views = Video.objects.filter(
-        channel__is_active=True,
-        is_active=True,
-        published_at__gte=timezone.now() - timedelta(days=30),
-    ).aggregate(total=Coalesce(Sum('view_count'), 0))['total']
-
-    total_subscribers = Channel.objects.filter(
-        is_active=True
-    ).aggregate(total=Coalesce(Sum('subscriber_count'), 0))['total']
+    # ── Statistics — precomputed by ingestion / stats runs, no aggregates ──
+    stats = SiteStats.current()
 
     return render(request, 'sonyApp/webpage/home.html', {
         'channels':      channels,
         'recent_videos': recent_videos,
 
         # ── stats ──
-        'total_artists_formatted':     format_number(total_artists),
-        'total_videos_formatted':      format_number(total_videos),
-        'monthly_views_formatted':     format_number(monthly_views),
-        'total_subscribers_formatted': format_number(total_subscribers),
+        'total_artists_formatted':     format_number(stats.total_artists),
+        'total_videos_formatted':      format_number(stats.total_videos),
+        'monthly_views_formatted':     format_number(stats.monthly_views),
+        'total_subscribers_formatted': format_number(stats.total_subscribers),
     })
 
 # ═══════════════════════════════════════════════════════════════
 # GROWTH PAGE  (full top 10 per section)
 # ═══════════════════════════════════════════════════════════════
 
+@page_cache.cached_page(['growth'], timeout=300)
 def growth_page(request):
     """Dedicated growth analytics page — top 10 per section."""
-    growth_data = get_growth_sections()
+    growth_data = read_model.growth_sections() if read_model.available() else catalogue.get_growth_sections()
     return render(request, 'sonyApp/webpage/growth.html', {
         'hot_and_new':  growth_data['hot_and_new'],    # top 10
         'daily_growth': growth_data['daily_growth'],   # top 10
@@ -351,10 +227,13 @@ def growth_page(request):
 # ═══════════════════════════════════════════════════════════════
 
 @require_GET
+@http_cache.conditional(['growth'])
 def api_trending(request):
-    """Returns all 3 growth sections as JSON for AJAX refresh."""
-    growth_data = get_growth_sections()
-
+    """
+    Returns all 3 growth sections as JSON for AJAX refresh. The encoded
+    (and compressed) body is cached under the 'growth' tag, so the
+    reverse() per video only runs on a rebuild.
+    """
     def serialise(video, section):
         return {
             'title':        video.title,
@@ -365,108 +244,192 @@ def api_trending(request):
             'url': reverse('video_player', args=[video.channel.channel_id, video.youtube_video_id]),
         }
 
-    return JsonResponse({
-        'hot_and_new':   [serialise(v, 'hot')    for v in growth_data['hot_and_new']],
-        'daily_growth':  [serialise(v, 'daily')  for v in growth_data['daily_growth']],
-        'weekly_growth': [serialise(v, 'weekly') for v in growth_data['weekly_growth']],
-    })
+    def build():
+        growth_data = catalogue.get_growth_sections()
+        return {
+            'hot_and_new':   [serialise(v, 'hot')    for v in growth_data['hot_and_new']],
+            'daily_growth':  [serialise(v, 'daily')  for v in growth_data['daily_growth']],
+            'weekly_growth': [serialise(v, 'weekly') for v in growth_data['weekly_growth']],
+        }
+
+    return http_cache.swr_json(request, 'api_trending', build, tags=['growth'], soft_ttl=1800, hard_ttl=6 * 3600)
 
 @require_GET
 def last_stats_time(request):
-    last = cache.get('last_stats_update')
+    # From the DB, not a per-worker cache — every worker answers the same
+    last = (
+        SyncRun.objects
+        .filter(kind='stats', status='success')
+        .order_by('-finished_at')
+        .values_list('finished_at', flat=True)
+        .first()
+    )
     if last:
-        from datetime import datetime, timezone
-        from zoneinfo import ZoneInfo
-        IST = ZoneInfo('Asia/Kolkata')
-        dt = datetime.fromisoformat(last)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        last = dt.astimezone(IST).isoformat()
+        last = last.astimezone(ZoneInfo('Asia/Kolkata')).isoformat()
     return JsonResponse({'last_updated': last})
 
 # ═══════════════════════════════════════════════════════════════
 # CHANNEL DETAIL
 # ═══════════════════════════════════════════════════════════════
 
-def channel_detail(request, channel_id):
-    channel = get_object_or_404(Channel, channel_id=channel_id)
+CHANNEL_PAGE_SIZE = 20
 
-    category    = request.GET.get('category', 'all')
-    sort_by     = request.GET.get('sort', 'recent')
-    page_number = request.GET.get('page', 1)
+# Keyset orderings (unique — end in id); each has a matching partial index on Video
+CHANNEL_ORDERINGS = {
+    'recent':  ('-published_at', '-id'),
+    'popular': ('-view_count', '-published_at', '-id'),
+}
 
+
+def _channel_videos_query(channel, category, sort_by):
+    """(queryset, ordering) for one channel tab / sort."""
     videos_qs = Video.objects.filter(
         channel=channel, is_active=True, is_embeddable=True,
     )
-
-    total_videos = videos_qs.filter(is_short=False).count()
-    total_shorts = videos_qs.filter(is_short=True).count()
-    total_all    = total_videos + total_shorts
-
     if category == 'videos':
         videos_qs = videos_qs.filter(is_short=False)
     elif category == 'shorts':
         videos_qs = videos_qs.filter(is_short=True)
 
-    if sort_by == 'popular':
-        videos_qs = videos_qs.order_by('-view_count', '-published_at')
-    else:
-        videos_qs = videos_qs.order_by('-published_at')
+    return videos_qs, CHANNEL_ORDERINGS.get(sort_by, CHANNEL_ORDERINGS['recent'])
+
+
+def _channel_pages(channel_id, category, sort_by):
+    """
+    (channel, page, counts) — page(cursor) -> (videos, next_cursor),
+    counts() -> (total_videos, total_shorts) — from the local snapshot when
+    it has the channel (sonyApp/read_model.py), else the ORM (e.g. a channel
+    added since the last build). Both take the same cursors. Raises
+    Http404, page() raises InvalidCursor.
+    """
+    channel = read_model.channel(channel_id) if read_model.available() else None
+    if channel is not None:
+        ordering = CHANNEL_ORDERINGS.get(sort_by, CHANNEL_ORDERINGS['recent'])
+        return (
+            channel,
+            lambda cursor: read_model.channel_page(channel.pk, category, ordering, cursor, limit=CHANNEL_PAGE_SIZE),
+            lambda: read_model.channel_counts(channel.pk),
+        )
+
+    channel = get_object_or_404(Channel, channel_id=channel_id)
+    videos_qs, ordering = _channel_videos_query(channel, category, sort_by)
+
+    def counts():
+        # Both tab counts in ONE conditional aggregate
+        totals = Video.objects.filter(
+            channel=channel, is_active=True, is_embeddable=True,
+        ).aggregate(
+            total_videos=Count('id', filter=Q(is_short=False)),
+            total_shorts=Count('id', filter=Q(is_short=True)),
+        )
+        return totals['total_videos'], totals['total_shorts']
+
+    return channel, lambda cursor: keyset_page(videos_qs, ordering, cursor, limit=CHANNEL_PAGE_SIZE), counts
+
+
+def _channel_page_tags(request, channel_id, *args, **kwargs):
+    """
+    Page-cache tag for a page about one channel: 'channel:<pk>' — bumped when
+    ingestion, a stats run or Channel.save touches that channel, or a read
+    model build changes its rows. Not 'channels': that's a catalogue tag,
+    bumped every run, and would flush every channel page each time. The
+    channel_id → pk mapping never changes, so it's cached without expiry.
+    """
+    key = f'channel_pk:{channel_id}'
+    pk  = cache.get(key)
+    if pk is None:
+        pk = Channel.objects.filter(channel_id=channel_id).values_list('pk', flat=True).first()
+        if pk is not None:
+            cache.set(key, pk, None)
+    return [f'channel:{pk}']
+
+
+@page_cache.cached_page(_channel_page_tags, params=('category', 'sort', 'cursor'))
+def channel_detail(request, channel_id):
+    """
+    Channel page — first CHANNEL_PAGE_SIZE cards, then cursor-based
+    "load more" (channel_videos_api). Deep pages cost the same as page 1.
+    """
+    category = request.GET.get('category', 'all')
+    sort_by  = request.GET.get('sort', 'recent')
+
+    channel, page, counts = _channel_pages(channel_id, category, sort_by)
+
+    total_videos, total_shorts = counts()
+    total_all = total_videos + total_shorts
 
-    paginator = Paginator(videos_qs, 20)
     try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+        videos, next_cursor = page(request.GET.get('cursor'))
+    except InvalidCursor:
+        videos, next_cursor = page(None)
 
     return render(request, 'sonyApp/webpage/channel_detail.html', {
-        'channel':      channel,
-        'videos':       page_obj.object_list,
-        'category':     category,
-        'sort_by':      sort_by,
-        'total_videos': total_videos,
-        'total_shorts': total_shorts,
-        'total_all':    total_all,
-        'page_obj':     page_obj,
+        'channel':        channel,
+        'videos':         videos,
+        'category':       category,
+        'sort_by':        sort_by,
+        'total_videos':   total_videos,
+        'total_shorts':   total_shorts,
+        'total_all':      total_all,
+        'category_total': {'videos': total_videos, 'shorts': total_shorts}.get(category, total_all),
+        'next_cursor':    next_cursor,
     })
 
 
+@require_GET
+def channel_videos_api(request, channel_id):
+    """
+    Infinite-scroll page for channel_detail.
+    GET /api/channel/<id>/videos/?cursor=<next_cursor>&category=all|videos|shorts&sort=recent|popular
+    → {"html": "<card>…", "next_cursor": "…" | null}
+    """
+    channel, page, _ = _channel_pages(
+        channel_id, request.GET.get('category', 'all'), request.GET.get('sort', 'recent'),
+    )
+    try:
+        videos, next_cursor = page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return JsonResponse({'error': 'invalid cursor'}, status=400)
+
+    html = ''.join(
+        render_to_string(
+            'sonyApp/inc/channel_video_card.html',
+            {'video': v, 'channel': channel},
+            request=request,
+        )
+        for v in videos
+    )
+    return JsonResponse({'html': html, 'next_cursor': next_cursor})
+
+
 # ═══════════════════════════════════════════════════════════════
 # VIDEO PLAYER
 # ═══════════════════════════════════════════════════════════════
 
+@page_cache.cached_page(_channel_page_tags, csrf_cookie=True)
 def video_player(request, channel_id, video_id):
-    channel = get_object_or_404(Channel, channel_id=channel_id)
-    video = get_object_or_404(
-        Video,
-        youtube_video_id=video_id,
-        channel=channel,
-        is_active=True,
-        is_embeddable=True,
-    )
-
+    """
+    One indexed lookup (video + channel) and one cache read: the "up next"
+    list and its end-screen JSON are precomputed per (channel, is_short) by
+    UpNextQueue and only sliced here. The whole page is cached for
+    anonymous visitors; the csrftoken cookie is still set per visitor.
+    The lookup reads the local snapshot (sonyApp/read_model.py) first; a
+    video pushed since the last build is still found through the ORM.
+    """
+    video = read_model.video(channel_id, video_id) if read_model.available() else None
+    if video is None:
+        video = get_object_or_404(
+            Video.objects.select_related('channel'),
+            youtube_video_id=video_id,
+            channel__channel_id=channel_id,
+            is_active=True,
+            is_embeddable=True,
+        )
+    channel  = video.channel
     is_short = video.is_short
 
-    # ── Same type ONLY — no filling with opposite type ────────────────────────
-    streaming = list(
-        Video.objects
-        .filter(channel=channel, is_active=True, is_embeddable=True, is_short=is_short)
-        .exclude(youtube_video_id=video_id)
-        .order_by('-published_at')[:20]
-    )
-
-    # ── JSON for end-screen JS (same type only, excludes current video) ───────
-    streaming_json = json.dumps([
-        {
-            'youtube_video_id': v.youtube_video_id,
-            'title':            v.title,
-            'thumbnail_url':    v.thumbnail_url,
-            'is_short':         v.is_short,
-        }
-        for v in streaming
-    ])
+    # ── Same type ONLY — no filling with opposite type; JSON for end-screen JS ─
+    streaming, streaming_json = UpNextQueue.up_next(channel.pk, is_short, video_id)
 
     return render(request, 'sonyApp/webpage/video_player.html', {
         'channel':          channel,
@@ -477,96 +440,101 @@ def video_player(request, channel_id, video_id):
     })
 
 # ═══════════════════════════════════════════════════════════════
-# SEARCH
+# THUMBNAILS  — resized WebP from the local disk cache (sonyApp/thumbs.py)
 # ═══════════════════════════════════════════════════════════════
 
-@require_http_methods(["GET"])
-def search_videos(request):
+@require_GET
+def thumbnail(request, video_id, width):
     """
-    JSON search endpoint — returns videos, shorts, and channels.
-    NOW WITH PREFIX-ONLY MATCHING - words must START with the query.
+    /thumb/<video_id>/<width>/ — WebP resized to one of thumbs.WIDTHS.
+    Served from disk; a miss redirects to YouTube's own image (briefly
+    cacheable) while the WebP renders in the background.
     """
-    query = request.GET.get('q', '').strip()
+    if width not in thumbs.WIDTHS:
+        raise Http404('unsupported width')
 
-    def video_dict(video, is_short=False):
-        return {
-            'youtube_video_id': video.youtube_video_id,
-            'title':            video.title,
-            'channel_name':     video.channel.name,
-            'channel_id':       video.channel.channel_id,
-            'thumbnail':        video.thumbnail_url,
-            'duration':         video.duration or ('0:60' if is_short else '0:00'),
-            'views':            video.view_count or 0,
-            'likes':            getattr(video, 'like_count', 0) or 0,
-            'published':        video.published_at.strftime('%b %d, %Y') if video.published_at else '',
-            'is_short':         is_short,
-            'watch_url':        f"/channel/{video.channel.channel_id}/video/{video.youtube_video_id}/",
-        }
+    try:
+        f = thumbs.open_cached(video_id, width)
+    except FileNotFoundError:
+        f = None
+    if f is not None:
+        response = FileResponse(f, content_type='image/webp')
+        patch_cache_control(response, public=True, max_age=30 * 24 * 3600)
+        return response
+
+    row = Video.objects.filter(youtube_video_id=video_id).values('thumbnails', 'thumbnail_url').first()
+    url = row and thumbs.source_url(row['thumbnails'] or {}, row['thumbnail_url'], width)
+    if not url:
+        raise Http404('no thumbnail')
+
+    thumbs.render_in_background(video_id, width, url)
+    response = redirect(url)
+    patch_cache_control(response, public=True, max_age=thumbs.MISS_MAX_AGE)
+    return response
 
-    def channel_dict(ch):
-        return {
-            'channel_id':       ch.channel_id,
-            'name':             ch.name,
-            'description':      ch.description or '',
-            'thumbnail':        ch.thumbnail_url or '',
-            'subscriber_count': ch.subscriber_count or 0,
-            'channel_url':      f"/channel/{ch.channel_id}/",
-        }
+# ═══════════════════════════════════════════════════════════════
+# SEARCH
+# ═══════════════════════════════════════════════════════════════
 
-    # ── Empty query → return recent content ──────────────────
-    if not query:
-        base = Video.objects.filter(is_active=True, is_embeddable=True)
+def _search_video_dict(video, is_short=False):
+    return {
+        'youtube_video_id': video.youtube_video_id,
+        'title':            video.title,
+        'channel_name':     video.channel.name,
+        'channel_id':       video.channel.channel_id,
+        'thumbnail':        video.thumbnail_url,
+        'duration':         video.duration or ('0:60' if is_short else '0:00'),
+        'views':            video.view_count or 0,
+        'likes':            getattr(video, 'like_count', 0) or 0,
+        'published':        video.published_at.strftime('%b %d, %Y') if video.published_at else '',
+        'is_short':         is_short,
+        'watch_url':        f"/channel/{video.channel.channel_id}/video/{video.youtube_video_id}/",
+    }
 
-        recent_videos = (
-            base.filter(is_short=False)
-            .select_related('channel')
-            .order_by('-published_at')[:8]
-        )
-        recent_shorts = (
-            base.filter(is_short=True)
-            .select_related('channel')
-            .order_by('-published_at')[:8]
-        )
-        return JsonResponse({
-            'recent_videos': [video_dict(v, False) for v in recent_videos],
-            'recent_shorts': [video_dict(v, True)  for v in recent_shorts],
-        })
 
-    # Split query into individual words
-    search_words = query.split()
-    
-    # Build PREFIX-ONLY filter using regex with word boundaries
-    # \y is word boundary in SQLite/PostgreSQL regex
-    def build_prefix_filter(word):
-        # Match word at start of string OR after space/punctuation
-        return Q(title__iregex=r'(^|\s)' + word) | Q(channel__name__iregex=r'(^|\s)' + word)
-    
-    # If only one word
-    if len(search_words) == 1:
-        word = search_words[0]
-        # Escape any regex special characters in the word
-        import re
-        escaped_word = re.escape(word)
-        video_filter = build_prefix_filter(escaped_word)
-        channel_filter = Q(name__iregex=r'(^|\s)' + escaped_word)
-    
-    # Multiple words - require ALL words to match as prefixes (AND)
-    else:
-        video_filter = Q()
-        channel_filter = Q()
-        
-        for i, word in enumerate(search_words):
-            import re
-            escaped_word = re.escape(word)
-            word_filter = build_prefix_filter(escaped_word)
-            
-            if i == 0:
-                video_filter = word_filter
-                channel_filter = Q(name__iregex=r'(^|\s)' + escaped_word)
-            else:
-                video_filter &= word_filter
-                channel_filter &= Q(name__iregex=r'(^|\s)' + escaped_word)
-    
+def _search_channel_dict(ch):
+    return {
+        'channel_id':       ch.channel_id,
+        'name':             ch.name,
+        'description':      ch.description or '',
+        'thumbnail':        ch.thumbnail_url or '',
+        'subscriber_count': ch.subscriber_count or 0,
+        'channel_url':      f"/channel/{ch.channel_id}/",
+    }
+
+
+def _search_recent_querysets():
+    base = Video.objects.filter(is_active=True, is_embeddable=True).select_related('channel')
+    return (
+        base.filter(is_short=False).order_by('-published_at')[:8],
+        base.filter(is_short=True).order_by('-published_at')[:8],
+    )
+
+
+def _search_recent_dict(videos, shorts):
+    return {
+        'recent_videos': [_search_video_dict(v, False) for v in videos],
+        'recent_shorts': [_search_video_dict(v, True)  for v in shorts],
+    }
+
+
+def _search_recent_payload():
+    """Empty query → recent content. Cached until ingestion bumps the 'search' tag."""
+    if read_model.available():
+        return _search_recent_dict(*read_model.recent())
+    return _search_recent_dict(*_search_recent_querysets())
+
+
+def _search_querysets(normalized):
+    """
+    Every word must match as a PREFIX of some word in the title or channel
+    name (AND). search.video_filter() narrows through the search index and
+    then applies the exact `(^|\\s)word` rule to the candidates only.
+    """
+    search_words   = normalized.split()
+    video_filter   = search.video_filter(search_words)
+    channel_filter = search.prefix_filter('name', search_words)
+
     embeddable = dict(is_active=True, is_embeddable=True)
 
     # Get videos matching ALL words as prefixes
@@ -576,42 +544,62 @@ def search_videos(request):
         .select_related('channel')
         .order_by('-published_at')[:15]
     )
-    
+
     shorts = (
         Video.objects
         .filter(video_filter, is_short=True, **embeddable)
         .select_related('channel')
         .order_by('-published_at')[:15]
     )
-    
+
     channels = (
         Channel.objects
         .filter(channel_filter, is_active=True)
         .order_by('-subscriber_count')[:5]
     )
+    return videos, shorts, channels
 
-    videos_list   = [video_dict(v, False) for v in videos]
-    shorts_list   = [video_dict(v, True)  for v in shorts]
-    channels_list = [channel_dict(c)      for c in channels]
 
-    return JsonResponse({
-        'videos':        videos_list,
-        'shorts':        shorts_list,
-        'channels':      channels_list,
-        'total_results': len(videos_list) + len(shorts_list) + len(channels_list),
-    })
+@require_http_methods(["GET"])
+@http_cache.conditional(['search'])
+def search_videos(request):
+    """
+    JSON search endpoint — returns videos, shorts, and channels.
+    NOW WITH PREFIX-ONLY MATCHING - words must START with the query.
+    Video matching is index-backed (see sonyApp/search.py). With a local
+    snapshot (sonyApp/read_model.py) a miss doesn't leave the machine at all.
+    """
+    normalized = search.normalize_query(request.GET.get('q', ''))
+
+    def results_payload():
+        if read_model.available():
+            videos, shorts, channels = read_model.search(normalized)
+        else:
+            videos, shorts, channels = _search_querysets(normalized)
+
+        videos_list   = [_search_video_dict(v, False) for v in videos]
+        shorts_list   = [_search_video_dict(v, True)  for v in shorts]
+        channels_list = [_search_channel_dict(c)      for c in channels]
+
+        return {
+            'videos':        videos_list,
+            'shorts':        shorts_list,
+            'channels':      channels_list,
+            'total_results': len(videos_list) + len(shorts_list) + len(channels_list),
+        }
+
+    # Encoded payload cached per normalized query, single-flight (see sonyApp/search.py)
+    build = results_payload if normalized else _search_recent_payload
+    return http_cache.respond(request, search.cached(normalized, build))
 
 # ═══════════════════════════════════════════════════════════════
 # CHANNELS DROPDOWN API  (used by navbar)
 # ═══════════════════════════════════════════════════════════════
 
-def channels_dropdown_api(request):
-    """
-    Returns all active channels for the navbar dropdown.
-    """
-    channels = Channel.objects.filter(is_active=True).order_by('name')
+def _channels_dropdown_payload():
+    channels = list(Channel.objects.filter(is_active=True).order_by('name'))
 
-    return JsonResponse({
+    return {
         'channels': [
             {
                 'channel_id':         ch.channel_id,
@@ -623,24 +611,40 @@ def channels_dropdown_api(request):
                 'handle':             getattr(ch, 'handle', ''),
                 'description':        ch.description or '',
                 'banner_url':         getattr(ch, 'banner_url', ''),
-                'video_count':        Video.objects.filter(channel=ch, is_active=True).count(),
+                'video_count':        ch.video_count,
             }
             for ch in channels
         ],
-        'total': channels.count(),
-    })
+        'total': len(channels),
+    }
+
+
+@http_cache.conditional(['channels'])
+def channels_dropdown_api(request):
+    """
+    Returns all active channels for the navbar dropdown — on every page
+    load, so the encoded body is served stale-while-revalidate under the
+    'channels' tag.
+    """
+    return http_cache.swr_json(
+        request, 'channels_dropdown', _channels_dropdown_payload,
+        tags=['channels'], soft_ttl=600, hard_ttl=24 * 3600,
+    )
 
 
 # ═══════════════════════════════════════════════════════════════
 # CHANNEL PREVIEW API  (modal popup)
 # ═══════════════════════════════════════════════════════════════
 
+@http_cache.conditional(['channels'])
 def channel_preview_api(request, channel_id):
     """
     Returns channel details + recent videos for the subscribe modal.
     Uses local DB only — no YouTube API call (saves quota).
+    Encoded body cached 10 minutes under the 'channels' tag (bumped by
+    every ingestion run).
     """
-    try:
+    def build():
         channel = get_object_or_404(Channel, channel_id=channel_id)
 
         recent_videos = (
@@ -649,7 +653,7 @@ def channel_preview_api(request, channel_id):
             .order_by('-published_at')[:6]
         )
 
-        return JsonResponse({
+        return {
             'success': True,
             'channel': {
                 'channel_id':         channel.channel_id,
@@ -658,7 +662,7 @@ def channel_preview_api(request, channel_id):
                 'description':        channel.description or '',
                 'thumbnail':          channel.thumbnail_url or '',
                 'subscriber_count':   channel.subscriber_count or 0,
-                'video_count':        Video.objects.filter(channel=channel, is_active=True).count(),
+                'video_count':        channel.video_count,
                 'youtube_url':        f"https://www.youtube.com/channel/{channel.youtube_channel_id}",
                 'handle':             getattr(channel, 'handle', ''),
             },
@@ -672,8 +676,10 @@ def channel_preview_api(request, channel_id):
                 }
                 for v in recent_videos
             ],
-        })
+        }
 
+    try:
+        return http_cache.cached_json(request, f'channel_preview:{channel_id}', build, tags=['channels'], timeout=600)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -698,7 +704,22 @@ def flag_unembeddable(request):
     if not video_id:
         return JsonResponse({'error': 'missing youtube_video_id'}, status=400)
 
-    updated = Video.objects.filter(youtube_video_id=video_id).update(is_embeddable=False)
+    # Conditional UPDATE — of concurrent flags for one video, only the one
+    # that flips the row moves the counters
+    updated = Video.objects.filter(youtube_video_id=video_id, is_embeddable=True).update(is_embeddable=False)
+    if updated:
+        pk, channel_pk, is_active, is_short = (
+            Video.objects.filter(youtube_video_id=video_id)
+            .values_list('pk', 'channel_id', 'is_active', 'is_short')
+            .get()
+        )
+        read_model.hide(pk)
+        Channel.apply_video_change(channel_pk, before=(is_active, is_short, True), after=(is_active, is_short, False))
+        # rebuild() bumps channel:<pk>; search results are the only other
+        # cache a single flag needs to reach (growth/artists catch up on the
+        # next ingestion run) — a public endpoint mustn't flush the catalogue
+        UpNextQueue.rebuild(channel_pk, is_short=is_short)
+        caching.bump('search')
 
     return JsonResponse({
         'flagged':          updated > 0,
@@ -712,23 +733,21 @@ def flag_unembeddable(request):
 
 def get_channel_videos(channel):
     """
-    Returns videos for a channel from cache, falling back to DB.
+    Returns the newest MAX_VIDEOS_PER_CHANNEL videos of a channel as
+    VideoCards (sonyApp/cards.py), from cache, falling back to DB.
     Only returns active + embeddable videos.
     """
-    cache_key = f'videos_{channel.channel_id}'
-    videos    = cache.get(cache_key)
-
-    if videos is None:
-        videos = list(
+    return caching.get_or_set(
+        f'video_cards_{channel.channel_id}',
+        [f'channel:{channel.pk}'],
+        lambda: cards.to_cards(
             Video.objects
             .filter(channel=channel, is_active=True, is_embeddable=True)
-            .order_by('-published_at')
-        )
-        cache.set(cache_key, videos, 3600)
-
-    return videos
-
-import threading
+            .select_related('channel')
+            .order_by('-published_at')[:settings.MAX_VIDEOS_PER_CHANNEL]
+        ),
+        3600,
+    )
 
 @require_http_methods(["POST"])
 def enquiry(request):
@@ -785,6 +804,14 @@ Sent via exclusive-music.onrender.com contact form
 # CRON JOB ENDPOINTS
 # ═══════════════════════════════════════════════════════════════
 
+def _rebuild_read_model():
+    """After ingestion runs (stats runs build their own) — a failed build keeps the previous snapshot."""
+    try:
+        read_model.build()
+    except Exception as e:
+        logger.error(f"Read model build failed: {e}")
+
+
 # ── CRON 2: Fetch latest 5 videos per channel — every 10 minutes ──────────
 # URL: /api/auto-fetch/?token=YOUR_TOKEN
 
@@ -796,18 +823,32 @@ def auto_fetch_videos(request):
     provided_token = request.GET.get('token')
     if SECRET_TOKEN and provided_token != SECRET_TOKEN:
         return JsonResponse({'error': 'Unauthorized'}, status=401)
+    run = SyncRun.objects.create(kind='fetch')
     try:
         start_time = datetime.now()
-        out = StringIO()
-        call_command('fetch_youtube_videos', '--recent', '5', stdout=out)
+        # Output streams into run.log (bounded) — nothing is buffered here
+        call_command('fetch_youtube_videos', '--recent', '5', sync_run=run.pk)
+
+        # The build scans the whole catalogue — not on the cron request
+        def rebuild():
+            try:
+                _rebuild_read_model()
+                search.cached('', _search_recent_payload)   # precompute the empty-query payload
+            except Exception as e:
+                logger.error(f"auto_fetch_videos rebuild error: {e}")
+            finally:
+                connections.close_all()   # hand this thread's connection back to the pool
+
+        threading.Thread(target=rebuild, daemon=True).start()
+        run.refresh_from_db()
         return JsonResponse({
             'success':   True,
             'message':   'Fetched latest 5 videos per channel',
             'timestamp': start_time.isoformat(),
-            'output':    out.getvalue(),
+            'sync_run':  run.as_dict(),
         })
     except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+        return JsonResponse({'success': False, 'error': str(e), 'sync_run_id': run.pk}, status=500)
 
 
 # ── CRON 3& 4: 6hours & Daily full stats update — ALL videos ever stored ──────────────
@@ -826,18 +867,18 @@ def auto_update_stats(request):
     except ValueError:
         days = 31
 
-    # ❌ REMOVED immediate cache.set — cold start failures won't fake a timestamp
+    # last_stats_time reads the newest *successful* 'stats' SyncRun —
+    # cold start failures won't fake a timestamp
+    sync_run = SyncRun.objects.create(kind='stats')
 
-    import threading
     def run():
         try:
-            out = StringIO()
-            call_command('update_video_stats', '--days', str(days), stdout=out)
-            cache.delete('growth_sections_v2')
-            cache.set('last_stats_update', datetime.now().isoformat(), 86400)  # ✅ only on success
+            call_command('update_video_stats', '--days', str(days), sync_run=sync_run.pk)   # builds the read model too
             logger.info(f"Stats update done: last {days} days")
         except Exception as e:
             logger.error(f"auto_update_stats error: {e}")
+        finally:
+            connections.close_all()   # hand this thread's connection back to the pool
 
     threading.Thread(target=run, daemon=True).start()
 
@@ -845,6 +886,7 @@ def auto_update_stats(request):
         'success': True,
         'message': f'Stats update started for last {days} days',
         'timestamp': datetime.now().isoformat(),
+        'sync_run_id': sync_run.pk,
     })
 
 
@@ -856,18 +898,22 @@ def auto_update_stats_full(request):
     if SECRET_TOKEN and provided_token != SECRET_TOKEN:
         return JsonResponse({'error': 'Unauthorized'}, status=401)
 
-    # ❌ REMOVED — full fetch should NOT touch last_stats_update
+    # Recorded as 'stats_full' — full fetch should NOT touch last_stats_time
+    sync_run = SyncRun.objects.create(kind='stats_full')
 
-    import threading
     def run():
         try:
-            out = StringIO()
-            call_command('update_video_stats', '--days', '36500', stdout=out)
-            cache.delete('growth_sections_v2')
-            # ❌ REMOVED cache.set here too
+            call_command('update_video_stats', '--days', '36500', sync_run=sync_run.pk)
+            # Low-priority: bring back tombstoned videos that are public again
+            call_command('update_video_stats', '--resurrect')
+            # Backfilled rows an interrupted backfill never got to check
+            call_command('fetch_youtube_videos', '--check-embeddable-only', '--unchecked')
+            _rebuild_read_model()
             logger.info("Full stats update complete")
         except Exception as e:
             logger.error(f"auto_update_stats_full error: {e}")
+        finally:
+            connections.close_all()   # hand this thread's connection back to the pool
 
     threading.Thread(target=run, daemon=True).start()
 
@@ -875,8 +921,130 @@ def auto_update_stats_full(request):
         'success': True,
         'message': 'Full stats update started in background',
         'timestamp': datetime.now().isoformat(),
+        'sync_run_id': sync_run.pk,
     })
 
+
+# ── Sync run status — same answer from every worker ──────────────────────
+# URL: /api/sync-runs/?token=YOUR_TOKEN[&kind=stats]
+#      /api/sync-runs/<id>/?token=YOUR_TOKEN   (includes log ring buffer)
+
+@require_GET
+def sync_runs_api(request, run_id=None):
+    SECRET_TOKEN   = settings.AUTO_SYNC_SECRET_TOKEN
+    provided_token = request.GET.get('token')
+    if SECRET_TOKEN and provided_token != SECRET_TOKEN:
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+    if run_id is not None:
+        run = get_object_or_404(SyncRun, pk=run_id)
+        return JsonResponse(run.as_dict(with_log=True))
+
+    runs = SyncRun.objects.defer('log')
+    kind = request.GET.get('kind')
+    if kind:
+        runs = runs.filter(kind=kind)
+
+    return JsonResponse({'runs': [r.as_dict() for r in runs[:20]]})
+
+# ═══════════════════════════════════════════════════════════════
+# WEBSUB CALLBACK  (YouTube push notifications via the hub)
+# ═══════════════════════════════════════════════════════════════
+# URL: /api/websub/callback/
+# GET  → hub verification of a (un)subscribe we sent — echo hub.challenge
+# POST → signed Atom notification — enqueue single-video ingestion
+
+WEBSUB_TOPIC_PREFIX = 'https://www.youtube.com/xml/feeds/videos.xml?channel_id='
+
+ATOM_NS = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'yt':   'http://www.youtube.com/xml/schemas/2015',
+    'at':   'http://purl.org/atompub/tombstones/1.0',
+}
+
+
+def _websub_signature_ok(request):
+    """Validate X-Hub-Signature ("sha1=<hex>" / "sha256=<hex>") against WEBSUB_SECRET."""
+    secret    = settings.WEBSUB_SECRET
+    signature = request.headers.get('X-Hub-Signature', '')
+    if not secret or '=' not in signature:
+        return False
+
+    algo, _, received = signature.partition('=')
+    if algo not in ('sha1', 'sha256'):
+        return False
+
+    expected = hmac.new(secret.encode(), request.body, getattr(hashlib, algo)).hexdigest()
+    return hmac.compare_digest(expected, received)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def websub_callback(request):
+    if request.method == 'GET':
+        mode      = request.GET.get('hub.mode', '')
+        topic     = request.GET.get('hub.topic', '')
+        challenge = request.GET.get('hub.challenge', '')
+
+        if not challenge or not topic.startswith(WEBSUB_TOPIC_PREFIX):
+            return HttpResponse(status=404)
+
+        yt_channel_id = topic[len(WEBSUB_TOPIC_PREFIX):]
+        channels      = Channel.objects.filter(youtube_channel_id=yt_channel_id)
+
+        # Only confirm a (un)subscribe websub_subscribe actually sent —
+        # otherwise anyone could subscribe or cancel our feeds via the hub
+        if mode not in ('subscribe', 'unsubscribe') or Channel.websub_intent(yt_channel_id) != mode:
+            logger.warning(f"⚠️ WebSub {mode or 'verification'} for {yt_channel_id} we didn't request — refused")
+            return HttpResponse(status=404)
+
+        if mode == 'subscribe':
+            # Only confirm leases for channels we actually list
+            if not channels.filter(is_active=True).exists():
+                return HttpResponse(status=404)
+            try:
+                lease = int(request.GET.get('hub.lease_seconds', settings.WEBSUB_LEASE_SECONDS))
+            except ValueError:
+                lease = settings.WEBSUB_LEASE_SECONDS
+            channels.update(websub_lease_expires_at=timezone.now() + timedelta(seconds=lease))
+            logger.info(f"📡 WebSub lease confirmed for {yt_channel_id} ({lease}s)")
+
+        else:
+            if not channels.exists():
+                return HttpResponse(status=404)
+            channels.update(websub_lease_expires_at=None)
+            logger.info(f"📡 WebSub unsubscribed {yt_channel_id}")
+
+        return HttpResponse(challenge, content_type='text/plain')
+
+    # ── POST: notification ────────────────────────────────────────
+    # Per the WebSub spec a bad signature is still acknowledged with 2xx,
+    # the payload is just dropped.
+    if not _websub_signature_ok(request):
+        logger.warning("⚠️ WebSub notification with missing/invalid signature ignored")
+        return HttpResponse(status=204)
+
+    try:
+        feed = ET.fromstring(request.body)
+    except ET.ParseError:
+        return HttpResponse(status=400)
+
+    queued = 0
+    for entry in feed.findall('atom:entry', ATOM_NS):
+        video_id = entry.findtext('yt:videoId', default='', namespaces=ATOM_NS).strip()
+        if not video_id:
+            continue
+        # The hub re-sends on every title/description edit — coalesce bursts
+        if cache.add(f'websub_push_{video_id}', 1, 60):
+            ingest_video(video_id)
+            queued += 1
+
+    for tombstone in feed.findall('at:deleted-entry', ATOM_NS):
+        logger.info(f"🗑️ WebSub deleted-entry: {tombstone.get('ref', '')}")
+
+    logger.info(f"📨 WebSub notification: {queued} video(s) queued for ingestion")
+    return HttpResponse(status=204)
+
 # ────────────────────────────────────────────────────────────────
 #  Health Check (Keep Alive)
 # ────────────────────────────────────────────────────────────────
@@ -888,3 +1056,15 @@ def health_check(request):
     Just confirms the server process is awake.
     """
     return JsonResponse({'status': 'ok'})
+
+
+# URL: /api/db-pool/?token=YOUR_TOKEN
+@require_GET
+def db_pool_stats(request):
+    """Connection-pool metrics of the worker process that answers (sonyApp/db_pool.py)."""
+    SECRET_TOKEN   = settings.AUTO_SYNC_SECRET_TOKEN
+    provided_token = request.GET.get('token')
+    if SECRET_TOKEN and provided_token != SECRET_TOKEN:
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+    return JsonResponse(db_pool.stats())
@@ -0,0 +1,140 @@
+"""
+sonyApp/youtube_client.py
+
+Shared YouTube Data API client: one client per thread from a cached
+discovery document, and execute() with backoff and per-run quota metering.
+"""
+
+import contextvars
+import json
+import logging
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import httplib2
+from django.conf                   import settings
+from googleapiclient.discovery      import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors         import HttpError
+
+logger = logging.getLogger(__name__)
+
+# 403 reasons that are transient; everything else (quotaExceeded, forbidden…) is final
+RETRYABLE_403_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_CAP_SECONDS  = 32
+
+# Every method we call (channels/playlistItems/videos .list) costs 1 unit
+QUOTA_COST_PER_CALL = 1
+
+_meter = contextvars.ContextVar('youtube_quota_meter', default=None)
+
+_discovery_lock = threading.Lock()
+_discovery_doc  = None
+_local          = threading.local()
+
+
+def _discovery_document():
+    """Static youtube/v3 discovery JSON, read from disk once per process."""
+    global _discovery_doc
+    if _discovery_doc is None:
+        with _discovery_lock:
+            if _discovery_doc is None:
+                _discovery_doc = get_static_doc('youtube', 'v3')
+    return _discovery_doc
+
+
+def get_youtube():
+    """
+    Return this thread's YouTube client, building it on first use.
+    Each thread gets its own httplib2.Http, so connections stay alive
+    across calls without being shared between threads.
+    """
+    client = getattr(_local, 'client', None)
+    if client is None:
+        http   = httplib2.Http(timeout=settings.YOUTUBE_API_TIMEOUT)
+        client = build_from_document(
+            _discovery_document(),
+            developerKey=settings.YOUTUBE_API_KEY,
+            http=http,
+        )
+        _local.client = client
+    return client
+
+
+class QuotaMeter:
+    """Units charged by one run — shared by its worker threads."""
+
+    def __init__(self):
+        self.units = 0
+        self._lock = threading.Lock()
+
+    def charge(self, units):
+        with self._lock:
+            self.units += units
+
+
+@contextmanager
+def metered(meter):
+    """Charge execute() calls made in this context (and copies of it) to `meter`."""
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+def _charge_quota():
+    meter = _meter.get()
+    if meter is not None:
+        meter.charge(QUOTA_COST_PER_CALL)
+
+
+def _is_retryable(error):
+    status = error.resp.status
+    if status >= 500 or status == 429:
+        return True
+    if status == 403:
+        try:
+            reasons = {
+                e.get('reason')
+                for e in json.loads(error.content.decode('utf-8'))['error'].get('errors', [])
+            }
+        except (ValueError, KeyError, AttributeError, TypeError):
+            return False
+        return bool(reasons & RETRYABLE_403_REASONS)
+    return False
+
+
+def _backoff_delay(attempt):
+    """Full jitter: uniform(0, min(cap, base * 2^attempt))."""
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def execute(request, max_retries=None):
+    """
+    request.execute() with jittered exponential backoff.
+    Re-raises the last error once retries are exhausted or the error is final.
+    """
+    retries = settings.YOUTUBE_API_MAX_RETRIES if max_retries is None else max_retries
+
+    for attempt in range(retries + 1):
+        _charge_quota()
+        try:
+            return request.execute()
+        except HttpError as e:
+            if attempt >= retries or not _is_retryable(e):
+                raise
+            reason = f'HTTP {e.resp.status}'
+        except (socket.timeout, ConnectionError, httplib2.HttpLib2Error) as e:
+            if attempt >= retries:
+                raise
+            reason = type(e).__name__
+
+        delay = _backoff_delay(attempt)
+        logger.warning(f"YouTube API {reason} — retry {attempt + 1}/{retries} in {delay:.1f}s")
+        time.sleep(delay)
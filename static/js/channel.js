@@ -1,5 +1,5 @@
 // channel.js - Only for channel detail page
-// Contains: category tabs, sorting, pagination enhancements
+// Contains: category tabs, sorting, cursor-based infinite scroll
 
 (function() {
     'use strict';
@@ -7,15 +7,6 @@
     document.addEventListener('DOMContentLoaded', function() {
         console.log('📺 Channel JS initialized');
 
-        // Smooth scroll to top when paginating
-        document.querySelectorAll('.page-link').forEach(link => {
-            link.addEventListener('click', function(e) {
-                if (this.getAttribute('href') !== '#') {
-                    window.scrollTo({ top: 0, behavior: 'smooth' });
-                }
-            });
-        });
-
         // Optional: Add loading indicator for category switches
         document.querySelectorAll('.category-btn').forEach(btn => {
             btn.addEventListener('click', function() {
@@ -23,5 +14,73 @@
                 this.style.opacity = '0.7';
             });
         });
+
+        initInfiniteScroll();
     });
-})();
\ No newline at end of file
+
+    // "Load more" stays a plain link (next page by cursor) without JS;
+    // with JS it appends /api/channel/<id>/videos/ pages in place and
+    // fires automatically when it scrolls into view.
+    function initInfiniteScroll() {
+        const btn  = document.getElementById('channelLoadMore');
+        const grid = document.getElementById('channelVideoGrid');
+        if (!btn || !grid) return;
+
+        let loading = false;
+
+        function loadMore() {
+            if (loading || !btn.dataset.cursor) return;
+            loading = true;
+            btn.classList.add('disabled');
+
+            const params = new URLSearchParams({
+                cursor:   btn.dataset.cursor,
+                category: btn.dataset.category,
+                sort:     btn.dataset.sort,
+            });
+
+            fetch(`${btn.dataset.url}?${params}`)
+                .then(r => r.json())
+                .then(data => {
+                    const before = grid.children.length;
+                    grid.insertAdjacentHTML('beforeend', data.html);
+
+                    const fresh = Array.from(grid.children).slice(before);
+                    fresh.forEach(card => {
+                        card.querySelectorAll('.num-display').forEach(el => {
+                            if (el.dataset.value) el.textContent = window.formatNumber(el.dataset.value);
+                        });
+                        window.reinitializeTooltips(card);
+                    });
+
+                    const shown = document.getElementById('channelShownCount');
+                    if (shown) shown.textContent = grid.children.length;
+
+                    if (data.next_cursor) {
+                        btn.dataset.cursor = data.next_cursor;
+                        btn.href = `?${new URLSearchParams({
+                            cursor: data.next_cursor, category: btn.dataset.category, sort: btn.dataset.sort,
+                        })}`;
+                        btn.classList.remove('disabled');
+                    } else {
+                        btn.parentNode.remove();
+                        if (observer) observer.disconnect();
+                    }
+                })
+                .catch(() => btn.classList.remove('disabled'))
+                .finally(() => { loading = false; });
+        }
+
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            loadMore();
+        });
+
+        const observer = 'IntersectionObserver' in window
+            ? new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) loadMore();
+            }, { rootMargin: '400px' })
+            : null;
+        if (observer) observer.observe(btn);
+    }
+})();